@@ -0,0 +1,129 @@
+"""Compare the memory and time used to validate arguments of large toolboxes with a
+pydantic model per function (`func_to_pydantic`) and with shared argument validators
+(`func_to_args_validator`), at 100, 1000 and 5000 tools.
+
+Tools in large toolboxes tend to repeat a few signatures, e.g. many `search_*` tools
+taking a query and a limit. "Shared" toolboxes cycle through 20 signatures; in
+"distinct" toolboxes every tool has its own parameter names, the worst case for
+sharing. Reports the time to build the validation artifacts for every tool, the time
+to then validate one call to each tool, and the memory held after building (while no
+tool has been called) and after the calls.
+
+Run with:
+
+    $ python -m benchmarks.bench_arg_models
+"""
+
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, Literal, Union
+
+from pydantic import BaseModel
+
+from toolsmith.toolsmith import clear_cache, func_to_args_validator, func_to_pydantic
+
+SIZES = (100, 1000, 5000)
+SIGNATURES = 20
+
+
+class Filter(BaseModel):
+    field: str
+    op: Literal["eq", "ne", "lt", "gt"] = "eq"
+    value: Union[str, int]
+
+
+def _make_tool(i: int, shape: int) -> tuple[Callable[..., Any], str]:
+    # Parameter names vary with `shape`, so tools with different shapes don't share
+    # validators
+    namespace: dict[str, Any] = {"Filter": Filter}
+    exec(
+        f"def tool_{i}(query_{shape}: str, limit_{shape}: int = 10, "
+        f"filters_{shape}: list[Filter] = [], regex_{shape}: bool = False) -> str:\n"
+        f"    return query_{shape}\n",
+        namespace,
+    )
+    args_json = (
+        f'{{"query_{shape}": "a", "limit_{shape}": 5, '
+        f'"filters_{shape}": [{{"field": "name", "value": "x"}}]}}'
+    )
+    return namespace[f"tool_{i}"], args_json
+
+
+def _validate_with_model(
+    func: Callable[..., Any],
+) -> Callable[[str], dict[str, Any]]:
+    model = func_to_pydantic(func)
+    return lambda args_json: model.model_validate_json(args_json).__dict__
+
+
+def _validate_with_validator(
+    func: Callable[..., Any],
+) -> Callable[[str], dict[str, Any]]:
+    return func_to_args_validator(func).validate
+
+
+def _run(
+    size: int,
+    signatures: int,
+    build: Callable[[Callable[..., Any]], Callable[[str], dict[str, Any]]],
+    trace: bool,
+) -> tuple[float, float, float, float]:
+    clear_cache()
+    tools = [_make_tool(i, i % signatures) for i in range(size)]
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    start = time.perf_counter()
+    validators = [build(func) for func, _ in tools]
+    build_time = time.perf_counter() - start
+    gc.collect()
+    built = tracemalloc.get_traced_memory()[0] - baseline
+
+    start = time.perf_counter()
+    for validate, (_, args_json) in zip(validators, tools):
+        validate(args_json)
+    call_time = time.perf_counter() - start
+
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return build_time, call_time, built, retained
+
+
+def _measure(
+    size: int,
+    signatures: int,
+    build: Callable[[Callable[..., Any]], Callable[[str], dict[str, Any]]],
+) -> tuple[float, float, float, float]:
+    # Tracing allocations slows everything down, so memory is measured in its own run
+    build_time, call_time, _, _ = _run(size, signatures, build, trace=False)
+    _, _, built, retained = _run(size, signatures, build, trace=True)
+    return build_time, call_time, built, retained
+
+
+def main() -> None:
+    print(
+        f"{'tools':>6} {'signatures':>10} {'representation':>16} {'build':>10} "
+        f"{'first calls':>12} {'built':>12} {'called':>12}"
+    )
+    for size in SIZES:
+        for label, signatures in (("shared", SIGNATURES), ("distinct", size)):
+            for name, build in (
+                ("models", _validate_with_model),
+                ("validators", _validate_with_validator),
+            ):
+                build_time, call_time, built, retained = _measure(
+                    size, signatures, build
+                )
+                print(
+                    f"{size:>6} {label:>10} {name:>16} {build_time * 1e3:>7.1f} ms "
+                    f"{call_time * 1e3:>9.1f} ms {built / 2**20:>8.2f} MiB "
+                    f"{retained / 2**20:>8.2f} MiB"
+                )
+
+
+if __name__ == "__main__":
+    main()
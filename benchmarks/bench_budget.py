@@ -0,0 +1,119 @@
+"""Measure the cost of token budgeting for tool results.
+
+Reports how fast `estimate_tokens` is on JSON, prose and code of different sizes, and
+how much a `ResultBudget` adds to `execute_tool_calls` for a turn of 8 calls, with
+results that fit and with results that have to be truncated. If tiktoken and its
+`o200k_base` encoding are available, also compares the estimates with exact counts.
+
+Run with:
+
+    $ python -m benchmarks.bench_budget
+"""
+
+import json
+import random
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Union
+
+from openai.types.chat import ChatCompletionMessageToolCall
+from openai.types.chat.chat_completion_message_tool_call import Function
+
+from toolsmith import ResultBudget, Toolbox
+from toolsmith.budget import estimate_tokens
+
+SIZES = (1_000, 16_000, 1_000_000)
+FAN_OUT = 8
+
+
+def _samples() -> dict[str, str]:
+    random.seed(0)
+    rows = [
+        {
+            "id": i,
+            "name": f"user {i}",
+            "email": f"user{i}@example.com",
+            "score": round(random.random(), 4),
+            "tags": random.sample(["admin", "beta", "trial", "staff"], 2),
+        }
+        for i in range(20_000)
+    ]
+    root = Path(__file__).parent.parent
+    return {
+        "json": json.dumps(rows),
+        "prose": (root / "docs" / "index.md").read_text(),
+        "code": (root / "toolsmith" / "toolbox.py").read_text(),
+    }
+
+
+def _sized(text: str, size: int) -> str:
+    return (text * (size // len(text) + 1))[:size]
+
+
+def _time(func: Callable[[], Any]) -> float:
+    number = 10
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def _exact_counter() -> Union[Callable[[str], int], None]:
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def list_rows(count: int) -> list[dict[str, Any]]:
+    return [{"id": i, "name": f"user {i}", "active": i % 3 == 0} for i in range(count)]
+
+
+def _bench_turn(count: int, budget: Union[ResultBudget, None]) -> float:
+    toolbox = Toolbox.create([list_rows], result_budget=budget)
+    tool_calls = [
+        ChatCompletionMessageToolCall(
+            id=f"call_{i}",
+            type="function",
+            function=Function(name="list_rows", arguments=f'{{"count": {count}}}'),
+        )
+        for i in range(FAN_OUT)
+    ]
+    return _time(lambda: toolbox.execute_tool_calls(tool_calls))
+
+
+def main() -> None:
+    samples = _samples()
+    exact = _exact_counter()
+
+    print(
+        f"{'text':<6} {'chars':>9} {'tokens':>9} {'chars/token':>12} {'time':>12}"
+        + ("  vs tiktoken" if exact else "")
+    )
+    for name, text in samples.items():
+        for size in SIZES:
+            sized = _sized(text, size)
+            tokens = estimate_tokens(sized)
+            seconds = _time(lambda: estimate_tokens(sized))
+            line = (
+                f"{name:<6} {size:>9} {tokens:>9} {size / tokens:>12.2f} "
+                f"{seconds * 1e6:>9.1f} us"
+            )
+            if exact:
+                line += f"  {tokens / exact(sized) - 1:>+11.1%}"
+            print(line)
+
+    print(f"\nexecute_tool_calls with {FAN_OUT} calls")
+    print(f"{'rows per result':<16} {'no budget':>12} {'budget':>12} {'overhead':>10}")
+    for count in (10, 1000):
+        # Small results fit, large ones are truncated to 4000 tokens per turn
+        baseline = _bench_turn(count, None)
+        budgeted = _bench_turn(count, ResultBudget(max_turn_tokens=4000))
+        print(
+            f"{count:<16} {baseline * 1e6:>9.1f} us {budgeted * 1e6:>9.1f} us "
+            f"{budgeted / baseline - 1:>+10.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Measure how hedging cuts tail latency for a tool with long-tail latency.
+
+The tool usually takes about 2 ms, but 2% of calls take 100 ms, like a downstream
+service with occasional slow replicas. Compares p50/p99 latency of turns with 4 tool
+calls each, without hedging and with hedging at a fixed delay and at the 95th
+percentile of recent calls, along with how many extra calls hedging made.
+
+Run with:
+
+    $ python -m benchmarks.bench_hedging
+"""
+
+import asyncio
+import random
+import time
+from typing import Any
+
+from openai.types.chat import ChatCompletionMessageToolCall
+from openai.types.chat.chat_completion_message_tool_call import Function
+
+from toolsmith import AsyncToolbox, HedgePolicy
+
+TURNS = 500
+FAN_OUT = 4
+SLOW_FRACTION = 0.02
+
+TOOL_CALLS = [
+    ChatCompletionMessageToolCall(
+        id=f"call_{i}",
+        type="function",
+        function=Function(name="fetch", arguments=f'{{"key": "{i}"}}'),
+    )
+    for i in range(FAN_OUT)
+]
+
+calls = 0
+
+
+async def fetch(key: str) -> str:
+    global calls
+    calls += 1
+    await asyncio.sleep(0.1 if random.random() < SLOW_FRACTION else 0.002)
+    return key
+
+
+async def _bench(label: str, **options: Any) -> None:
+    global calls
+    random.seed(0)
+    calls = 0
+    toolbox = AsyncToolbox.create([fetch], **options)
+
+    latencies = []
+    for _ in range(TURNS):
+        start = time.perf_counter()
+        await toolbox.execute_tool_calls(TOOL_CALLS)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e3
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e3
+    extra = calls / (TURNS * FAN_OUT) - 1
+    print(f"{label:<20} {p50:>8.1f} ms {p99:>8.1f} ms {extra:>10.1%}")
+
+
+async def main() -> None:
+    print(f"{'':<20} {'p50':>11} {'p99':>11} {'extra calls':>11}")
+    await _bench("no hedging")
+    await _bench("hedge after 10 ms", hedging={"fetch": HedgePolicy(delay=0.01)})
+    await _bench(
+        "hedge at p95",
+        hedging={"fetch": HedgePolicy(delay=0.01, percentile=0.95)},
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
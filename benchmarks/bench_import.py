@@ -0,0 +1,78 @@
+"""Measure the import time of toolsmith in a fresh interpreter.
+
+Each scenario runs in a new subprocess with `-X importtime`, and the cumulative
+import time of the top-level modules is reported (best of several runs). Modules
+that should stay lazy are listed next to each scenario; the script exits with an
+error if any of them were imported.
+
+Run with:
+
+    $ python -m benchmarks.bench_import
+"""
+
+import subprocess
+import sys
+
+SCENARIOS = [
+    # (label, code, modules that must not be imported)
+    ("import toolsmith", "import toolsmith", ["openai", "pydantic"]),
+    ("from toolsmith import Toolbox", "from toolsmith import Toolbox", ["openai"]),
+    (
+        "Toolbox.create + execute",
+        "\n".join(
+            [
+                "from toolsmith import Toolbox",
+                "def f(a: int) -> str: return str(a)",
+                "Toolbox.create([f])._parse_args('f', '{\"a\": 1}')",
+            ]
+        ),
+        ["openai"],
+    ),
+    (
+        "Toolbox.create + get_schema",
+        "\n".join(
+            [
+                "from toolsmith import Toolbox",
+                "def f(a: int) -> str: return str(a)",
+                "Toolbox.create([f]).get_schema()",
+            ]
+        ),
+        [],
+    ),
+]
+
+REPEAT = 5
+
+
+def _run(code: str, lazy_modules: list[str]) -> float:
+    check = "; ".join(
+        f"assert {module!r} not in sys.modules, {module!r} + ' was imported'"
+        for module in lazy_modules
+    )
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{code}\nimport sys; {check}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    # Lines look like "import time:   self [us] | cumulative | imported package";
+    # top-level imports have no indentation before the package name.
+    total_us = 0
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line.split("|")
+        if not package.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000
+
+
+def main() -> None:
+    for label, code, lazy_modules in SCENARIOS:
+        best = min(_run(code, lazy_modules) for _ in range(REPEAT))
+        print(f"{label:<32} {best:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Measure the overhead of instrumentation on `Toolbox.execute_tool_calls`.
+
+Compares a toolbox without instrumentation against one with `ToolStats`, for a
+batch of trivial tool calls, so the numbers are dominated by toolsmith itself.
+
+Run with:
+
+    $ python -m benchmarks.bench_instrumentation
+"""
+
+import timeit
+
+from openai.types.chat import ChatCompletionMessageToolCall
+from openai.types.chat.chat_completion_message_tool_call import Function
+
+from toolsmith import Toolbox, ToolStats
+
+N = 20_000
+
+
+def add(a: int, b: int) -> str:
+    return str(a + b)
+
+
+TOOL_CALLS = [
+    ChatCompletionMessageToolCall(
+        id=f"call_{i}",
+        type="function",
+        function=Function(name="add", arguments=f'{{"a": {i}, "b": 1}}'),
+    )
+    for i in range(8)
+]
+
+
+def main() -> None:
+    for label, toolbox in [
+        ("disabled", Toolbox.create([add])),
+        ("ToolStats", Toolbox.create([add], instrumentation=ToolStats())),
+    ]:
+        seconds = min(
+            timeit.repeat(
+                lambda: toolbox.execute_tool_calls(TOOL_CALLS),
+                number=N // len(TOOL_CALLS),
+                repeat=5,
+            )
+        )
+        print(f"{label:<12} {seconds / N * 1e6:8.2f} us/tool call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare the slotted `Invocation` with the previous pydantic-model implementation.
+
+Reports the CPU time and memory allocated per invocation for constructing
+invocations from already-validated arguments, as `parse_invocations` does.
+
+Run with:
+
+    $ python -m benchmarks.bench_invocation
+"""
+
+import timeit
+import tracemalloc
+from typing import Any, Callable, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from toolsmith.toolbox import Invocation
+
+T = TypeVar("T")
+
+N = 10_000
+
+
+class PydanticInvocation(BaseModel, Generic[T]):
+    id: str
+    func: Callable[..., T]
+    args: dict[str, Any]
+
+    def execute(self) -> T:
+        return self.func(**self.args)
+
+
+def create_user(name: str, age: int) -> str:
+    return f"Created user {name}, age {age}"
+
+
+ARGS = {"name": "Alice", "age": 33}
+
+
+def _bench(label: str, cls: Any) -> tuple[float, float]:
+    def build() -> list[Any]:
+        return [cls(id=f"call_{i}", func=create_user, args=ARGS) for i in range(N)]
+
+    build()  # warm up, e.g. pydantic generic model parametrization
+    seconds = min(timeit.repeat(build, number=1, repeat=5)) / N
+
+    tracemalloc.start()
+    invocations = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del invocations
+
+    print(
+        f"{label:<12} {seconds * 1e6:8.3f} us/invocation "
+        f"{allocated / N:8.1f} bytes/invocation"
+    )
+    return seconds, allocated / N
+
+
+def main() -> None:
+    pydantic_time, pydantic_bytes = _bench("pydantic", PydanticInvocation)
+    slotted_time, slotted_bytes = _bench("slotted", Invocation)
+    print(
+        f"{'savings':<12} {pydantic_time / slotted_time:8.2f}x cpu"
+        f" {pydantic_bytes / slotted_bytes:8.2f}x memory"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compare argument parsing in `BaseToolbox._parse_args` against the previous approach.
+
+The previous approach decoded the arguments with `json.loads`, built the argument model
+with `model(**args)` and copied it back out with `dict(model)`. The current approach
+validates the raw JSON string in one pass with the function's `ArgsValidator`, through a
+`SignatureValidator` shared by every function with the same parameters, and fills in
+missing defaults afterwards.
+
+Run with:
+
+    $ python -m benchmarks.bench_parse_args
+"""
+
+import json
+import timeit
+from typing import Any
+
+from pydantic import BaseModel
+
+from toolsmith import Toolbox
+
+
+class Address(BaseModel):
+    city: str
+    country: str
+
+
+class User(BaseModel):
+    name: str
+    age: int
+    tags: list[str]
+    address: Address
+
+
+def flat(name: str, age: int, email: str, active: bool, score: float) -> str:
+    return ""
+
+
+def nested(users: list[User]) -> str:
+    return ""
+
+
+FLAT_ARGS = json.dumps(
+    {"name": "Alice", "age": 33, "email": "a@example.com", "active": True, "score": 0.5}
+)
+NESTED_ARGS = json.dumps(
+    {
+        "users": [
+            {
+                "name": f"user{i}",
+                "age": i,
+                "tags": ["a", "b", "c"],
+                "address": {"city": "Paris", "country": "FR"},
+            }
+            for i in range(20)
+        ]
+    }
+)
+
+
+def _legacy_parse_args(
+    toolbox: Toolbox, func_name: str, args_json: str
+) -> dict[str, Any]:
+    func_args_model = toolbox.get_func_arg_models()[func_name]
+    return dict(func_args_model(**json.loads(args_json)))
+
+
+def _bench(label: str, fn: Any, number: int) -> float:
+    seconds = min(timeit.repeat(fn, number=number, repeat=5))
+    print(f"{label:<28} {seconds / number * 1e6:8.2f} us/call")
+    return seconds
+
+
+def main() -> None:
+    toolbox = Toolbox.create([flat, nested])
+
+    for func_name, args_json, number in [
+        ("flat", FLAT_ARGS, 100_000),
+        ("nested", NESTED_ARGS, 5_000),
+    ]:
+        assert toolbox._parse_args(func_name, args_json) == _legacy_parse_args(
+            toolbox, func_name, args_json
+        )
+        legacy = _bench(
+            f"{func_name} (legacy)",
+            lambda: _legacy_parse_args(toolbox, func_name, args_json),
+            number,
+        )
+        current = _bench(
+            f"{func_name} (shared validator)",
+            lambda: toolbox._parse_args(func_name, args_json),
+            number,
+        )
+        print(f"{func_name:<28} {legacy / current:8.2f}x speedup\n")
+
+
+if __name__ == "__main__":
+    main()
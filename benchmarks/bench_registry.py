@@ -0,0 +1,64 @@
+"""Benchmark creating a toolbox and getting its schema JSON, per request.
+
+Compares `Toolbox.create` with a cold process-wide cache (the first request), with a
+warm cache (later requests), and `Toolbox.from_registry` with a precompiled
+`ToolRegistry`, at 10, 100 and 1000 tools.
+
+Run with:
+
+    $ python -m benchmarks.bench_registry
+"""
+
+import timeit
+from typing import Any, Callable
+
+from toolsmith import Toolbox
+from toolsmith.registry import ToolRegistry
+from toolsmith.toolsmith import clear_cache
+
+SIZES = (10, 100, 1000)
+
+
+def _make_tool(i: int) -> Callable[..., Any]:
+    def tool(query: str, limit: int = 10, regex: bool = False) -> str:
+        return query
+
+    tool.__name__ = tool.__qualname__ = f"tool_{i}"
+    tool.__doc__ = f"Tool number {i}."
+    return tool
+
+
+def _time(func: Callable[[], Any], number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    print(f"{'tools':>6} {'cold create':>14} {'warm create':>14} {'registry':>14}")
+    for size in SIZES:
+        tools = [_make_tool(i) for i in range(size)]
+        names = [tool.__name__ for tool in tools]
+        registry = ToolRegistry(tools)
+        number = max(1, 10_000 // size)
+
+        def cold() -> bytes:
+            clear_cache()
+            return Toolbox.create(tools).get_schema_json()
+
+        def warm() -> bytes:
+            return Toolbox.create(tools).get_schema_json()
+
+        def from_registry() -> bytes:
+            return Toolbox.from_registry(registry, names).get_schema_json()
+
+        assert warm() == from_registry()
+        cold_time = _time(cold, max(1, number // 100))
+        warm_time = _time(warm, number)
+        registry_time = _time(from_registry, number)
+        print(
+            f"{size:>6} {cold_time * 1e6:>11.1f} us {warm_time * 1e6:>11.1f} us "
+            f"{registry_time * 1e6:>11.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
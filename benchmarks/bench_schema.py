@@ -0,0 +1,152 @@
+"""Track schema-build time for large synthetic tools.
+
+For each synthetic tool, reports:
+
+- the end-to-end `func_to_schema` time, with the process-wide cache cleared
+- the post-processing time of the previous two recursive passes (`_strip_title`
+  followed by `_validate`) against the current fused iterative pass, on the same
+  schema returned by `pydantic_function_tool`
+
+Run with:
+
+    $ python -m benchmarks.bench_schema
+"""
+
+import copy
+import inspect
+import sys
+import timeit
+from typing import Any, Callable, Union
+
+from openai import pydantic_function_tool
+from pydantic import BaseModel, Field, create_model
+
+from toolsmith.toolsmith import (
+    _strip_title_and_validate,
+    _validate_node,
+    clear_cache,
+    func_to_pydantic,
+    func_to_schema,
+)
+
+
+def _make_tool(name: str, params: dict[str, Any]) -> Callable[..., str]:
+    def tool(**kwargs: Any) -> str:
+        return ""
+
+    tool.__name__ = name
+    tool.__signature__ = inspect.Signature(  # type: ignore[attr-defined]
+        [
+            inspect.Parameter(k, inspect.Parameter.KEYWORD_ONLY, annotation=v)
+            for k, v in params.items()
+        ]
+    )
+    tool.__annotations__ = dict(params)
+    return tool
+
+
+def deep_tool(depth: int) -> Callable[..., str]:
+    """A chain of `depth` nested models."""
+    model: type[BaseModel] = create_model("Leaf", value=(str, ...))
+    for i in range(depth):
+        model = create_model(f"Level{i}", child=(model, ...), label=(str, ...))
+    return _make_tool(f"deep_{depth}", {"root": model})
+
+
+def wide_tool(width: int) -> Callable[..., str]:
+    """A single model with `width` fields of mixed types."""
+    types = [str, int, bool, list[str], Union[str, None]]
+    model = create_model(
+        "Wide",
+        **{f"field_{i}": (types[i % len(types)], ...) for i in range(width)},
+    )
+    return _make_tool(f"wide_{width}", {"value": model})
+
+
+def many_defs_tool(count: int) -> Callable[..., str]:
+    """`count` models, each referencing a shared model several times with field
+    descriptions, which makes the strict-mode conversion inline the shared `$defs`."""
+    shared = create_model(
+        "Shared", a=(str, ...), b=(int, ...), c=(list[str], ...), d=(bool, ...)
+    )
+    models = [
+        create_model(
+            f"Model{i}",
+            **{
+                f"ref_{j}": (shared, Field(..., description=f"Reference {j}"))
+                for j in range(3)
+            },
+        )
+        for i in range(count)
+    ]
+    return _make_tool(
+        f"many_defs_{count}", {f"model_{i}": model for i, model in enumerate(models)}
+    )
+
+
+def _legacy_strip_title(schema: dict[str, Any]) -> dict[str, Any]:
+    if "title" in schema:
+        del schema["title"]
+    for key, value in schema.items():
+        if isinstance(value, dict):
+            _legacy_strip_title(value)
+    return schema
+
+
+def _legacy_validate(fn_name: str, parent_key: str, schema: dict[str, Any]) -> None:
+    _validate_node(fn_name, parent_key, schema)
+    for key, value in schema.items():
+        if isinstance(value, dict):
+            _legacy_validate(fn_name, key, value)
+
+
+def _legacy_post_process(fn_name: str, parameters: dict[str, Any]) -> None:
+    _legacy_validate(fn_name, "parameters", _legacy_strip_title(parameters))
+
+
+def _time_ms(fn: Callable[[], Any], repeat: int = 5) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def _bench_post_process(
+    post_process: Callable[[str, dict[str, Any]], None],
+    name: str,
+    parameters: dict[str, Any],
+) -> float:
+    copies = [copy.deepcopy(parameters) for _ in range(5)]
+    return min(_time_ms(lambda: post_process(name, p), repeat=1) for p in copies)
+
+
+def main() -> None:
+    # Pydantic's JSON schema generation recurses deeply for nested models
+    sys.setrecursionlimit(10_000)
+    tools = [
+        deep_tool(25),
+        deep_tool(100),
+        wide_tool(100),
+        wide_tool(1000),
+        many_defs_tool(50),
+        many_defs_tool(300),
+    ]
+    print(f"{'tool':<16} {'func_to_schema':>15} {'two passes':>12} {'fused':>10}")
+    for tool in tools:
+
+        def build() -> None:
+            clear_cache()
+            func_to_schema(tool)
+
+        parameters = pydantic_function_tool(
+            func_to_pydantic(tool), name=tool.__name__, description=""
+        )["function"]["parameters"]
+        legacy = _bench_post_process(_legacy_post_process, tool.__name__, parameters)
+        fused = _bench_post_process(
+            _strip_title_and_validate, tool.__name__, parameters
+        )
+        print(
+            f"{tool.__name__:<16} {_time_ms(build):12.2f} ms"
+            f" {legacy:9.2f} ms {fused:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
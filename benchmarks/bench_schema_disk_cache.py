@@ -0,0 +1,81 @@
+"""Measure worker warm-up: getting the schemas of many tools in a fresh process.
+
+Simulates a new process by clearing the process-wide cache, then times
+`func_to_schema_json` for every tool without the on-disk schema cache, with a
+cold on-disk cache (generating and writing every schema), and with a warm one.
+
+Run with:
+
+    $ python -m benchmarks.bench_schema_disk_cache
+"""
+
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Literal
+
+from pydantic import BaseModel, Field
+
+from toolsmith.toolsmith import clear_cache, func_to_schema_json, set_schema_cache_dir
+
+N = 200
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+    country: str = Field(description="Two-letter country code")
+
+
+class Filters(BaseModel):
+    status: Literal["active", "inactive"] = "active"
+    tags: list[str] = []
+    address: Address | None = None
+
+
+def _make_tool(i: int) -> Callable[..., Any]:
+    def tool(query: str, filters: Filters, limit: int = 10) -> str:
+        return query
+
+    tool.__name__ = f"tool_{i}"
+    tool.__qualname__ = f"_make_tool.tool_{i}"
+    tool.__doc__ = f"Tool number {i}."
+    return tool
+
+
+TOOLS = [_make_tool(i) for i in range(N)]
+
+
+def _warm_up() -> None:
+    clear_cache()
+    for tool in TOOLS:
+        func_to_schema_json(tool)
+
+
+def main() -> None:
+    _warm_up()  # import the OpenAI SDK up front
+
+    set_schema_cache_dir(None)
+    no_cache = min(timeit.repeat(_warm_up, number=1, repeat=3))
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        def cold() -> None:
+            for path in Path(directory).iterdir():
+                path.unlink()
+            _warm_up()
+
+        set_schema_cache_dir(directory)
+        cold_cache = min(timeit.repeat(cold, number=1, repeat=3))
+        warm_cache = min(timeit.repeat(_warm_up, number=1, repeat=3))
+        set_schema_cache_dir(None)
+
+    print(f"{N} tools")
+    print(f"{'no disk cache':<16} {no_cache * 1e3:8.1f} ms")
+    print(f"{'cold disk cache':<16} {cold_cache * 1e3:8.1f} ms")
+    print(f"{'warm disk cache':<16} {warm_cache * 1e3:8.1f} ms")
+    print(f"{'speedup':<16} {no_cache / warm_cache:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare parsing a large list argument eagerly (`list[Animal]`) with streaming it
+(`Iterator[Animal]`).
+
+Reports the time to parse the tool call and consume every item, and the peak memory
+allocated while doing so, for arguments with 10,000 items.
+
+Run with:
+
+    $ python -m benchmarks.bench_streamed_args
+"""
+
+import json
+import timeit
+import tracemalloc
+from typing import Any, Callable, Iterable, Iterator
+
+from pydantic import BaseModel
+
+from toolsmith import Toolbox
+
+N = 10_000
+
+
+class Animal(BaseModel):
+    name: str
+    species: str
+    age: int
+    notes: str
+
+
+def add_many_to_zoo(animals: list[Animal]) -> int:
+    return _count(animals)
+
+
+def stream_to_zoo(animals: Iterator[Animal]) -> int:
+    return _count(animals)
+
+
+def _count(animals: Iterable[Animal]) -> int:
+    return sum(1 for _ in animals)
+
+
+ARGS_JSON = json.dumps(
+    {
+        "animals": [
+            {"name": f"animal {i}", "species": "cat", "age": i % 20, "notes": "x" * 100}
+            for i in range(N)
+        ]
+    }
+)
+
+
+def _bench(label: str, func: Callable[..., Any]) -> None:
+    toolbox = Toolbox.create([func])
+    name = func.__name__
+
+    def run() -> Any:
+        return toolbox._parse_invocation("call_1", name, ARGS_JSON).execute()
+
+    assert run() == N
+    seconds = min(timeit.repeat(run, number=1, repeat=5))
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<10} {seconds * 1e3:8.1f} ms {peak / 1e6:8.2f} MB peak")
+
+
+def main() -> None:
+    print(f"{N} items, {len(ARGS_JSON) / 1e6:.1f} MB of arguments JSON")
+    _bench("eager", add_many_to_zoo)
+    _bench("streamed", stream_to_zoo)
+
+
+if __name__ == "__main__":
+    main()
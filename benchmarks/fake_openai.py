@@ -0,0 +1,297 @@
+"""Synthetic tool calls and a local stand-in for the OpenAI chat completions API.
+
+Used by `benchmarks.load_test` to measure toolsmith without calling the real API. The
+server answers every `POST /v1/chat/completions` with a round of tool calls from a
+callback, either as a single response or, with `"stream": true`, as server-sent events
+that split the arguments into small deltas like the real API does:
+
+    with FakeOpenAIServer(lambda request: tool_call_round("scalar", 8, 10)) as server:
+        client = openai.OpenAI(base_url=server.base_url, api_key="fake")
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterator
+
+from pydantic import BaseModel
+
+# Characters of arguments JSON sent per streamed delta
+STREAM_DELTA_CHARS = 32
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+    country: str
+
+
+class LineItem(BaseModel):
+    sku: str
+    quantity: int
+    price: float
+
+
+class Order(BaseModel):
+    customer: str
+    address: Address
+    items: list[LineItem]
+    gift: bool = False
+
+
+class Row(BaseModel):
+    id: int
+    name: str
+    score: float
+
+
+def _scalar_tool(is_async: bool) -> Callable[..., Any]:
+    if is_async:
+
+        async def async_tool(query: str, limit: int = 10) -> str:
+            """Search for a query."""
+            return f"{limit} results for {query}"
+
+        return async_tool
+
+    def tool(query: str, limit: int = 10) -> str:
+        """Search for a query."""
+        return f"{limit} results for {query}"
+
+    return tool
+
+
+def _nested_tool(is_async: bool) -> Callable[..., Any]:
+    if is_async:
+
+        async def async_tool(order: Order) -> dict[str, Any]:
+            """Place an order."""
+            return {"customer": order.customer, "items": len(order.items)}
+
+        return async_tool
+
+    def tool(order: Order) -> dict[str, Any]:
+        """Place an order."""
+        return {"customer": order.customer, "items": len(order.items)}
+
+    return tool
+
+
+def _large_tool(is_async: bool) -> Callable[..., Any]:
+    if is_async:
+
+        async def async_tool(rows: list[Row]) -> int:
+            """Import rows."""
+            return len(rows)
+
+        return async_tool
+
+    def tool(rows: list[Row]) -> int:
+        """Import rows."""
+        return len(rows)
+
+    return tool
+
+
+def _scalar_args(rng: random.Random) -> dict[str, Any]:
+    return {"query": f"query {rng.randrange(1000)}", "limit": rng.randrange(1, 50)}
+
+
+def _nested_args(rng: random.Random) -> dict[str, Any]:
+    return {
+        "order": {
+            "customer": f"customer {rng.randrange(1000)}",
+            "address": {"street": "1 Main St", "city": "Springfield", "country": "US"},
+            "items": [
+                {"sku": f"sku-{i}", "quantity": rng.randrange(1, 5), "price": 9.99}
+                for i in range(rng.randrange(1, 6))
+            ],
+        }
+    }
+
+
+def _large_args(rng: random.Random) -> dict[str, Any]:
+    return {
+        "rows": [
+            {"id": i, "name": f"row {i}", "score": round(rng.random(), 4)}
+            for i in range(500)
+        ]
+    }
+
+
+# Argument shapes: a factory for a tool taking them, and a generator of arguments
+SHAPES: dict[
+    str,
+    tuple[
+        Callable[[bool], Callable[..., Any]],
+        Callable[[random.Random], dict[str, Any]],
+    ],
+] = {
+    "scalar": (_scalar_tool, _scalar_args),
+    "nested": (_nested_tool, _nested_args),
+    "large": (_large_tool, _large_args),
+}
+
+
+def make_tools(shape: str, count: int, is_async: bool = False) -> list[Any]:
+    """Create `count` distinct tools named `{shape}_{i}` that take the shape's
+    arguments."""
+    tools = []
+    for i in range(count):
+        tool = SHAPES[shape][0](is_async)
+        tool.__name__ = tool.__qualname__ = f"{shape}_{i}"
+        tools.append(tool)
+    return tools
+
+
+def tool_call_round(
+    shape: str, fan_out: int, tools: int, seed: int = 0
+) -> list[dict[str, Any]]:
+    """Generate the tool calls of one assistant message, as `ChatCompletionMessageToolCall`
+    dicts calling random tools from `make_tools(shape, tools)`."""
+    rng = random.Random(seed)
+    make_args = SHAPES[shape][1]
+    return [
+        {
+            "id": f"call_{seed}_{i}",
+            "type": "function",
+            "function": {
+                "name": f"{shape}_{rng.randrange(tools)}",
+                "arguments": json.dumps(make_args(rng)),
+            },
+        }
+        for i in range(fan_out)
+    ]
+
+
+def _completion(tool_calls: list[dict[str, Any]], model: str) -> dict[str, Any]:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": tool_calls,
+                },
+                "finish_reason": "tool_calls",
+            }
+        ],
+    }
+
+
+def _chunks(tool_calls: list[dict[str, Any]], model: str) -> Iterator[dict[str, Any]]:
+    def chunk(delta: dict[str, Any], finish_reason: Any = None) -> dict[str, Any]:
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    yield chunk({"role": "assistant", "content": None})
+    for index, call in enumerate(tool_calls):
+        arguments = call["function"]["arguments"]
+        yield chunk(
+            {
+                "tool_calls": [
+                    {
+                        "index": index,
+                        "id": call["id"],
+                        "type": "function",
+                        "function": {"name": call["function"]["name"], "arguments": ""},
+                    }
+                ]
+            }
+        )
+        for start in range(0, len(arguments), STREAM_DELTA_CHARS):
+            yield chunk(
+                {
+                    "tool_calls": [
+                        {
+                            "index": index,
+                            "function": {
+                                "arguments": arguments[
+                                    start : start + STREAM_DELTA_CHARS
+                                ]
+                            },
+                        }
+                    ]
+                }
+            )
+    yield chunk({}, "tool_calls")
+
+
+class FakeOpenAIServer:
+    """A local chat completions server on a background thread.
+
+    Args:
+        respond: Called with each decoded request body, returns the tool calls to
+            answer with
+        port: Port to listen on. `0` picks a free one.
+    """
+
+    def __init__(
+        self,
+        respond: Callable[[dict[str, Any]], list[dict[str, Any]]],
+        port: int = 0,
+    ):
+        handler = type("_Handler", (_Handler,), {"respond": staticmethod(respond)})
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections alive, like the real API
+    # Headers and body are written separately, which Nagle's algorithm would delay
+    disable_nagle_algorithm = True
+    respond: Callable[[dict[str, Any]], list[dict[str, Any]]]
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send(404, "application/json", b'{"error": {"message": "Not found"}}')
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        tool_calls = self.respond(request)
+        model = request.get("model", "fake")
+        if request.get("stream"):
+            body = "".join(
+                f"data: {json.dumps(chunk)}\n\n" for chunk in _chunks(tool_calls, model)
+            )
+            self._send(200, "text/event-stream", (body + "data: [DONE]\n\n").encode())
+        else:
+            body = json.dumps(_completion(tool_calls, model))
+            self._send(200, "application/json", body.encode())
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
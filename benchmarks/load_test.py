@@ -0,0 +1,342 @@
+"""Load test `Toolbox` and `AsyncToolbox` without calling the OpenAI API.
+
+Runs rounds of synthetic tool calls (one assistant message each) for every combination
+of toolbox kind, argument shape, fan-out (tool calls per message) and number of tools
+in the toolbox, and reports calls/sec, p50/p99 latency per round and peak memory
+allocated per round.
+
+By default tool calls are executed directly, so the numbers are toolsmith's own
+overhead. With `--server`, each round is also requested from a local fake chat
+completions server through the OpenAI client, with `tools=toolbox.get_schema()`, and
+the `async-stream` kind executes the streamed response with
+`execute_streamed_tool_calls`.
+
+Results can be saved as JSON and compared against a previous run, e.g. before and
+after upgrading a dependency. The comparison exits with status 1 if any scenario's
+calls/sec or p50 latency regressed by more than `--threshold`. p99 latency is reported
+too, but is too noisy between runs to fail on:
+
+    $ python -m benchmarks.load_test --output before.json
+    $ python -m benchmarks.load_test --compare before.json
+    $ python -m benchmarks.load_test --server --shapes scalar --fan-outs 1 8
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from importlib import metadata
+from typing import Any, Awaitable, Callable, NamedTuple, Union
+
+import openai
+from openai.types.chat import ChatCompletionMessageToolCall
+
+from benchmarks.fake_openai import SHAPES, FakeOpenAIServer, make_tools, tool_call_round
+from toolsmith import AsyncToolbox, Toolbox
+
+KINDS = ("sync", "async", "async-stream")
+FAN_OUTS = (1, 8, 32)
+TOOL_COUNTS = (10, 100)
+# Distinct rounds of tool calls cycled through in each scenario
+ROUNDS = 16
+WARMUP_ROUNDS = 3
+MIN_ROUNDS = 20
+RESULTS_FORMAT = 1
+
+
+class Scenario(NamedTuple):
+    kind: str
+    shape: str
+    fan_out: int
+    tools: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}/{self.shape}/fan{self.fan_out}/tools{self.tools}"
+
+
+class Result(NamedTuple):
+    scenario: str
+    rounds: int
+    calls_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    peak_kib: float
+
+
+class _Responder:
+    """Answers the fake server's requests with the current scenario's rounds."""
+
+    def __init__(self) -> None:
+        self.rounds: Any = iter(())
+
+    def __call__(self, request: dict[str, Any]) -> list[dict[str, Any]]:
+        return next(self.rounds)
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    return sorted_values[
+        min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    ]
+
+
+def _measure(
+    scenario: Scenario, run_round: Callable[[], Any], duration: float
+) -> Result:
+    for _ in range(WARMUP_ROUNDS):
+        run_round()
+
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < MIN_ROUNDS or time.perf_counter() - start < duration:
+        round_start = time.perf_counter()
+        run_round()
+        latencies.append(time.perf_counter() - round_start)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    run_round()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return Result(
+        scenario=scenario.key,
+        rounds=len(latencies),
+        calls_per_sec=len(latencies) * scenario.fan_out / elapsed,
+        p50_ms=_percentile(latencies, 0.5) * 1e3,
+        p99_ms=_percentile(latencies, 0.99) * 1e3,
+        peak_kib=peak / 1024,
+    )
+
+
+def _check_results(results: list[Any], fan_out: int) -> None:
+    assert len(results) == fan_out
+    for result in results:
+        assert not str(result["content"]).startswith("Error"), result
+
+
+def _run_sync(
+    scenario: Scenario,
+    rounds: list[list[dict[str, Any]]],
+    duration: float,
+    server: Union[FakeOpenAIServer, None],
+) -> Result:
+    toolbox = Toolbox.create(make_tools(scenario.shape, scenario.tools))
+    if server is None:
+        tool_calls = itertools.cycle(
+            [[ChatCompletionMessageToolCall(**call) for call in r] for r in rounds]
+        )
+
+        def run_round() -> None:
+            _check_results(
+                toolbox.execute_tool_calls(next(tool_calls)), scenario.fan_out
+            )
+
+        return _measure(scenario, run_round, duration)
+
+    client = openai.OpenAI(base_url=server.base_url, api_key="fake")
+    schema = toolbox.get_schema()
+
+    def run_round_with_client() -> None:
+        response = client.chat.completions.create(
+            model="fake", messages=[{"role": "user", "content": "go"}], tools=schema
+        )
+        tool_calls = response.choices[0].message.tool_calls or []
+        _check_results(toolbox.execute_tool_calls(tool_calls), scenario.fan_out)
+
+    with client:
+        return _measure(scenario, run_round_with_client, duration)
+
+
+def _run_async(
+    scenario: Scenario,
+    rounds: list[list[dict[str, Any]]],
+    duration: float,
+    server: Union[FakeOpenAIServer, None],
+) -> Result:
+    toolbox = AsyncToolbox.create(make_tools(scenario.shape, scenario.tools, True))
+    loop = asyncio.new_event_loop()
+
+    def measure(run_round: Callable[[], Awaitable[Any]]) -> Result:
+        return _measure(
+            scenario, lambda: loop.run_until_complete(run_round()), duration
+        )
+
+    try:
+        if server is None:
+            tool_calls = itertools.cycle(
+                [[ChatCompletionMessageToolCall(**call) for call in r] for r in rounds]
+            )
+
+            async def run_round() -> None:
+                results = await toolbox.execute_tool_calls(next(tool_calls))
+                _check_results(results, scenario.fan_out)
+
+            return measure(run_round)
+
+        client = openai.AsyncOpenAI(base_url=server.base_url, api_key="fake")
+        schema = toolbox.get_schema()
+        messages: Any = [{"role": "user", "content": "go"}]
+
+        async def run_round_with_client() -> None:
+            if scenario.kind == "async-stream":
+                chunks = await client.chat.completions.create(
+                    model="fake", messages=messages, tools=schema, stream=True
+                )
+                results = await toolbox.execute_streamed_tool_calls(chunks)
+            else:
+                response = await client.chat.completions.create(
+                    model="fake", messages=messages, tools=schema
+                )
+                tool_calls = response.choices[0].message.tool_calls or []
+                results = await toolbox.execute_tool_calls(tool_calls)
+            _check_results(results, scenario.fan_out)
+
+        try:
+            return measure(run_round_with_client)
+        finally:
+            loop.run_until_complete(client.close())
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def run_scenarios(
+    scenarios: list[Scenario], duration: float, use_server: bool
+) -> list[Result]:
+    responder = _Responder()
+    server = FakeOpenAIServer(responder) if use_server else None
+    results = []
+    try:
+        if server is not None:
+            server.__enter__()
+        for scenario in scenarios:
+            rounds = [
+                tool_call_round(scenario.shape, scenario.fan_out, scenario.tools, seed)
+                for seed in range(ROUNDS)
+            ]
+            responder.rounds = itertools.cycle(rounds)
+            run = _run_sync if scenario.kind == "sync" else _run_async
+            result = run(scenario, rounds, duration, server)
+            print(
+                f"{result.scenario:<34} {result.calls_per_sec:>12,.0f} "
+                f"{result.p50_ms:>9.3f} {result.p99_ms:>9.3f} {result.peak_kib:>10.1f}",
+                flush=True,
+            )
+            results.append(result)
+    finally:
+        if server is not None:
+            server.__exit__(None, None, None)
+    return results
+
+
+def _environment(use_server: bool, duration: float) -> dict[str, Any]:
+    versions = {}
+    for package in ("toolsmith", "pydantic", "pydantic-core", "openai"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "format": RESULTS_FORMAT,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "versions": versions,
+        "server": use_server,
+        "duration": duration,
+    }
+
+
+def compare(
+    results: list[Result], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Print how each result changed from a baseline run, and return the keys of the
+    scenarios that regressed by more than `threshold` (a fraction)."""
+    previous = {result["scenario"]: result for result in baseline["results"]}
+    regressions = []
+    print(f"\n{'scenario':<34} {'calls/sec':>12} {'p50':>9} {'p99':>9}")
+    for result in results:
+        before = previous.get(result.scenario)
+        if before is None:
+            print(f"{result.scenario:<34} {'new':>12}")
+            continue
+        throughput = result.calls_per_sec / before["calls_per_sec"] - 1
+        p50 = result.p50_ms / before["p50_ms"] - 1
+        p99 = result.p99_ms / before["p99_ms"] - 1
+        regressed = throughput < -threshold or p50 > threshold
+        if regressed:
+            regressions.append(result.scenario)
+        print(
+            f"{result.scenario:<34} {throughput:>+12.1%} {p50:>+9.1%} {p99:>+9.1%}"
+            + ("  REGRESSION" if regressed else "")
+        )
+    return regressions
+
+
+def main(argv: Union[list[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load_test", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--kinds", nargs="+", choices=KINDS)
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    parser.add_argument("--fan-outs", nargs="+", type=int, default=FAN_OUTS)
+    parser.add_argument("--tools", nargs="+", type=int, default=TOOL_COUNTS)
+    parser.add_argument(
+        "--duration", type=float, default=1.0, help="seconds to run each scenario"
+    )
+    parser.add_argument(
+        "--server", action="store_true", help="request tool calls from a fake server"
+    )
+    parser.add_argument("--output", help="save results as JSON to this file")
+    parser.add_argument("--compare", help="compare with results saved by --output")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="fractional slowdown reported as a regression (default: 0.15)",
+    )
+    args = parser.parse_args(argv)
+
+    kinds = args.kinds or (KINDS if args.server else ("sync", "async"))
+    if "async-stream" in kinds and not args.server:
+        parser.error("the `async-stream` kind requires --server")
+    scenarios = [
+        Scenario(*combination)
+        for combination in itertools.product(
+            kinds, args.shapes, args.fan_outs, args.tools
+        )
+    ]
+
+    print(
+        f"{'scenario':<34} {'calls/sec':>12} {'p50 ms':>9} {'p99 ms':>9} "
+        f"{'peak KiB':>10}"
+    )
+    results = run_scenarios(scenarios, args.duration, args.server)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "environment": _environment(args.server, args.duration),
+                    "results": [result._asdict() for result in results],
+                },
+                f,
+                indent=2,
+            )
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["environment"]["server"] != args.server:
+            print("warning: comparing runs with and without --server")
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
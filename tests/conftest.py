@@ -0,0 +1,39 @@
+from typing import Callable
+
+import pytest
+from openai.types.chat import ChatCompletionMessageToolCall
+from openai.types.chat.chat_completion_chunk import (
+    ChoiceDeltaToolCall,
+    ChoiceDeltaToolCallFunction,
+)
+from openai.types.chat.chat_completion_message_tool_call import Function
+
+
+def _tool_call(id: str, name: str, arguments: str) -> ChatCompletionMessageToolCall:
+    return ChatCompletionMessageToolCall(
+        id=id, type="function", function=Function(name=name, arguments=arguments)
+    )
+
+
+def _tool_call_delta(
+    index: int, id: str = "", name: str = "", arguments: str = ""
+) -> ChoiceDeltaToolCall:
+    return ChoiceDeltaToolCall(
+        index=index,
+        id=id or None,
+        type="function" if id else None,
+        function=ChoiceDeltaToolCallFunction(name=name or None, arguments=arguments),
+    )
+
+
+@pytest.fixture
+def tool_call() -> Callable[[str, str, str], ChatCompletionMessageToolCall]:
+    """Builds a tool call from its ID, function name and arguments JSON."""
+    return _tool_call
+
+
+@pytest.fixture
+def tool_call_delta() -> Callable[..., ChoiceDeltaToolCall]:
+    """Builds a streamed tool call delta. Later deltas of the same tool call leave out
+    its ID and name."""
+    return _tool_call_delta
@@ -1,9 +1,15 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Awaitable, Callable
 
 import openai
-from pydantic import BaseModel
+import pytest
+from openai.types.chat import ChatCompletionChunk
+from openai.types.chat.chat_completion_chunk import ChoiceDeltaToolCall
+from pydantic import BaseModel, ValidationError
 
-from toolsmith import AsyncToolbox
+from toolsmith import AsyncToolbox, ToolCallsError
 
 
 async def _run_test(prompt: str, fn: Callable[..., Awaitable[str]]):
@@ -85,3 +91,191 @@ async def test_parallel():
     results.sort(key=lambda x: str(x["content"]))
     assert results[0]["content"] == "User Jane created with age 25"
     assert results[1]["content"] == "User John created with age 30"
+
+
+async def test_concurrency_limits(tool_call):
+    running = {"query_db": 0, "fetch_url": 0, "total": 0}
+    peak = dict(running)
+
+    def _make_tool(name: str) -> Callable[[int], Awaitable[str]]:
+        async def tool(i: int) -> str:
+            running[name] += 1
+            running["total"] += 1
+            peak[name] = max(peak[name], running[name])
+            peak["total"] = max(peak["total"], running["total"])
+            await asyncio.sleep(0.01)
+            running[name] -= 1
+            running["total"] -= 1
+            return str(i)
+
+        tool.__name__ = name
+        return tool
+
+    toolbox = AsyncToolbox.create(
+        [_make_tool("query_db"), _make_tool("fetch_url")],
+        max_concurrency=4,
+        concurrency_limits={"query_db": 2},
+    )
+    tool_calls = [
+        tool_call(f"call_{i}", name, f'{{"i": {i}}}')
+        for i in range(10)
+        for name in ("query_db", "fetch_url")
+    ]
+
+    results = await toolbox.execute_tool_calls(tool_calls)
+
+    assert [r["tool_call_id"] for r in results] == [tc.id for tc in tool_calls]
+    assert peak["query_db"] == 2
+    assert peak["total"] == 4
+
+
+async def test_timeout_does_not_cancel_siblings(tool_call):
+    async def hang() -> str:
+        await asyncio.sleep(10)
+        return "never"
+
+    async def echo(text: str) -> str:
+        await asyncio.sleep(0.05)
+        return text
+
+    toolbox = AsyncToolbox.create([hang, echo], timeout=1, timeouts={"hang": 0.01})
+    results = await toolbox.execute_tool_calls(
+        [
+            tool_call("call_1", "hang", "{}"),
+            tool_call("call_2", "echo", '{"text": "hi"}'),
+        ]
+    )
+
+    assert results == [
+        {
+            "role": "tool",
+            "tool_call_id": "call_1",
+            "content": "Error: `hang` timed out after 0.01 seconds",
+        },
+        {"role": "tool", "tool_call_id": "call_2", "content": "hi"},
+    ]
+
+
+def test_unknown_function_option():
+    async def echo(text: str) -> str:
+        return text
+
+    with pytest.raises(ValidationError, match="not in the toolbox"):
+        AsyncToolbox.create([echo], concurrency_limits={"missing": 1})
+
+
+async def test_sync_functions_run_in_parallel_with_async(tool_call):
+    def blocking_lookup(key: str) -> str:
+        time.sleep(0.2)
+        return f"sync {key}"
+
+    async def async_lookup(key: str) -> str:
+        await asyncio.sleep(0.2)
+        return f"async {key}"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        toolbox = AsyncToolbox.create(
+            [blocking_lookup, async_lookup], executor=executor
+        )
+        start = time.perf_counter()
+        results = await toolbox.execute_tool_calls(
+            [
+                tool_call("call_1", "blocking_lookup", '{"key": "a"}'),
+                tool_call("call_2", "blocking_lookup", '{"key": "b"}'),
+                tool_call("call_3", "async_lookup", '{"key": "c"}'),
+            ]
+        )
+        elapsed = time.perf_counter() - start
+
+    assert [r["content"] for r in results] == ["sync a", "sync b", "async c"]
+    assert elapsed < 0.35
+
+
+async def test_stream_tool_calls_starts_before_stream_ends(tool_call_delta):
+    started: list[str] = []
+
+    async def echo(text: str) -> str:
+        started.append(text)
+        return text
+
+    toolbox = AsyncToolbox.create([echo])
+    stream = toolbox.stream_tool_calls()
+
+    stream.feed([tool_call_delta(0, id="call_1", name="echo")])
+    stream.feed([tool_call_delta(0, arguments='{"text": "a {\\')])
+    stream.feed([tool_call_delta(0, arguments='"} "}')])
+    stream.feed([tool_call_delta(1, id="call_2", name="echo", arguments='{"te')])
+    await asyncio.sleep(0)
+    assert started == ['a {"} ']
+
+    stream.feed([tool_call_delta(1, arguments='xt": "b"}')])
+    stream.feed(None)
+    results = await stream.results()
+
+    assert results == [
+        {"role": "tool", "tool_call_id": "call_1", "content": 'a {"} '},
+        {"role": "tool", "tool_call_id": "call_2", "content": "b"},
+    ]
+
+
+async def test_stream_rejects_oversized_arguments_early(tool_call_delta):
+    async def echo(text: str) -> str:
+        return text
+
+    toolbox = AsyncToolbox.create([echo], max_args_chars=20)
+    stream = toolbox.stream_tool_calls()
+    stream.feed([tool_call_delta(0, id="call_1", name="echo", arguments='{"text": "')])
+
+    with pytest.raises(ValueError, match="`echo`: arguments are longer"):
+        stream.feed([tool_call_delta(0, arguments="x" * 20)])
+
+
+async def test_execute_streamed_tool_calls(tool_call_delta):
+    async def add(a: int, b: int) -> str:
+        return str(a + b)
+
+    def _chunk(delta: ChoiceDeltaToolCall) -> ChatCompletionChunk:
+        return ChatCompletionChunk(
+            id="chunk",
+            object="chat.completion.chunk",
+            created=0,
+            model="gpt-4o-mini",
+            choices=[{"index": 0, "delta": {"tool_calls": [delta]}}],
+        )
+
+    async def _chunks():
+        yield _chunk(tool_call_delta(0, id="call_1", name="add", arguments='{"a": 1,'))
+        yield _chunk(tool_call_delta(0, arguments=' "b": 2}'))
+
+    toolbox = AsyncToolbox.create([add])
+    results = await toolbox.execute_streamed_tool_calls(_chunks())
+
+    assert results == [{"role": "tool", "tool_call_id": "call_1", "content": "3"}]
+
+
+async def test_execute_tool_calls_as_completed(tool_call):
+    async def sleep_echo(text: str, delay: float) -> str:
+        await asyncio.sleep(delay)
+        if text == "boom":
+            raise RuntimeError(text)
+        return text
+
+    toolbox = AsyncToolbox.create([sleep_echo])
+    received = []
+    with pytest.raises(ToolCallsError) as exc_info:
+        async for result in toolbox.execute_tool_calls_as_completed(
+            [
+                tool_call("call_1", "sleep_echo", '{"text": "slow", "delay": 0.1}'),
+                tool_call("call_2", "sleep_echo", '{"text": "boom", "delay": 0}'),
+                tool_call("call_3", "sleep_echo", '{"text": "fast", "delay": 0.01}'),
+            ]
+        ):
+            received.append(result["content"])
+
+    assert received == ["fast", "slow"]
+    assert list(exc_info.value.errors) == ["call_2"]
+    assert [r and r["content"] for r in exc_info.value.results] == [
+        "slow",
+        None,
+        "fast",
+    ]
@@ -0,0 +1,137 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from toolsmith import AsyncToolbox, ToolCallsError, Toolbox, batched, cached
+
+
+def test_batched_implementation_is_called_once_per_chunk(tool_call):
+    batches = []
+
+    def get_users_batch(calls: list[dict[str, Any]]) -> list[str]:
+        batches.append([call["id"] for call in calls])
+        return [f"user {call['id']}" for call in calls]
+
+    @batched(get_users_batch, max_batch_size=2)
+    def get_user(id: str) -> str:
+        raise AssertionError("should be batched")
+
+    def echo(text: str) -> str:
+        return text
+
+    toolbox = Toolbox.create([get_user, echo])
+    results = toolbox.execute_batch(
+        {
+            "a": [
+                tool_call("call_1", "get_user", '{"id": "1"}'),
+                tool_call("call_2", "echo", '{"text": "hi"}'),
+                tool_call("call_3", "get_user", '{"id": "2"}'),
+            ],
+            "b": [tool_call("call_1", "get_user", '{"id": "3"}')],
+            "c": [],
+        }
+    )
+
+    assert batches == [["1", "2"], ["3"]]
+    assert {
+        key: [r["content"] for r in messages] for key, messages in results.items()
+    } == {
+        "a": ["user 1", "hi", "user 2"],
+        "b": ["user 3"],
+        "c": [],
+    }
+    assert [r["tool_call_id"] for r in results["a"]] == ["call_1", "call_2", "call_3"]
+
+
+def test_identical_cached_calls_are_coalesced_across_conversations(tool_call):
+    calls = []
+
+    @cached()
+    def lookup(key: str) -> str:
+        calls.append(key)
+        return key.upper()
+
+    toolbox = Toolbox.create([lookup], max_workers=2)
+    results = toolbox.execute_batch(
+        {i: [tool_call(f"call_{i}", "lookup", '{"key": "a"}')] for i in range(5)}
+    )
+
+    assert calls == ["a"]
+    assert [messages[0]["content"] for messages in results.values()] == ["A"] * 5
+
+
+def test_batch_errors_are_collected(tool_call):
+    def divide(a: float, b: float) -> float:
+        return a / b
+
+    toolbox = Toolbox.create([divide])
+    with pytest.raises(ToolCallsError) as exc_info:
+        toolbox.execute_batch(
+            {
+                "a": [tool_call("call_1", "divide", '{"a": 1, "b": 0}')],
+                "b": [tool_call("call_2", "divide", '{"a": 4, "b": 2}')],
+            }
+        )
+
+    assert list(exc_info.value.errors) == ["call_1"]
+    assert exc_info.value.results[0] is None
+    assert exc_info.value.results[1]["content"] == "2.0"
+
+
+async def test_async_batch_shares_concurrency_budget(tool_call):
+    running = 0
+    peak = 0
+
+    async def work(i: int) -> str:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return str(i)
+
+    toolbox = AsyncToolbox.create([work], max_concurrency=3)
+    results = await toolbox.execute_batch(
+        {
+            conversation: [
+                tool_call(f"call_{i}", "work", f'{{"i": {conversation * 10 + i}}}')
+                for i in range(3)
+            ]
+            for conversation in range(4)
+        }
+    )
+
+    assert peak == 3
+    assert [r["content"] for r in results[2]] == ["20", "21", "22"]
+
+
+async def test_async_batched_implementation_with_cache(tool_call):
+    batches = []
+
+    async def get_users_batch(calls: list[dict[str, Any]]) -> list[dict[str, str]]:
+        batches.append([call["id"] for call in calls])
+        return [{"name": f"user {call['id']}"} for call in calls]
+
+    @cached()
+    @batched(get_users_batch)
+    async def get_user(id: str) -> dict[str, str]:
+        raise AssertionError("should be batched")
+
+    toolbox = AsyncToolbox.create([get_user])
+    tool_calls = {
+        "a": [tool_call("call_1", "get_user", '{"id": "1"}')],
+        "b": [
+            tool_call("call_2", "get_user", '{"id": "1"}'),
+            tool_call("call_3", "get_user", '{"id": "2"}'),
+        ],
+    }
+    results = await toolbox.execute_batch(tool_calls)
+    # Cached results are reused rather than batched again
+    await toolbox.execute_batch(tool_calls)
+
+    assert batches == [["1", "2"]]
+    assert [r["content"] for r in results["b"]] == [
+        '{"name":"user 1"}',
+        '{"name":"user 2"}',
+    ]
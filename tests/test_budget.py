@@ -0,0 +1,148 @@
+import json
+
+from toolsmith import AsyncToolbox, ResultBudget, Toolbox
+from toolsmith.budget import estimate_tokens
+
+
+def list_rows(count: int) -> list[dict[str, int]]:
+    return [{"id": i, "value": i * 7} for i in range(count)]
+
+
+def get_status() -> str:
+    return "ok"
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Hello, world! How are you today?") == 11
+    assert estimate_tokens('{"id": 1, "name": "user 1"}') == 14
+    assert estimate_tokens("日本語") == 3
+
+    # Long texts are estimated from samples
+    rows = json.dumps(list_rows(5000))
+    exact = sum(
+        estimate_tokens(rows[start : start + 10_000])
+        for start in range(0, len(rows), 10_000)
+    )
+    assert abs(estimate_tokens(rows) - exact) / exact < 0.05
+
+
+def test_call_budget_truncates_large_results(tool_call):
+    budget = ResultBudget(max_call_tokens=100)
+    toolbox = Toolbox.create([list_rows, get_status], result_budget=budget)
+
+    small, large = toolbox.execute_tool_calls(
+        [
+            tool_call("call_1", "get_status", "{}"),
+            tool_call("call_2", "list_rows", '{"count": 1000}'),
+        ]
+    )
+    assert small["content"] == "ok"
+    assert large["content"].startswith('[{"id":0,"value":0},')
+    assert large["content"].endswith(" characters]")
+    assert estimate_tokens(large["content"]) <= 100
+
+    usage = budget.snapshot()
+    assert usage["get_status"] == {
+        "calls": 1,
+        "bytes": 2,
+        "tokens": 1,
+        "original_tokens": 1,
+        "summarized": 0,
+    }
+    assert usage["list_rows"]["bytes"] == len(large["content"])
+    assert usage["list_rows"]["tokens"] <= 100
+    assert usage["list_rows"]["original_tokens"] > 5000
+    assert usage["list_rows"]["summarized"] == 1
+
+
+def test_turn_budget_is_split_fairly(tool_call):
+    budget = ResultBudget(max_turn_tokens=300)
+    toolbox = Toolbox.create([list_rows], result_budget=budget, max_workers=2)
+
+    results = toolbox.execute_tool_calls(
+        [
+            tool_call("call_1", "list_rows", '{"count": 1000}'),
+            tool_call("call_2", "list_rows", '{"count": 2}'),
+            tool_call("call_3", "list_rows", '{"count": 500}'),
+        ]
+    )
+    tokens = [estimate_tokens(result["content"]) for result in results]
+    # The small result is kept whole, and the large ones split the rest
+    assert results[1]["content"] == json.dumps(list_rows(2), separators=(",", ":"))
+    assert sum(tokens) <= 300
+    assert tokens[0] > 100 and tokens[2] > 100
+
+
+def test_summarize_callback(tool_call):
+    calls = []
+
+    def summarize(func_name: str, content: str, max_tokens: int) -> str:
+        calls.append((func_name, max_tokens))
+        rows = json.loads(content)
+        return f"{len(rows)} rows, first: {json.dumps(rows[0])}"
+
+    budget = ResultBudget(max_call_tokens=50, summarize=summarize)
+    toolbox = Toolbox.create([list_rows], result_budget=budget)
+    [result] = toolbox.execute_tool_calls(
+        [tool_call("call_1", "list_rows", '{"count": 1000}')]
+    )
+    assert result["content"] == '1000 rows, first: {"id": 0, "value": 0}'
+    assert calls == [("list_rows", 50)]
+
+
+async def test_turn_budget_as_completed(tool_call):
+    budget = ResultBudget(max_turn_tokens=200)
+    toolbox = AsyncToolbox.create([list_rows], result_budget=budget)
+
+    tool_calls = [
+        tool_call(f"call_{i}", "list_rows", '{"count": 300}') for i in range(4)
+    ]
+    results = [
+        message async for message in toolbox.execute_tool_calls_as_completed(tool_calls)
+    ]
+    tokens = [estimate_tokens(result["content"]) for result in results]
+    # Results that finish first can't take the whole budget
+    assert sum(tokens) <= 200
+    assert all(40 < count < 60 for count in tokens)
+
+
+async def test_turn_budget_per_conversation(tool_call):
+    budget = ResultBudget(max_turn_tokens=100)
+    toolbox = AsyncToolbox.create([list_rows], result_budget=budget)
+
+    results = await toolbox.execute_batch(
+        {
+            "a": [tool_call("call_1", "list_rows", '{"count": 1000}')],
+            "b": [
+                tool_call("call_2", "list_rows", '{"count": 1000}'),
+                tool_call("call_3", "list_rows", '{"count": 1000}'),
+            ],
+        }
+    )
+    assert 50 < estimate_tokens(results["a"][0]["content"]) <= 100
+    tokens = [estimate_tokens(message["content"]) for message in results["b"]]
+    assert sum(tokens) <= 100 and all(count > 40 for count in tokens)
+    assert budget.snapshot()["list_rows"]["calls"] == 3
+
+
+async def test_turn_budget_of_streamed_tool_calls(tool_call_delta):
+    budget = ResultBudget(max_turn_tokens=300)
+    toolbox = AsyncToolbox.create([list_rows], result_budget=budget)
+
+    stream = toolbox.stream_tool_calls()
+    stream.feed(
+        [
+            tool_call_delta(
+                index, f"call_{index}", "list_rows", f'{{"count": {count}}}'
+            )
+            for index, count in enumerate([1000, 2, 500])
+        ]
+    )
+    results = await stream.results()
+
+    # Split like the results of `execute_tool_calls`
+    tokens = [estimate_tokens(result["content"]) for result in results]
+    assert results[1]["content"] == json.dumps(list_rows(2), separators=(",", ":"))
+    assert sum(tokens) <= 300
+    assert tokens[0] > 100 and tokens[2] > 100
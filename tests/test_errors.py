@@ -0,0 +1,236 @@
+import asyncio
+import time
+from typing import Callable, Iterator
+
+import pytest
+from pydantic import ValidationError
+
+from toolsmith import AsyncToolbox, HedgePolicy, ResultCache, RetryPolicy, Toolbox
+
+NO_DELAY = RetryPolicy(initial_delay=0)
+
+
+def _flaky(failures: int, error: Exception) -> Callable[[int], str]:
+    attempts: list[int] = []
+
+    def flaky(i: int) -> str:
+        attempts.append(i)
+        if len(attempts) <= failures:
+            raise error
+        return f"ok after {len(attempts)}"
+
+    return flaky
+
+
+def add(a: int, b: int) -> str:
+    return str(a + b)
+
+
+def divide(a: int, b: int) -> str:
+    return str(a / b)
+
+
+@pytest.fixture
+def tool_calls(tool_call):
+    return [
+        tool_call("call_1", "add", '{"a": 1, "b": 2}'),
+        tool_call("call_2", "missing", "{}"),
+        tool_call("call_3", "add", '{"a": "one"}'),
+        tool_call("call_4", "divide", '{"a": 1, "b": 0}'),
+        tool_call("call_5", "divide", '{"a": 6, "b": 3}'),
+    ]
+
+
+EXPECTED_CONTENTS = [
+    "3",
+    "Error: ValueError: Function missing not found in toolbox",
+    "Error: invalid arguments for `add`: a: Input should be a valid integer, unable "
+    "to parse string as an integer; b: Field required",
+    "Error: ZeroDivisionError: division by zero",
+    "2.0",
+]
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_isolated_errors(max_workers, tool_calls):
+    toolbox = Toolbox.create(
+        [add, divide], isolate_errors=True, max_workers=max_workers
+    )
+
+    results = toolbox.execute_tool_calls(tool_calls)
+
+    assert [r["tool_call_id"] for r in results] == [tc.id for tc in tool_calls]
+    assert [r["content"] for r in results] == EXPECTED_CONTENTS
+
+
+async def test_async_isolated_errors(tool_calls):
+    toolbox = AsyncToolbox.create([add, divide], isolate_errors=True)
+
+    results = await toolbox.execute_tool_calls(tool_calls)
+    assert [r["content"] for r in results] == EXPECTED_CONTENTS
+
+    completed = [
+        r["tool_call_id"]
+        async for r in toolbox.execute_tool_calls_as_completed(tool_calls)
+    ]
+    assert sorted(completed) == sorted(tc.id for tc in tool_calls)
+
+
+async def test_batch_isolated_errors(tool_calls):
+    toolbox = AsyncToolbox.create([add, divide], isolate_errors=True)
+
+    results = await toolbox.execute_batch({"a": tool_calls[:2], "b": tool_calls[2:]})
+
+    assert [r["content"] for r in results["a"] + results["b"]] == EXPECTED_CONTENTS
+
+
+def test_errors_raise_by_default(tool_calls):
+    toolbox = Toolbox.create([add])
+    with pytest.raises(ValidationError):
+        toolbox.execute_tool_calls(tool_calls[2:3])
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_retries(max_workers, tool_call):
+    flaky = _flaky(2, ConnectionError("reset"))
+    toolbox = Toolbox.create(
+        [flaky], retries={"flaky": NO_DELAY}, max_workers=max_workers
+    )
+
+    results = toolbox.execute_tool_calls([tool_call("call_1", "flaky", '{"i": 1}')])
+
+    assert results[0]["content"] == "ok after 3"
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_options_of_aliased_tools(max_workers, tool_call):
+    flaky = _flaky(2, ConnectionError("reset"))
+    toolbox = Toolbox(
+        functions={"search": flaky},
+        retries={"search": NO_DELAY},
+        result_caches={"search": ResultCache()},
+        max_workers=max_workers,
+    )
+
+    for id in ("call_1", "call_2"):
+        [result] = toolbox.execute_tool_calls([tool_call(id, "search", '{"i": 1}')])
+        assert result["content"] == "ok after 3"
+
+
+async def test_async_options_of_aliased_tools(tool_call):
+    async def slow_search(query: str) -> str:
+        await asyncio.sleep(1)
+        return query
+
+    toolbox = AsyncToolbox(functions={"search": slow_search}, timeouts={"search": 0.01})
+    [result] = await toolbox.execute_tool_calls(
+        [tool_call("call_1", "search", '{"query": "x"}')]
+    )
+    assert result["content"] == "Error: `search` timed out after 0.01 seconds"
+
+
+async def test_async_retries_only_retry_on(tool_call):
+    flaky = _flaky(1, ConnectionError("reset"))
+    broken = _flaky(1, KeyError("id"))
+    broken.__name__ = "broken"
+    policy = NO_DELAY._replace(retry_on=(ConnectionError,))
+    toolbox = AsyncToolbox.create(
+        [flaky, broken],
+        retries={"flaky": policy, "broken": policy},
+        isolate_errors=True,
+    )
+
+    results = await toolbox.execute_tool_calls(
+        [
+            tool_call("call_1", "flaky", '{"i": 1}'),
+            tool_call("call_2", "broken", '{"i": 2}'),
+        ]
+    )
+
+    assert [r["content"] for r in results] == ["ok after 2", "Error: KeyError: 'id'"]
+
+
+async def test_timeouts_are_retried(tool_call):
+    attempts = []
+
+    async def slow_once(text: str) -> str:
+        attempts.append(text)
+        if len(attempts) == 1:
+            await asyncio.sleep(1)
+        return text
+
+    toolbox = AsyncToolbox.create(
+        [slow_once], timeout=0.01, retries={"slow_once": NO_DELAY}
+    )
+    results = await toolbox.execute_tool_calls(
+        [tool_call("call_1", "slow_once", '{"text": "hi"}')]
+    )
+
+    assert results[0]["content"] == "hi"
+    assert len(attempts) == 2
+
+
+async def test_retries_stop_at_the_deadline(tool_call):
+    attempts = []
+
+    async def slow(text: str) -> str:
+        attempts.append(text)
+        await asyncio.sleep(1)
+        return text
+
+    failing = _flaky(1, ConnectionError("reset"))
+    failing.__name__ = "failing"
+    policy = RetryPolicy(max_attempts=3, initial_delay=1.0)
+    toolbox = AsyncToolbox.create(
+        [slow, failing], retries={"slow": policy, "failing": policy}
+    )
+
+    start = time.perf_counter()
+    with pytest.raises(ConnectionError):
+        await toolbox.execute_tool_calls(
+            [tool_call("call_1", "failing", '{"i": 1}')], deadline=0.5
+        )
+    results = await toolbox.execute_tool_calls(
+        [tool_call("call_1", "slow", '{"text": "hi"}')], deadline=0.5
+    )
+    elapsed = time.perf_counter() - start
+
+    assert results[0]["content"] == "Error: `slow` did not finish before the deadline"
+    assert attempts == ["hi"]
+    assert elapsed < 0.9
+
+
+async def test_stream_isolated_errors(tool_call_delta):
+    toolbox = AsyncToolbox.create([add], isolate_errors=True, max_args_chars=20)
+    stream = toolbox.stream_tool_calls()
+
+    stream.feed(
+        [
+            tool_call_delta(0, "call_1", "add", '{"a": 1}'),
+            tool_call_delta(1, "call_2", "add", '{"a": 1, "b": 100000000000000'),
+        ]
+    )
+    results = await stream.results()
+
+    assert [r["content"] for r in results] == [
+        "Error: invalid arguments for `add`: b: Field required",
+        "Error: ValueError: `add`: arguments are longer than `max_args_chars` "
+        "(20 characters)",
+    ]
+
+
+def test_retry_options_are_checked():
+    with pytest.raises(ValidationError, match="not in the toolbox"):
+        Toolbox.create([add], retries={"missing": NO_DELAY})
+    with pytest.raises(ValidationError, match="at least 1"):
+        Toolbox.create([add], retries={"add": RetryPolicy(max_attempts=0)})
+
+
+def test_functions_with_streamed_arguments_are_called_once():
+    def total(values: Iterator[int]) -> str:
+        return str(sum(values))
+
+    with pytest.raises(ValidationError, match=r"`retries`: .* \['total'\]"):
+        Toolbox.create([total], retries={"total": NO_DELAY})
+    with pytest.raises(ValidationError, match=r"`hedging`: .* \['total'\]"):
+        AsyncToolbox.create([total], hedging={"total": HedgePolicy(delay=0.01)})
@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from toolsmith import AsyncToolbox, HedgePolicy, remaining_time
+from toolsmith.hedging import LatencyTracker
+from toolsmith.toolbox import _acquire_by
+
+
+async def test_slow_calls_are_hedged(tool_call):
+    started = []
+
+    async def lookup(key: str) -> str:
+        started.append(key)
+        if len(started) == 1:
+            await asyncio.sleep(1)
+        return f"attempt {len(started)}"
+
+    toolbox = AsyncToolbox.create([lookup], hedging={"lookup": HedgePolicy(delay=0.02)})
+    start = time.perf_counter()
+    results = await toolbox.execute_tool_calls(
+        [tool_call("call_1", "lookup", '{"key": "a"}')]
+    )
+
+    assert time.perf_counter() - start < 0.5
+    assert results[0]["content"] == "attempt 2"
+    assert started == ["a", "a"]
+
+
+async def test_hedged_call_errors_wait_for_other_calls(tool_call):
+    started = []
+
+    async def flaky(key: str) -> str:
+        started.append(key)
+        if len(started) == 1:
+            await asyncio.sleep(0.05)
+            raise ConnectionError("reset")
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    toolbox = AsyncToolbox.create([flaky], hedging={"flaky": HedgePolicy(delay=0.01)})
+    results = await toolbox.execute_tool_calls(
+        [tool_call("call_1", "flaky", '{"key": "a"}')]
+    )
+
+    assert results[0]["content"] == "ok"
+
+
+def test_percentile_delay():
+    policy = HedgePolicy(delay=1.0, percentile=0.9, min_samples=10)
+    latencies = LatencyTracker(window=100)
+    for i in range(9):
+        latencies.add(i / 100)
+    assert policy.get_delay(latencies) == 1.0
+
+    latencies.add(0.09)
+    assert policy.get_delay(latencies) == 0.09
+
+
+def test_hedging_options_are_checked():
+    async def lookup(key: str) -> str:
+        return key
+
+    with pytest.raises(ValidationError, match="not in the toolbox"):
+        AsyncToolbox.create([lookup], hedging={"missing": HedgePolicy(delay=1)})
+    with pytest.raises(ValidationError, match="set a `delay`"):
+        AsyncToolbox.create([lookup], hedging={"lookup": HedgePolicy()})
+
+
+async def test_deadline_is_shared_by_tool_calls(tool_call):
+    seen = []
+
+    async def wait(seconds: float) -> str:
+        seen.append(remaining_time())
+        await asyncio.sleep(seconds)
+        return "done"
+
+    def blocking_remaining(label: str) -> str:
+        seen.append(remaining_time())
+        return label
+
+    toolbox = AsyncToolbox.create(
+        [wait, blocking_remaining], max_concurrency=1, timeout=10
+    )
+    results = await toolbox.execute_tool_calls(
+        [
+            tool_call("call_1", "wait", '{"seconds": 0}'),
+            tool_call("call_2", "blocking_remaining", '{"label": "sync"}'),
+            tool_call("call_3", "wait", '{"seconds": 1}'),
+            tool_call("call_4", "wait", '{"seconds": 0}'),
+        ],
+        deadline=0.1,
+    )
+
+    assert [r["content"] for r in results] == [
+        "done",
+        "sync",
+        "Error: `wait` did not finish before the deadline",
+        "Error: `wait` did not finish before the deadline",
+    ]
+    assert all(0 < remaining <= 0.1 for remaining in seen)
+    assert remaining_time() is None
+
+
+async def test_waiting_for_a_slot_never_leaks_it(tool_call):
+    semaphore = asyncio.Semaphore(1)
+    await semaphore.acquire()
+    assert not await _acquire_by(semaphore, time.monotonic() + 0.01)
+
+    # Cancelled just as the slot was handed over
+    waiter = asyncio.ensure_future(_acquire_by(semaphore, time.monotonic() + 10))
+    await asyncio.sleep(0)
+    semaphore.release()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0)
+    assert not semaphore.locked()
+
+    # The toolbox's slots are all free again after calls ran out of time waiting
+    async def wait(seconds: float) -> str:
+        await asyncio.sleep(seconds)
+        return "done"
+
+    toolbox = AsyncToolbox.create([wait], max_concurrency=1)
+    await toolbox.execute_tool_calls(
+        [tool_call(f"call_{i}", "wait", '{"seconds": 0.02}') for i in range(3)],
+        deadline=0.03,
+    )
+    assert not toolbox._get_semaphores()[None].locked()
+
+
+async def test_timeout_is_exposed_as_remaining_time(tool_call):
+    async def check() -> str:
+        remaining = remaining_time()
+        assert remaining is not None
+        return str(remaining <= 5)
+
+    toolbox = AsyncToolbox.create([check], timeout=5)
+    results = await toolbox.execute_tool_calls([tool_call("call_1", "check", "{}")])
+
+    assert results[0]["content"] == "True"
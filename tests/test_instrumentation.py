@@ -0,0 +1,135 @@
+import asyncio
+import itertools
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from toolsmith import (
+    AsyncToolbox,
+    Instrumentation,
+    PhaseEvent,
+    Toolbox,
+    ToolStats,
+    cached,
+)
+
+
+def divide(a: int, b: int) -> dict[str, float]:
+    return {"result": a / b}
+
+
+class _Events(Instrumentation):
+    def __init__(self) -> None:
+        self.events: list[PhaseEvent] = []
+
+    def record(self, event: PhaseEvent) -> None:
+        self.events.append(event)
+
+
+def test_phase_events(tool_call):
+    events = _Events()
+    toolbox = Toolbox.create([divide], instrumentation=events)
+    toolbox.execute_tool_calls([tool_call("call_1", "divide", '{"a": 1, "b": 2}')])
+
+    assert [(e.func_name, e.phase, e.size, e.error) for e in events.events] == [
+        ("divide", "parse", 16, None),
+        ("divide", "execute", None, None),
+        ("divide", "serialize", 14, None),
+    ]
+    assert all(e.end_ns >= e.start_ns for e in events.events)
+
+
+def test_durations_ignore_wall_clock_changes(
+    monkeypatch: pytest.MonkeyPatch, tool_call
+):
+    # The system clock is set back by a second before every reading
+    wall_clock = itertools.count(time.time_ns(), -1_000_000_000)
+    monkeypatch.setattr(time, "time_ns", lambda: next(wall_clock))
+    events = _Events()
+    toolbox = Toolbox.create([divide], instrumentation=events)
+    toolbox.execute_tool_calls([tool_call("call_1", "divide", '{"a": 1, "b": 2}')])
+
+    assert len(events.events) == 3
+    assert all(0 <= e.duration < 1 for e in events.events)
+
+
+def test_instrumentation_must_implement_record():
+    with pytest.raises(TypeError, match="abstract"):
+        Instrumentation()  # type: ignore[abstract]
+
+
+def test_stats_snapshot(tool_call):
+    stats = ToolStats()
+    toolbox = Toolbox.create([divide], max_workers=2, instrumentation=stats)
+    toolbox.execute_tool_calls(
+        [tool_call(f"call_{i}", "divide", f'{{"a": {i}, "b": 1}}') for i in range(3)]
+    )
+    with pytest.raises(ZeroDivisionError):
+        Toolbox.create([divide], instrumentation=stats).execute_tool_calls(
+            [tool_call("call_4", "divide", '{"a": 1, "b": 0}')]
+        )
+    with pytest.raises(ValidationError):
+        toolbox.execute_tool_calls([tool_call("call_5", "divide", '{"a": "x"}')])
+
+    snapshot = stats.snapshot()["divide"]
+    assert {phase: s["count"] for phase, s in snapshot.items()} == {
+        "parse": 5,
+        "execute": 4,
+        "serialize": 3,
+    }
+    assert {phase: s["errors"] for phase, s in snapshot.items()} == {
+        "parse": 1,
+        "execute": 1,
+        "serialize": 0,
+    }
+    assert snapshot["parse"]["size"]["sum"] == 16 * 4 + 10
+    assert snapshot["serialize"]["size"]["buckets"]["64"] == 3
+    assert sum(snapshot["execute"]["latency"]["buckets"].values()) == 4
+
+
+async def test_async_timeouts_are_recorded_as_errors(tool_call):
+    async def hang() -> str:
+        await asyncio.sleep(10)
+        return ""
+
+    stats = ToolStats()
+    toolbox = AsyncToolbox.create([hang], timeout=0.01, instrumentation=stats)
+    await toolbox.execute_tool_calls([tool_call("call_1", "hang", "{}")])
+
+    assert stats.snapshot()["hang"]["execute"]["errors"] == 1
+
+
+@pytest.mark.parametrize(
+    "toolbox_class, options",
+    [(Toolbox, {}), (Toolbox, {"max_workers": 2}), (AsyncToolbox, {})],
+)
+async def test_cached_results_are_serialized_once(toolbox_class, options, tool_call):
+    summarized = []
+
+    @cached()
+    def lookup(key: str) -> dict[str, str]:
+        return {"key": key, "value": "x" * 100}
+
+    def summarize(content: str, max_chars: int) -> str:
+        summarized.append(content)
+        return content[:max_chars]
+
+    stats = ToolStats()
+    toolbox = toolbox_class.create(
+        [lookup],
+        instrumentation=stats,
+        max_result_chars=50,
+        summarize_result=summarize,
+        **options,
+    )
+    for id in ("call_1", "call_2"):
+        results = toolbox.execute_tool_calls([tool_call(id, "lookup", '{"key": "a"}')])
+        if toolbox_class is AsyncToolbox:
+            results = await results
+        assert len(results[0]["content"]) == 50
+
+    snapshot = stats.snapshot()["lookup"]
+    assert snapshot["execute"]["count"] == 1
+    assert snapshot["serialize"]["count"] == 1
+    assert len(summarized) == 1
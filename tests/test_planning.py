@@ -0,0 +1,192 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pydantic import ValidationError
+
+from toolsmith import AsyncToolbox, ResourceAccess, Toolbox, resources
+from toolsmith.planning import ResourcePlanner
+
+
+def test_planner():
+    planner = ResourcePlanner()
+    assert planner.add({"a"}, ()) == []
+    assert planner.add({"a"}, ()) == []
+    # Writes wait for earlier reads, and later reads wait for the write
+    assert planner.add((), {"a"}) == [0, 1]
+    assert planner.add({"a", "b"}, ()) == [2]
+    assert planner.add((), {"b"}) == [3]
+    assert planner.add_independent() == []
+    assert planner.add((), {"c"}) == []
+    # An exclusive call waits for everything with declared resources, and vice versa
+    assert planner.add_exclusive() == [0, 1, 2, 3, 4, 6]
+    assert planner.add({"d"}, ()) == [7]
+    assert planner.add_independent() == []
+
+
+async def test_conflicting_calls_run_in_order(tool_call):
+    log = []
+
+    async def _run(name: str, key: str) -> str:
+        log.append(("start", name, key))
+        await asyncio.sleep(0.02)
+        log.append(("end", name, key))
+        return f"{name} {key}"
+
+    @resources(reads=lambda args: [("account", args["id"])])
+    async def get_balance(id: str) -> str:
+        return await _run("get", id)
+
+    @resources(writes=lambda args: [("account", args["id"])])
+    async def deposit(id: str, amount: int) -> str:
+        return await _run("deposit", id)
+
+    toolbox = AsyncToolbox.create([get_balance, deposit])
+    start = time.perf_counter()
+    results = await toolbox.execute_tool_calls(
+        [
+            tool_call("call_1", "get_balance", '{"id": "a"}'),
+            tool_call("call_2", "deposit", '{"id": "a", "amount": 5}'),
+            tool_call("call_3", "deposit", '{"id": "b", "amount": 5}'),
+            tool_call("call_4", "get_balance", '{"id": "a"}'),
+            tool_call("call_5", "get_balance", '{"id": "b"}'),
+        ]
+    )
+
+    assert [result["content"] for result in results] == [
+        "get a",
+        "deposit a",
+        "deposit b",
+        "get a",
+        "get b",
+    ]
+    # Calls on "a" run one after the other, alongside the calls on "b"
+    assert [entry for entry in log if entry[2] == "a"] == [
+        ("start", "get", "a"),
+        ("end", "get", "a"),
+        ("start", "deposit", "a"),
+        ("end", "deposit", "a"),
+        ("start", "get", "a"),
+        ("end", "get", "a"),
+    ]
+    assert log.index(("start", "deposit", "b")) < log.index(("end", "get", "a"))
+    assert time.perf_counter() - start < 0.15
+
+
+def test_conflicting_calls_run_in_order_on_executor(tool_call):
+    log = []
+
+    def append(key: str, value: str) -> str:
+        log.append(("start", key, value))
+        time.sleep(0.02)
+        log.append(("end", key, value))
+        return value
+
+    def read(key: str) -> str:
+        return ",".join(value for _, k, value in log if k == key)
+
+    toolbox = Toolbox.create(
+        [append, read],
+        max_workers=4,
+        resources={
+            "append": ResourceAccess(writes=lambda args: [args["key"]]),
+            "read": ResourceAccess(reads=lambda args: [args["key"]]),
+        },
+    )
+    tool_calls = [
+        tool_call("call_1", "append", '{"key": "x", "value": "1"}'),
+        tool_call("call_2", "append", '{"key": "y", "value": "2"}'),
+        tool_call("call_3", "append", '{"key": "x", "value": "3"}'),
+        tool_call("call_4", "read", '{"key": "x"}'),
+    ]
+    results = toolbox.execute_tool_calls(tool_calls)
+
+    assert results[3]["content"] == "1,1,3,3"
+    assert log.index(("start", "y", "2")) < log.index(("end", "x", "1"))
+    assert log.index(("end", "x", "1")) < log.index(("start", "x", "3"))
+
+    log.clear()
+    messages = list(toolbox.execute_tool_calls_as_completed(tool_calls))
+    assert messages[-1] == {
+        "role": "tool",
+        "tool_call_id": "call_4",
+        "content": "1,1,3,3",
+    }
+
+
+async def test_calls_whose_resources_fail_run_on_their_own(caplog, tool_call):
+    running = []
+    overlapped = []
+
+    # Fails for paths without a directory
+    @resources(writes=lambda args: [args["path"].split("/")[1]])
+    async def write_file(path: str) -> str:
+        running.append(path)
+        if len(running) > 1:
+            overlapped.append(path)
+        await asyncio.sleep(0.01)
+        running.remove(path)
+        return path
+
+    results = await AsyncToolbox.create([write_file]).execute_tool_calls(
+        [
+            tool_call("call_1", "write_file", '{"path": "dir/a"}'),
+            tool_call("call_2", "write_file", '{"path": "dir/b"}'),
+            tool_call("call_3", "write_file", '{"path": "c"}'),
+            tool_call("call_4", "write_file", '{"path": "dir/d"}'),
+        ]
+    )
+    assert [result["content"] for result in results] == ["dir/a", "dir/b", "c", "dir/d"]
+    assert overlapped == ["dir/b"]
+    assert "call_3" in caplog.text
+
+
+async def test_streamed_calls_are_ordered(tool_call_delta):
+    log = []
+
+    @resources(writes=["inbox"])
+    async def send(text: str) -> str:
+        log.append(text)
+        await asyncio.sleep(0.01 if text == "first" else 0)
+        log.append(text)
+        return text
+
+    toolbox = AsyncToolbox.create([send])
+    stream = toolbox.stream_tool_calls()
+    for index, text in enumerate(["first", "second"]):
+        stream.feed(
+            [tool_call_delta(index, f"call_{index}", "send", f'{{"text": "{text}"}}')]
+        )
+    await stream.results()
+    assert log == ["first", "first", "second", "second"]
+
+
+def test_resources_are_checked():
+    def ping() -> str:
+        return "pong"
+
+    with pytest.raises(ValidationError, match="not in the toolbox"):
+        Toolbox.create([ping], resources={"missing": ResourceAccess(writes=["x"])})
+
+
+def test_long_conflict_chain_runs_inline(tool_call):
+    order = []
+
+    @resources(writes=["db"])
+    def insert(row: int) -> str:
+        order.append(row)
+        return str(row)
+
+    def ping() -> str:
+        return "pong"
+
+    # `ping` has an executor, so `insert` calls run inline, one after the other
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        toolbox = Toolbox.create([insert, ping], executors={"ping": executor})
+        results = toolbox.execute_tool_calls(
+            [tool_call(f"call_{i}", "insert", f'{{"row": {i}}}') for i in range(2000)]
+        )
+
+    assert [result["content"] for result in results] == [str(i) for i in range(2000)]
+    assert order == list(range(2000))
@@ -0,0 +1,144 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from pydantic import BaseModel, SecretStr
+
+from toolsmith import AsyncToolbox, ToolCallsError, Toolbox
+
+
+class Matrix(BaseModel):
+    rows: list[list[float]]
+
+
+class Score(BaseModel):
+    pid: int
+    total: float
+
+
+def score(matrix: Matrix, scale: float = 1.0) -> Score:
+    return Score(pid=os.getpid(), total=sum(map(sum, matrix.rows)) * scale)
+
+
+async def async_score(matrix: Matrix) -> Score:
+    return score(matrix)
+
+
+def fail(message: str) -> str:
+    raise ValueError(message)
+
+
+def thread_name() -> str:
+    return threading.current_thread().name
+
+
+def check_token(token: SecretStr) -> str:
+    return str(token.get_secret_value() == "s3cret")
+
+
+def test_process_executor_per_function(tool_call):
+    toolbox = Toolbox.create(
+        [score, thread_name, fail], executors={"score": "process", "fail": "process"}
+    )
+    with pytest.raises(ToolCallsError) as exc_info:
+        toolbox.execute_tool_calls(
+            [
+                tool_call("call_1", "score", '{"matrix": {"rows": [[1, 2], [3]]}}'),
+                tool_call("call_2", "thread_name", "{}"),
+                tool_call("call_3", "fail", '{"message": "boom"}'),
+            ]
+        )
+
+    results = exc_info.value.results
+    result = Score.model_validate_json(results[0]["content"])
+    assert result.total == 6.0
+    assert result.pid != os.getpid()
+    # Functions without an executor still run in the calling thread
+    assert results[1]["content"] == threading.current_thread().name
+    assert repr(exc_info.value.errors["call_3"]) == "ValueError('boom')"
+
+
+def test_arguments_json_is_sent_as_is(tool_call):
+    # Encoding the validated arguments would send the masked secret
+    with Toolbox.create([check_token], executors={"check_token": "process"}) as toolbox:
+        results = toolbox.execute_tool_calls(
+            [tool_call("call_1", "check_token", '{"token": "s3cret"}')]
+        )
+
+    assert results[0]["content"] == "True"
+
+
+async def test_async_toolbox_process_executor(tool_call):
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        toolbox = AsyncToolbox.create(
+            [score, async_score],
+            executors={"score": pool, "async_score": pool},
+        )
+        results = await toolbox.execute_tool_calls(
+            [
+                tool_call(
+                    "call_1", "score", '{"matrix": {"rows": [[1.5]]}, "scale": 2}'
+                ),
+                tool_call("call_2", "async_score", '{"matrix": {"rows": [[1]]}}'),
+            ]
+        )
+
+    scores = [Score.model_validate_json(r["content"]) for r in results]
+    assert [s.total for s in scores] == [3.0, 1.0]
+    assert all(s.pid != os.getpid() for s in scores)
+
+
+async def test_async_toolbox_thread_executor_per_function(tool_call):
+    with ThreadPoolExecutor(thread_name_prefix="dedicated") as pool:
+        toolbox = AsyncToolbox.create([thread_name], executors={"thread_name": pool})
+        results = await toolbox.execute_tool_calls(
+            [tool_call("call_1", "thread_name", "{}")]
+        )
+
+    assert results[0]["content"].startswith("dedicated")
+
+
+def test_close_shuts_down_owned_executors(tool_call):
+    with ThreadPoolExecutor() as pool:
+        toolbox = Toolbox.create(
+            [score, thread_name],
+            executors={"score": "process", "thread_name": pool},
+            max_workers=2,
+        )
+        with toolbox:
+            toolbox.execute_tool_calls(
+                [tool_call("call_1", "score", '{"matrix": {"rows": [[1]]}}')]
+            )
+            process_pool = toolbox._get_function_executor("score")
+            workers = list(process_pool._processes.values())
+            thread_pool = toolbox._get_executor()
+            assert workers and all(worker.is_alive() for worker in workers)
+
+        assert not any(worker.is_alive() for worker in workers)
+        assert thread_pool._shutdown and process_pool._shutdown_thread
+        # Executors passed in keep running
+        assert pool.submit(thread_name).result()
+
+    # Closed toolboxes create new executors when they need them
+    results = toolbox.execute_tool_calls(
+        [tool_call("call_1", "score", '{"matrix": {"rows": [[1]]}}')]
+    )
+    assert Score.model_validate_json(results[0]["content"]).total == 1.0
+    toolbox.close()
+
+
+async def test_async_toolbox_close(tool_call):
+    toolbox = AsyncToolbox.create([score], executors={"score": "process"})
+    async with toolbox:
+        await toolbox.execute_tool_calls(
+            [tool_call("call_1", "score", '{"matrix": {"rows": [[1]]}}')]
+        )
+        workers = list(toolbox._get_function_executor("score")._processes.values())
+
+    assert workers and not any(worker.is_alive() for worker in workers)
+
+
+def test_executors_option_validation():
+    with pytest.raises(ValueError, match="refers to functions not in the toolbox"):
+        Toolbox.create([score], executors={"missing": "process"})
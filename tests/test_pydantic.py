@@ -1,7 +1,10 @@
+import json
 from enum import Enum
+from typing import Any, Iterator
 
 import openai
-from pydantic import BaseModel, Field
+import pytest
+from pydantic import BaseModel, Field, ValidationError
 
 from toolsmith import Toolbox, func_to_schema
 
@@ -168,3 +171,166 @@ def test_pydantic_with_enums():
         "animal": Animal(name="Whiskers", type=AnimalType.CAT)
     }
     assert invocations[0].execute() == "Added Whiskers, a cat to the zoo"
+
+
+def test_parse_invocations_from_json(tool_call):
+    toolbox = Toolbox.create([add_many_to_zoo])
+    call = tool_call(
+        "call_1",
+        "add_many_to_zoo",
+        '{"animals": [{"name": "Rex", "type": "dog"}, {"name": "Tom", "type": "cat"}]}',
+    )
+
+    invocations = toolbox.parse_invocations([call])
+
+    assert len(invocations) == 1
+    assert invocations[0].args == {
+        "animals": [
+            Animal(name="Rex", type=AnimalType.DOG),
+            Animal(name="Tom", type=AnimalType.CAT),
+        ]
+    }
+    assert invocations[0].execute() == "Added Rex, Tom to the zoo"
+
+
+def test_parse_invocations_invalid_args(tool_call):
+    toolbox = Toolbox.create([add_to_zoo])
+    call = tool_call(
+        "call_1", "add_to_zoo", '{"animal": {"name": "Rex", "type": "fish"}}'
+    )
+
+    with pytest.raises(ValidationError):
+        toolbox.parse_invocations([call])
+
+
+class Book(BaseModel):
+    title: str
+    author: User
+
+
+def add_books(books: list[Book], title: str) -> str:
+    """Add books to a shelf"""
+    return f"Added {len(books)} books to {title}"
+
+
+def test_pydantic_fields_named_title():
+    parameters = func_to_schema(add_books)["function"]["parameters"]
+
+    assert parameters["properties"] == {
+        "books": {"type": "array", "items": {"$ref": "#/$defs/Book"}},
+        "title": {"type": "string"},
+    }
+    assert parameters["$defs"]["Book"]["properties"] == {
+        "title": {"type": "string"},
+        "author": {"$ref": "#/$defs/User"},
+    }
+    assert "title" not in parameters["$defs"]["User"]
+
+
+def list_animals(type: AnimalType) -> list[Animal]:
+    """List the animals of a type in the zoo"""
+    return [Animal(name="Rex", type=type), Animal(name="Max", type=type)]
+
+
+def get_shelf(title: str) -> dict[str, Any]:
+    return {"title": title, "books": [Book(title="Dune", author=JOHN)]}
+
+
+JOHN = User(name="John", email="john@example.com", skills=[])
+
+
+@pytest.mark.parametrize("json_backend", ["pydantic", "orjson"])
+def test_pydantic_results(json_backend: str, tool_call):
+    if json_backend == "orjson":
+        pytest.importorskip("orjson")
+
+    toolbox = Toolbox.create([list_animals, get_shelf], json_backend=json_backend)
+    results = toolbox.execute_tool_calls(
+        [
+            tool_call("call_1", "list_animals", '{"type": "dog"}'),
+            tool_call("call_2", "get_shelf", '{"title": "Sci-fi"}'),
+        ]
+    )
+
+    assert json.loads(results[0]["content"]) == [
+        {"name": "Rex", "type": "dog"},
+        {"name": "Max", "type": "dog"},
+    ]
+    assert json.loads(results[1]["content"]) == {
+        "title": "Sci-fi",
+        "books": [{"title": "Dune", "author": JOHN.model_dump()}],
+    }
+
+
+def test_oversized_results_are_truncated(tool_call):
+    toolbox = Toolbox.create([list_animals], max_result_chars=50)
+    result = toolbox.execute_tool_calls(
+        [tool_call("call_1", "list_animals", '{"type": "dog"}')]
+    )[0]
+
+    assert result["content"] == '[{"name"\n[result truncated to 50 of 57 characters]'
+
+
+def stream_to_zoo(zoo: str, animals: Iterator[Animal], tags: list[str] = []) -> str:
+    """Add many animals to a zoo"""
+    return f"Added {', '.join(animal.name for animal in animals)} to {zoo}"
+
+
+def test_streamed_list_arguments(tool_call):
+    properties = func_to_schema(stream_to_zoo)["function"]["parameters"]["properties"]
+    assert properties["animals"] == {
+        "type": "array",
+        "items": {"$ref": "#/$defs/Animal"},
+    }
+
+    toolbox = Toolbox.create([stream_to_zoo])
+    [invocation] = toolbox.parse_invocations(
+        [
+            tool_call(
+                "call_1",
+                "stream_to_zoo",
+                '{"animals": [{"name": "Rex", "type": "dog"}, '
+                '{"name": "a \\"[,]\\" b", "type": "cat"}] , "zoo": "Zoo {1}", '
+                '"tags": ["x"]}',
+            )
+        ]
+    )
+
+    assert invocation.args["zoo"] == "Zoo {1}"
+    assert invocation.args["tags"] == ["x"]
+    assert list(invocation.args["animals"]) == [
+        Animal(name="Rex", type=AnimalType.DOG),
+        Animal(name='a "[,]" b', type=AnimalType.CAT),
+    ]
+
+
+def test_streamed_items_are_validated_lazily(tool_call):
+    toolbox = Toolbox.create([stream_to_zoo])
+    [invocation] = toolbox.parse_invocations(
+        [
+            tool_call(
+                "call_1",
+                "stream_to_zoo",
+                '{"zoo": "z", "animals": [{"name": "Rex", "type": "dog"},'
+                ' {"name": "Nemo", "type": "fish"}]}',
+            )
+        ]
+    )
+
+    animals = invocation.args["animals"]
+    assert next(animals).name == "Rex"
+    with pytest.raises(ValidationError):
+        next(animals)
+
+    with pytest.raises(ValidationError):
+        toolbox.parse_invocations(
+            [tool_call("call_2", "stream_to_zoo", '{"zoo": "z"}')]
+        )
+
+
+def test_max_args_chars(tool_call):
+    toolbox = Toolbox.create([add_to_zoo], max_args_chars=40)
+    arguments = '{"animal": {"name": "Rex", "type": "dog"}}'
+
+    with pytest.raises(ValueError, match="longer than `max_args_chars` \\(40"):
+        toolbox.parse_invocations([tool_call("call_1", "add_to_zoo", arguments)])
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from toolsmith import AsyncToolbox, ResultCache, ToolRegistry, Toolbox, cached
+
+
+def create_user(name: str, age: int) -> str:
+    """Create a user."""
+    return f"Created user {name}, age {age}"
+
+
+def delete_user(name: str) -> str:
+    """Delete a user."""
+    return f"Deleted user {name}"
+
+
+async def search_users(query: str) -> list[str]:
+    """Search for users."""
+    return [query]
+
+
+def test_toolboxes_share_registry_artifacts(tool_call):
+    registry = ToolRegistry([create_user, delete_user, search_users])
+    assert len(registry) == 3 and "delete_user" in registry
+
+    first = Toolbox.from_registry(registry, ["search_users", "create_user"])
+    second = Toolbox.from_registry(registry, ["search_users", "create_user"])
+
+    assert list(first.functions) == ["search_users", "create_user"]
+    assert (
+        first.get_schema() == Toolbox.create([search_users, create_user]).get_schema()
+    )
+    assert [t["function"]["name"] for t in json.loads(first.get_schema_json())] == [
+        "search_users",
+        "create_user",
+    ]
+    assert first.get_schema_json() is second.get_schema_json()
+    assert first._args_validators is second._args_validators
+
+    results = first.execute_tool_calls(
+        [tool_call("call_1", "create_user", '{"name": "Alice", "age": 30}')]
+    )
+    assert results[0]["content"] == "Created user Alice, age 30"
+
+
+async def test_async_toolbox_from_registry(tool_call):
+    registry = ToolRegistry()
+
+    @registry.register
+    @cached()
+    async def lookup(key: str) -> str:
+        return key.upper()
+
+    registry.register(search_users)
+    toolbox = AsyncToolbox.from_registry(registry, timeout=5)
+
+    results = await toolbox.execute_tool_calls(
+        [
+            tool_call("call_1", "lookup", '{"key": "a"}'),
+            tool_call("call_2", "search_users", '{"query": "bob"}'),
+        ]
+    )
+    assert [r["content"] for r in results] == ["A", '["bob"]']
+    assert len(toolbox._get_result_caches()["lookup"]) == 1
+
+
+def test_registry_errors():
+    registry = ToolRegistry([create_user])
+
+    with pytest.raises(ValueError, match="not found in registry"):
+        Toolbox.from_registry(registry, ["create_user", "delete_user"])
+
+    with pytest.raises(ValueError, match="refers to functions not in the toolbox"):
+        Toolbox.from_registry(registry, result_caches={"delete_user": ResultCache()})
+
+    def other_create_user(name: str) -> str:
+        return name
+
+    other_create_user.__name__ = "create_user"
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register(other_create_user)
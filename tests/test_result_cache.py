@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+from pydantic import BaseModel
+
+from toolsmith import AsyncToolbox, ResultCache, Toolbox, cached
+
+
+class Query(BaseModel):
+    text: str
+    limit: int = 10
+
+
+def test_cached_results_use_validated_arguments(tool_call):
+    calls = []
+
+    @cached(ttl=60)
+    def search_users(query: Query, regex: bool = False) -> dict[str, list[str]]:
+        calls.append(query)
+        return {"users": [query.text]}
+
+    toolbox = Toolbox.create([search_users])
+    results = toolbox.execute_tool_calls(
+        [
+            tool_call("call_1", "search_users", '{"query": {"text": "bob"}}'),
+            tool_call(
+                "call_2",
+                "search_users",
+                '{"regex": false, "query": {"limit": 10, "text": "bob"}}',
+            ),
+        ]
+    )
+    # A new toolbox shares the decorated function's cache
+    results += Toolbox.create([search_users]).execute_tool_calls(
+        [tool_call("call_3", "search_users", '{"query": {"text": "bob"}}')]
+    )
+
+    assert len(calls) == 1
+    assert [r["content"] for r in results] == ['{"users":["bob"]}'] * 3
+    assert [r["tool_call_id"] for r in results] == ["call_1", "call_2", "call_3"]
+
+
+def test_result_cache_option_with_executor(tool_call):
+    calls = []
+
+    def lookup(key: str) -> str:
+        calls.append(key)
+        return key.upper()
+
+    toolbox = Toolbox.create(
+        [lookup], max_workers=2, result_caches={"lookup": ResultCache()}
+    )
+    for _ in range(2):
+        results = toolbox.execute_tool_calls(
+            [tool_call("call_1", "lookup", '{"key": "a"}')]
+        )
+        assert results[0]["content"] == "A"
+
+    assert calls == ["a"]
+
+
+def test_result_cache_ttl():
+    cache = ResultCache(ttl=0.01)
+    cache.set(b"key", "value")
+    assert cache.get(b"key") == "value"
+
+    time.sleep(0.02)
+    assert cache.get(b"key") is None
+    assert len(cache) == 0
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2, max_bytes=10)
+    cache.set(b"a", "aaaa")
+    cache.set(b"b", "bbbb")
+    assert cache.get(b"a") == "aaaa"
+
+    cache.set(b"c", "cccc")
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == "aaaa"
+    assert cache.total_bytes == 8
+
+    cache.set(b"d", "d" * 11)
+    assert cache.get(b"d") is None
+
+    cache.set(b"e", "eeeeeee")
+    assert len(cache) == 1
+    assert cache.total_bytes == 7
+
+
+async def test_concurrent_identical_calls_run_once(tool_call):
+    calls = []
+
+    @cached()
+    async def fetch(url: str) -> str:
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return f"contents of {url}"
+
+    toolbox = AsyncToolbox.create([fetch])
+    results = await toolbox.execute_tool_calls(
+        [tool_call(f"call_{i}", "fetch", '{"url": "a"}') for i in range(5)]
+        + [tool_call("call_5", "fetch", '{"url": "b"}')]
+    )
+
+    assert sorted(calls) == ["a", "b"]
+    assert [r["content"] for r in results] == ["contents of a"] * 5 + ["contents of b"]
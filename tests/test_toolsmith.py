@@ -1,10 +1,21 @@
+import gc
+import json
+import subprocess
+import sys
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from pathlib import Path
 from typing import Callable, Union
 
 import openai
 import pytest
+from pydantic import BaseModel
 
-from toolsmith import Toolbox, func_to_schema
+import toolsmith.toolsmith as toolsmith_module
+from toolsmith import ToolCallsError, Toolbox, func_to_pydantic, func_to_schema
+from toolsmith.toolsmith import _FunctionCache
 
 
 def test_basic_schema_generation():
@@ -149,3 +160,227 @@ def test_untyped_arg():
         match="Parameter `a` in `add` is not typed. Add a type hint.",
     ):
         _run_test("Sum 1 and 2", add)
+
+
+def test_schema_cache_reuses_generated_artifacts():
+    def get_weather(city: str) -> str:
+        return "Sunny"
+
+    assert func_to_pydantic(get_weather) is func_to_pydantic(get_weather)
+    assert func_to_schema(get_weather) is func_to_schema(get_weather)
+    assert (
+        Toolbox.create([get_weather]).get_schema()[0]
+        is Toolbox.create([get_weather]).get_schema()[0]
+    )
+
+
+def test_schema_cache_does_not_keep_closures_alive():
+    def make_tool() -> Callable[..., str]:
+        def get_weather(city: str) -> str:
+            return "Sunny"
+
+        return get_weather
+
+    tool = make_tool()
+    func_to_schema(tool)
+    tool_ref = weakref.ref(tool)
+    del tool
+    gc.collect()
+
+    assert tool_ref() is None
+
+
+def test_schema_cache_evicts_least_recently_used():
+    cache = _FunctionCache(maxsize=2)
+
+    def a() -> str:
+        return ""
+
+    def b() -> str:
+        return ""
+
+    def c() -> str:
+        return ""
+
+    cache.set(a, "schema", "a")
+    cache.set(b, "schema", "b")
+    assert cache.get(a, "schema") == "a"
+    cache.set(c, "schema", "c")
+
+    assert len(cache) == 2
+    assert cache.get(a, "schema") == "a"
+    assert cache.get(b, "schema") is None
+    assert cache.get(c, "schema") == "c"
+
+
+def test_executor_runs_in_parallel_and_preserves_order(tool_call):
+    def slow_echo(text: str, delay: float) -> str:
+        time.sleep(delay)
+        return text
+
+    toolbox = Toolbox.create([slow_echo], max_workers=4)
+    tool_calls = [
+        tool_call(
+            f"call_{i}", "slow_echo", f'{{"text": "{i}", "delay": {0.2 - i * 0.05}}}'
+        )
+        for i in range(4)
+    ]
+
+    start = time.perf_counter()
+    results = toolbox.execute_tool_calls(tool_calls)
+    elapsed = time.perf_counter() - start
+
+    assert [r["tool_call_id"] for r in results] == [f"call_{i}" for i in range(4)]
+    assert [r["content"] for r in results] == ["0", "1", "2", "3"]
+    assert elapsed < 0.4
+
+
+def test_executor_keeps_results_of_other_calls_on_failure(tool_call):
+    def divide(a: int, b: int) -> dict[str, float]:
+        return {"result": a / b}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        toolbox = Toolbox.create([divide], executor=executor)
+        with pytest.raises(ToolCallsError) as exc_info:
+            toolbox.execute_tool_calls(
+                [
+                    tool_call("call_1", "divide", '{"a": 1, "b": 0}'),
+                    tool_call("call_2", "divide", '{"a": 4, "b": 2}'),
+                ]
+            )
+
+    assert list(exc_info.value.errors) == ["call_1"]
+    assert isinstance(exc_info.value.errors["call_1"], ZeroDivisionError)
+    assert exc_info.value.results == [
+        None,
+        {"role": "tool", "tool_call_id": "call_2", "content": '{"result":2.0}'},
+    ]
+
+
+def test_execute_tool_calls_as_completed(tool_call):
+    def slow_echo(text: str, delay: float) -> str:
+        time.sleep(delay)
+        return text
+
+    toolbox = Toolbox.create([slow_echo], max_workers=2)
+    results = toolbox.execute_tool_calls_as_completed(
+        [
+            tool_call("call_1", "slow_echo", '{"text": "slow", "delay": 0.2}'),
+            tool_call("call_2", "slow_echo", '{"text": "fast", "delay": 0}'),
+        ]
+    )
+
+    assert [r["tool_call_id"] for r in results] == ["call_2", "call_1"]
+
+
+def test_import_does_not_load_openai():
+    code = "\n".join(
+        [
+            "import sys",
+            "from toolsmith import Toolbox",
+            "def f(a: int) -> str: return str(a)",
+            "Toolbox.create([f]).execute_tool_calls([])",
+            "assert 'openai' not in sys.modules",
+        ]
+    )
+    subprocess.run(
+        [sys.executable, "-c", code], check=True, cwd=Path(__file__).parent.parent
+    )
+
+
+def test_schema_subsets_and_json():
+    def get_weather(city: str) -> str:
+        return "Sunny"
+
+    def get_time(city: str) -> str:
+        return "12:00"
+
+    toolbox = Toolbox.create([get_weather, get_time])
+    schema = toolbox.get_schema()
+
+    assert json.loads(toolbox.get_schema_json()) == schema
+    assert toolbox.get_schema_json() is toolbox.get_schema_json()
+    assert toolbox.get_schema(["get_time"]) == [schema[1]]
+    assert json.loads(toolbox.get_schema_json(["get_time", "get_weather"])) == [
+        schema[1],
+        schema[0],
+    ]
+    with pytest.raises(ValueError, match="Function get_date not found in toolbox"):
+        toolbox.get_schema_json(["get_date"])
+
+
+def test_schema_validation_in_nested_models():
+    class Settings(BaseModel):
+        values: dict[str, str]
+
+    class Profile(BaseModel):
+        settings: list[Settings]
+
+    def save_profile(profile: Profile) -> str:
+        return ""
+
+    with pytest.raises(ValueError, match="`values` is a dict, which is not allowed"):
+        func_to_schema(save_profile)
+
+
+@pytest.fixture
+def schema_cache_dir(tmp_path: Path):
+    toolsmith_module.set_schema_cache_dir(tmp_path)
+    toolsmith_module.clear_cache()
+    yield tmp_path
+    toolsmith_module.set_schema_cache_dir(None)
+    toolsmith_module.clear_cache()
+
+
+def test_schema_disk_cache(schema_cache_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    class Query(BaseModel):
+        text: str
+
+    def search_users(query: Query, limit: int = 10) -> str:
+        """Search for users."""
+        return ""
+
+    schema = func_to_schema(search_users)
+    [path] = schema_cache_dir.iterdir()
+    assert path.read_bytes() == toolsmith_module.func_to_schema_json(search_users)
+
+    # A new process would load the finished schema without generating anything
+    toolsmith_module.clear_cache()
+    monkeypatch.setattr(toolsmith_module, "func_to_pydantic", None)
+    assert func_to_schema(search_users) == schema
+    assert toolsmith_module.func_to_schema_json(search_users) == path.read_bytes()
+
+
+def test_schema_disk_cache_invalidation(schema_cache_dir: Path):
+    def make_tool(field_type: type) -> Callable[..., str]:
+        class Query(BaseModel):
+            text: field_type  # type: ignore[valid-type]
+
+        def search_users(query: Query) -> str:
+            return ""
+
+        return search_users
+
+    old_schema = func_to_schema(make_tool(int))
+    toolsmith_module.clear_cache()
+    schema = func_to_schema(make_tool(str))
+    assert '"text":{"type":"string"}' in json.dumps(schema, separators=(",", ":"))
+
+    # The old schema is kept for processes still running the old code
+    toolsmith_module.clear_cache()
+    assert func_to_schema(make_tool(int)) == old_schema
+    assert len(list(schema_cache_dir.iterdir())) == 2
+
+
+def test_schema_disk_cache_tools_with_the_same_qualname(schema_cache_dir: Path):
+    def make_tool(name: str) -> Callable[..., str]:
+        def tool(query: str) -> str:
+            return ""
+
+        tool.__name__ = name
+        return tool
+
+    func_to_schema(make_tool("query_db"))
+    toolsmith_module.clear_cache()
+    schema = func_to_schema(make_tool("fetch_url"))
+    assert schema["function"]["name"] == "fetch_url"
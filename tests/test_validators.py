@@ -0,0 +1,151 @@
+from typing import Iterator, Union
+
+import pytest
+from pydantic import BaseModel, Field, ValidationError
+from typing_extensions import Annotated
+
+from toolsmith import Toolbox, func_to_schema
+from toolsmith.toolsmith import func_to_args_validator
+
+
+class Filter(BaseModel):
+    field: str
+    value: str
+
+
+def search_users(query: str, limit: int = 10, filters: list[Filter] = []) -> str:
+    return f"users {query} {limit} {len(filters)}"
+
+
+def search_orders(query: str, limit: int = 50, filters: list[Filter] = []) -> str:
+    return f"orders {query} {limit} {len(filters)}"
+
+
+def test_identical_signatures_share_a_validator():
+    def by_name(name: str, limit: int = 10) -> str:
+        return name
+
+    def by_id(id: str, limit: int = 10) -> str:
+        return id
+
+    def by_union(query: Union[int, str]) -> str:
+        return str(query)
+
+    def by_reordered_union(query: Union[str, int]) -> str:
+        return str(query)
+
+    users, orders = map(func_to_args_validator, [search_users, search_orders])
+    assert users._signature is orders._signature
+    assert (
+        func_to_args_validator(by_name)._signature
+        is not func_to_args_validator(by_id)._signature
+    )
+    # `Union[int, str] == Union[str, int]`, but they don't validate "1" the same way
+    assert (
+        func_to_args_validator(by_union)._signature
+        is not func_to_args_validator(by_reordered_union)._signature
+    )
+
+    # Defaults are still per function, and arguments follow the parameter order
+    assert list(users.validate('{"filters": [], "query": "a"}').items()) == [
+        ("query", "a"),
+        ("limit", 10),
+        ("filters", []),
+    ]
+    assert orders.validate('{"query": "a"}')["limit"] == 50
+
+    # Each call gets its own copy of mutable defaults
+    first, second = users.validate('{"query": "a"}'), users.validate('{"query": "b"}')
+    assert first["filters"] == [] and first["filters"] is not second["filters"]
+
+
+def test_validators_are_compiled_on_first_call(tool_call):
+    def lookup_invoice(number: str, year: int = 2024) -> str:
+        return f"invoice {number}/{year}"
+
+    toolbox = Toolbox.create([lookup_invoice])
+    toolbox.get_schema()
+    validator = func_to_args_validator(lookup_invoice)
+    assert validator._signature._adapter is None
+
+    results = toolbox.execute_tool_calls(
+        [tool_call("call_1", "lookup_invoice", '{"number": "A1"}')]
+    )
+    assert results[0]["content"] == "invoice A1/2024"
+    assert validator._signature._adapter is not None
+
+
+def test_invalid_arguments(tool_call):
+    toolbox = Toolbox.create([search_users, search_orders])
+    with pytest.raises(ValidationError) as exc_info:
+        toolbox.execute_tool_calls(
+            [tool_call("call_1", "search_orders", '{"filters": [{"field": 1}]}')]
+        )
+    assert [(e["loc"], e["type"]) for e in exc_info.value.errors()] == [
+        (("query",), "missing"),
+        (("filters", 0, "field"), "string_type"),
+        (("filters", 0, "value"), "missing"),
+    ]
+
+    toolbox = Toolbox.create([search_users], isolate_errors=True)
+    [result] = toolbox.execute_tool_calls(
+        [tool_call("call_1", "search_users", '{"query": "a", "limit": "ten"}')]
+    )
+    assert result["content"].startswith(
+        "Error: invalid arguments for `search_users`: limit: Input should be a valid "
+        "integer"
+    )
+
+
+def test_field_defaults(tool_call):
+    def list_orders(
+        page: Annotated[int, Field(default=1, ge=1)],
+        status: str = Field("open", description="Order status"),
+        limit: Annotated[int, Field(le=100)] = 20,
+        tags: list[str] = Field(default_factory=list),
+    ) -> str:
+        return f"{page} {status} {limit} {tags}"
+
+    parameters = func_to_schema(list_orders)["function"]["parameters"]
+    assert parameters["properties"]["status"]["description"] == "Order status"
+    assert parameters["properties"]["limit"]["maximum"] == 100
+    assert parameters["properties"]["page"]["minimum"] == 1
+
+    toolbox = Toolbox.create([list_orders], isolate_errors=True)
+    results = toolbox.execute_tool_calls(
+        [
+            tool_call("call_1", "list_orders", "{}"),
+            tool_call("call_2", "list_orders", '{"limit": 101}'),
+            tool_call("call_3", "list_orders", '{"page": 0}'),
+        ]
+    )
+    assert results[0]["content"] == "1 open 20 []"
+    assert "limit: Input should be less than or equal to 100" in results[1]["content"]
+    assert "page: Input should be greater than or equal to 1" in results[2]["content"]
+
+
+def test_aliased_parameters(tool_call):
+    def tag(
+        a: int = Field(alias="bee"), labels: Iterator[str] = Field(alias="tags")
+    ) -> str:
+        return f"{a} {list(labels)}"
+
+    def count(a: int) -> str:
+        return str(a)
+
+    parameters = func_to_schema(tag)["function"]["parameters"]
+    assert parameters["required"] == ["bee", "tags"]
+    # Parameters with and without an alias don't share a validator
+    assert func_to_args_validator(tag)._signature is not (
+        func_to_args_validator(count)._signature
+    )
+
+    toolbox = Toolbox.create([tag], isolate_errors=True)
+    results = toolbox.execute_tool_calls(
+        [
+            tool_call("call_1", "tag", '{"bee": 1, "tags": ["x", "y"]}'),
+            tool_call("call_2", "tag", '{"a": 1, "tags": []}'),
+        ]
+    )
+    assert results[0]["content"] == "1 ['x', 'y']"
+    assert results[1]["content"].endswith("bee: Field required")
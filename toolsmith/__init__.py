@@ -1,4 +1,86 @@
-from .toolbox import AsyncToolbox, Toolbox
-from .toolsmith import func_to_pydantic, func_to_schema
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["AsyncToolbox", "Toolbox", "func_to_pydantic", "func_to_schema"]
+if TYPE_CHECKING:
+    from .batching import batched
+    from .budget import ResultBudget
+    from .deadlines import remaining_time
+    from .hedging import HedgePolicy
+    from .instrumentation import (
+        Instrumentation,
+        OpenTelemetryInstrumentation,
+        PhaseEvent,
+        ToolStats,
+    )
+    from .planning import ResourceAccess, resources
+    from .registry import ToolRegistry
+    from .result_cache import ResultCache, cached
+    from .retry import RetryPolicy
+    from .streaming import ToolCallStream
+    from .toolbox import AsyncToolbox, ToolCallsError, Toolbox
+    from .toolsmith import func_to_pydantic, func_to_schema, func_to_schema_json
+
+__all__ = [
+    "AsyncToolbox",
+    "HedgePolicy",
+    "Instrumentation",
+    "OpenTelemetryInstrumentation",
+    "PhaseEvent",
+    "ResourceAccess",
+    "ResultBudget",
+    "ResultCache",
+    "RetryPolicy",
+    "ToolCallStream",
+    "ToolCallsError",
+    "ToolRegistry",
+    "ToolStats",
+    "Toolbox",
+    "batched",
+    "cached",
+    "func_to_pydantic",
+    "func_to_schema",
+    "func_to_schema_json",
+    "remaining_time",
+    "resources",
+]
+
+# Public names are resolved on first access, so `import toolsmith` stays cheap for
+# programs that only need part of the package.
+_LAZY_IMPORTS = {
+    "AsyncToolbox": ".toolbox",
+    "HedgePolicy": ".hedging",
+    "Instrumentation": ".instrumentation",
+    "OpenTelemetryInstrumentation": ".instrumentation",
+    "PhaseEvent": ".instrumentation",
+    "ResourceAccess": ".planning",
+    "ResultBudget": ".budget",
+    "ResultCache": ".result_cache",
+    "RetryPolicy": ".retry",
+    "ToolCallStream": ".streaming",
+    "ToolCallsError": ".toolbox",
+    "ToolRegistry": ".registry",
+    "ToolStats": ".instrumentation",
+    "Toolbox": ".toolbox",
+    "batched": ".batching",
+    "cached": ".result_cache",
+    "func_to_pydantic": ".toolsmith",
+    "func_to_schema": ".toolsmith",
+    "func_to_schema_json": ".toolsmith",
+    "remaining_time": ".deadlines",
+    "resources": ".planning",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
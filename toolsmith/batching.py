@@ -0,0 +1,84 @@
+from typing import Any, Callable, NamedTuple, TypeVar, Union
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_BATCH_IMPLEMENTATION_ATTR = "_toolsmith_batch_implementation"
+
+
+class BatchImplementation(NamedTuple):
+    """A vectorized implementation of a tool, used by `execute_batch`.
+
+    Args:
+        func: Called with a list of validated keyword-argument dicts, one per distinct
+            call, and returns (or, if `async`, resolves to) a list with one result per
+            call, in the same order
+        max_batch_size: Maximum number of calls passed to `func` at once
+    """
+
+    func: Callable[[list[dict[str, Any]]], Any]
+    max_batch_size: Union[int, None] = None
+
+
+def batched(
+    batch_func: Callable[[list[dict[str, Any]]], Any],
+    max_batch_size: Union[int, None] = None,
+) -> Callable[[F], F]:
+    """Declare a vectorized implementation for a tool. When `execute_batch` sees several
+    calls to the tool, it makes one call to `batch_func` instead of one call per tool
+    call. The tool itself is returned unchanged and is still used everywhere else.
+
+    Args:
+        batch_func: Called with a list of validated keyword-argument dicts, one per
+            distinct call. Must return a list with one result per call, in order.
+            May be `async`.
+        max_batch_size: Maximum number of calls passed to `batch_func` at once
+
+    Example:
+        ```py
+        def get_users_batch(calls: list[dict[str, Any]]) -> list[str]:
+            users = db.get_users([call["id"] for call in calls])
+            return [user.name for user in users]
+
+        @batched(get_users_batch, max_batch_size=100)
+        def get_user(id: str) -> str:
+            return db.get_users([id])[0].name
+        ```
+    """
+
+    def decorator(func: F) -> F:
+        setattr(
+            func,
+            _BATCH_IMPLEMENTATION_ATTR,
+            BatchImplementation(batch_func, max_batch_size),
+        )
+        return func
+
+    return decorator
+
+
+def get_batch_implementation(
+    func: Callable[..., Any],
+) -> Union[BatchImplementation, None]:
+    return getattr(func, _BATCH_IMPLEMENTATION_ATTR, None)
+
+
+class BatchWork:
+    """One unit of work when executing a batch: either a single function call or one
+    call to a batch implementation.
+
+    `targets` has one entry per distinct call, listing the indices of every invocation
+    in the batch that receives that call's result. Identical calls to idempotent (cached)
+    tools share an entry, so they only run once.
+    """
+
+    __slots__ = ("func_name", "batch", "targets")
+
+    def __init__(
+        self,
+        func_name: str,
+        batch: Union[BatchImplementation, None],
+        targets: list[list[int]],
+    ):
+        self.func_name = func_name
+        self.batch = batch
+        self.targets = targets
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Callable, Sequence, Union
+
+from toolsmith.serialization import truncate_result
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionToolMessageParam
+
+# Token counts are estimated from the classes of a text's UTF-8 bytes: ASCII letters,
+# digits, punctuation and whitespace, and the lead bytes of non-ASCII characters
+# (continuation bytes are dropped). The BPE tokenizers of OpenAI models split text into
+# words with a leading space or punctuation character, groups of up to 3 digits, runs
+# of punctuation and runs of whitespace before encoding it, so the estimate weighs the
+# runs of each class and the transitions between them. The weights were fitted to the
+# number of such pieces in JSON, prose, code, logs, CSV and non-English text, and are
+# within a few percent on each.
+_LETTER, _DIGIT, _PUNCT, _SPACE, _WIDE = b"a", b"0", b".", b" ", b"x"
+
+
+def _byte_classes() -> bytes:
+    table = bytearray(_PUNCT * 256)
+    for byte in range(256):
+        char = chr(byte)
+        if byte >= 0xC0:
+            table[byte] = _WIDE[0]
+        elif char.isascii() and char.isalpha():
+            table[byte] = _LETTER[0]
+        elif char.isdigit():
+            table[byte] = _DIGIT[0]
+        elif char.isspace() and byte < 0x80:
+            table[byte] = _SPACE[0]
+    return bytes(table)
+
+
+def _only(byte_class: bytes) -> bytes:
+    return bytes(byte if byte == byte_class[0] else ord("-") for byte in range(256))
+
+
+_BYTE_CLASSES = _byte_classes()
+_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+_ONLY_LETTERS, _ONLY_DIGITS, _ONLY_PUNCT, _ONLY_SPACES = map(
+    _only, (_LETTER, _DIGIT, _PUNCT, _SPACE)
+)
+
+# Longer texts are estimated from evenly spaced samples
+_SAMPLES = 8
+_SAMPLE_CHARS = 1024
+
+# Attempts at truncating a result to its budget before cutting it down to a prefix
+_MAX_TRUNCATIONS = 4
+
+
+def _runs(classes: bytes, only: bytes, byte_class: bytes) -> int:
+    # bytes.count doesn't count overlapping matches, so count where each run starts
+    return classes.translate(only).count(b"-" + byte_class) + classes.startswith(
+        byte_class
+    )
+
+
+def _estimate(text: str) -> float:
+    classes = text.encode().translate(_BYTE_CLASSES, _CONTINUATION_BYTES)
+    count = classes.count
+    return (
+        0.75 * _runs(classes, _ONLY_LETTERS, _LETTER)
+        + 0.1 * count(_LETTER)
+        + 0.25 * _runs(classes, _ONLY_DIGITS, _DIGIT)
+        + 0.25 * count(_DIGIT)
+        + 1.5 * _runs(classes, _ONLY_PUNCT, _PUNCT)
+        + 0.1 * count(_PUNCT)
+        + 1.35 * _runs(classes, _ONLY_SPACES, _SPACE)
+        # A space or punctuation character before a word is part of its token
+        - 1.5 * count(_SPACE + _LETTER)
+        - 1.65 * count(_PUNCT + _LETTER)
+        - 1.35 * count(_SPACE + _PUNCT)
+        + count(_WIDE)
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many tokens a text takes in a prompt, without a tokenizer or network
+    access.
+
+    Looks at the runs of letters, digits, punctuation and whitespace that tokenizers of
+    OpenAI models split text into, so it adapts to JSON, code and non-English text
+    rather than assuming a fixed number of characters per token. Texts over 8K
+    characters are estimated from samples. Use an exact tokenizer such as tiktoken
+    where exact counts matter.
+    """
+    if len(text) <= _SAMPLES * _SAMPLE_CHARS:
+        return max(0, round(_estimate(text)))
+
+    step = len(text) // _SAMPLES
+    sampled = sum(
+        _estimate(text[start : start + _SAMPLE_CHARS])
+        for start in range(0, step * _SAMPLES, step)
+    )
+    return max(0, round(sampled * len(text) / (_SAMPLES * _SAMPLE_CHARS)))
+
+
+class _Usage:
+    __slots__ = ("calls", "bytes", "tokens", "original_tokens", "summarized")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.bytes = 0
+        self.tokens = 0
+        self.original_tokens = 0
+        self.summarized = 0
+
+
+class ResultBudget:
+    """Token budget for the tool results that go into the next prompt, and a record of
+    how many bytes and tokens each function's results contribute.
+
+    Results over budget are replaced with the output of `summarize`, which truncates
+    them by default. The budget of a turn is split fairly: results smaller than an even
+    share are kept as they are, and the largest results split what's left.
+
+    Args:
+        max_call_tokens: Most tokens the result of one tool call may take
+        max_turn_tokens: Most tokens the results of one turn's tool calls may take
+            together. With `execute_batch`, each conversation gets its own budget.
+        estimate_tokens: Counts the tokens of a result. Defaults to a heuristic
+            (`estimate_tokens`), pass e.g. `lambda text: len(encoding.encode(text))`
+            for exact counts with tiktoken.
+        summarize: Called with the function name, an over-budget result and the
+            number of tokens it may take, returns the content to use instead. Content
+            that is still over budget is truncated.
+
+    Example:
+        ```py
+        budget = ResultBudget(max_call_tokens=4000, max_turn_tokens=12000)
+        toolbox = Toolbox.create([search_users], result_budget=budget)
+        ...
+        budget.snapshot()["search_users"]["tokens"]
+        ```
+    """
+
+    def __init__(
+        self,
+        max_call_tokens: Union[int, None] = None,
+        max_turn_tokens: Union[int, None] = None,
+        estimate_tokens: Callable[[str], int] = estimate_tokens,
+        summarize: Union[Callable[[str, str, int], str], None] = None,
+    ):
+        self.max_call_tokens = max_call_tokens
+        self.max_turn_tokens = max_turn_tokens
+        self.estimate_tokens = estimate_tokens
+        self.summarize = summarize
+        self._usage: dict[str, _Usage] = {}
+        self._lock = threading.Lock()
+
+    def start_turn(self, count: int) -> TurnBudget:
+        """Start budgeting the results of a turn with `count` tool calls."""
+        return TurnBudget(self, count)
+
+    def fit_all(self, func_names: Sequence[str], contents: Sequence[str]) -> list[str]:
+        """Fit the results of a whole turn into the budget.
+
+        Args:
+            func_names: The function that produced each result
+            contents: The results' contents, in the same order
+
+        Returns:
+            The contents to use, in the same order
+        """
+        tokens = [self.estimate_tokens(content) for content in contents]
+        turn = self.start_turn(len(contents))
+        fitted = list(contents)
+        # Smallest first, so that what small results don't use goes to the large ones
+        for index in sorted(range(len(contents)), key=tokens.__getitem__):
+            fitted[index] = turn.fit(func_names[index], contents[index], tokens[index])
+        return fitted
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        """Get a copy of the usage recorded so far.
+
+        Returns:
+            Mapping of function name to the number of results (`calls`), and their
+            total UTF-8 `bytes` and `tokens` as returned, the `original_tokens` before
+            budgeting, and how many were `summarized` to fit
+        """
+        with self._lock:
+            return {
+                func_name: {name: getattr(usage, name) for name in _Usage.__slots__}
+                for func_name, usage in self._usage.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._usage.clear()
+
+    def _shrink(
+        self, func_name: str, content: str, tokens: int, max_tokens: int
+    ) -> tuple[str, int]:
+        if self.summarize is not None:
+            content = self.summarize(func_name, content, max_tokens)
+            tokens = self.estimate_tokens(content)
+
+        original = content
+        max_chars = len(content)
+        for _ in range(_MAX_TRUNCATIONS):
+            if tokens <= max_tokens:
+                return content, tokens
+            # Token density varies within a result, so this may take a few attempts
+            max_chars = max_chars * max_tokens // tokens
+            content = truncate_result(original, max_chars)
+            tokens = self.estimate_tokens(content)
+
+        if tokens > max_tokens:
+            content = original[: max_chars * max_tokens // tokens]
+            tokens = self.estimate_tokens(content)
+        return content, tokens
+
+    def _record(
+        self,
+        func_name: str,
+        content: str,
+        tokens: int,
+        original_tokens: int,
+        summarized: bool,
+    ) -> None:
+        size = len(content) if content.isascii() else len(content.encode())
+        with self._lock:
+            usage = self._usage.get(func_name)
+            if usage is None:
+                usage = self._usage[func_name] = _Usage()
+            usage.calls += 1
+            usage.bytes += size
+            usage.tokens += tokens
+            usage.original_tokens += original_tokens
+            usage.summarized += summarized
+
+
+class TurnBudget:
+    """Splits a `ResultBudget`'s turn budget between the results of one turn as they
+    arrive. Each result may take an even share of the tokens the turn has left, so
+    results that arrive early can't starve the rest.
+
+    Create one with `ResultBudget.start_turn`.
+    """
+
+    def __init__(self, budget: ResultBudget, count: int):
+        self._budget = budget
+        self._remaining = budget.max_turn_tokens
+        self._outstanding = count
+
+    def fit(self, func_name: str, content: str, tokens: Union[int, None] = None) -> str:
+        """Fit one result into the budget, returning the content to use.
+
+        Args:
+            func_name: The function that produced the result
+            content: The result's content
+            tokens: The content's estimated tokens, if already known
+        """
+        budget = self._budget
+        if tokens is None:
+            tokens = budget.estimate_tokens(content)
+
+        limit = budget.max_call_tokens
+        if self._remaining is not None:
+            share = max(0, self._remaining) // max(1, self._outstanding)
+            limit = share if limit is None else min(limit, share)
+        self._outstanding -= 1
+
+        original_tokens = tokens
+        summarized = limit is not None and tokens > limit
+        if summarized:
+            content, tokens = budget._shrink(func_name, content, tokens, limit)
+        if self._remaining is not None:
+            self._remaining -= tokens
+        budget._record(func_name, content, tokens, original_tokens, summarized)
+        return content
+
+
+def fit_messages(
+    budget: ResultBudget,
+    func_names: Sequence[str],
+    messages: list[ChatCompletionToolMessageParam],
+) -> list[ChatCompletionToolMessageParam]:
+    """Fit the contents of a turn's tool messages into `budget`, copying the messages
+    whose content changes."""
+    contents = budget.fit_all(
+        func_names, [message["content"] for message in messages]  # type: ignore[misc]
+    )
+    return [
+        message if message["content"] is content else {**message, "content": content}
+        for message, content in zip(messages, contents)
+    ]
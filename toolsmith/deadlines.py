@@ -0,0 +1,50 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Union
+
+# `time.monotonic()` time by which the current tool call, or the tool calls scheduled in
+# the current context, must finish. Context variables are copied into the tasks and
+# executor threads that run tool calls, and into tool calls made by tools, so the
+# deadline follows the work.
+_deadline: ContextVar[Union[float, None]] = ContextVar(
+    "toolsmith_deadline", default=None
+)
+
+
+def remaining_time() -> Union[float, None]:
+    """Seconds left before the current tool call's deadline, or `None` if it has none.
+
+    A tool call's deadline is the earlier of its `AsyncToolbox` timeout and the
+    `deadline` of the turn it's part of. Tool functions can call this to bound their own
+    work, e.g. as the timeout of a request to a downstream service. Not available to
+    functions run in another process.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def get_deadline() -> Union[float, None]:
+    return _deadline.get()
+
+
+def deadline_after(seconds: Union[float, None]) -> Union[float, None]:
+    return None if seconds is None else time.monotonic() + seconds
+
+
+@contextmanager
+def deadline_scope(deadline: Union[float, None]) -> Iterator[None]:
+    """Apply a deadline to work started in this block. Never extends an outer
+    deadline."""
+    outer = _deadline.get()
+    if deadline is None or (outer is not None and outer <= deadline):
+        yield
+        return
+
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
@@ -0,0 +1,112 @@
+import asyncio
+import collections
+import logging
+import time
+from typing import Awaitable, Callable, NamedTuple, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Durations of a function's recent successful calls, for percentile-based
+    hedging."""
+
+    __slots__ = ("_samples",)
+
+    def __init__(self, window: int):
+        self._samples: collections.deque[float] = collections.deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgePolicy(NamedTuple):
+    """When to send duplicate ("hedged") calls to a function with long-tail latency.
+
+    If a call hasn't finished after the hedging delay, the same call is started again
+    and whichever finishes first is used; the others are cancelled. Sync functions
+    can't be interrupted, so their losing calls keep running on their worker threads.
+    Only use hedging for idempotent functions. With `percentile=0.95`, about 5% of calls
+    are hedged.
+
+    Args:
+        delay: Seconds to wait before hedging. With `percentile`, only used until
+            enough calls have been seen. `None` means no hedging until then.
+        percentile: Hedge calls that run longer than this percentile of the function's
+            recent successful calls, e.g. `0.95`
+        max_hedges: Maximum number of duplicate calls per call. Each one is started
+            another delay after the previous one.
+        min_samples: Number of calls to see before using `percentile`
+        window: Number of recent calls `percentile` is computed over
+    """
+
+    delay: Union[float, None] = None
+    percentile: Union[float, None] = None
+    max_hedges: int = 1
+    min_samples: int = 20
+    window: int = 100
+
+    def get_delay(self, latencies: LatencyTracker) -> Union[float, None]:
+        """Seconds to wait before hedging the next call, or `None` to not hedge it."""
+        if self.percentile is not None and len(latencies) >= self.min_samples:
+            return latencies.percentile(self.percentile)
+        return self.delay
+
+
+async def run_hedged(
+    policy: HedgePolicy,
+    latencies: LatencyTracker,
+    func_name: str,
+    call: Callable[[], Awaitable[T]],
+) -> T:
+    """Await `call()`, starting duplicate calls according to `policy`. Returns the first
+    successful result; if every call fails, raises the first error."""
+    loop = asyncio.get_running_loop()
+    delay = policy.get_delay(latencies)
+    start = loop.time()
+    pending: set[asyncio.Future[T]] = set()
+    first_error: Union[BaseException, None] = None
+
+    async def _timed() -> T:
+        call_start = time.perf_counter()
+        result = await call()
+        latencies.add(time.perf_counter() - call_start)
+        return result
+
+    pending.add(asyncio.ensure_future(_timed()))
+    started = 1
+    try:
+        while True:
+            timeout = None
+            if delay is not None and started <= policy.max_hedges:
+                timeout = max(0.0, start + delay * started - loop.time())
+            done, _ = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                logger.debug(f"`{func_name}`: hedging a call after {delay:.3f}s")
+                pending.add(asyncio.ensure_future(_timed()))
+                started += 1
+                continue
+
+            for task in done:
+                pending.remove(task)
+                error = task.exception()
+                if error is None:
+                    return task.result()
+                if first_error is None:
+                    first_error = error
+            if not pending:
+                raise first_error  # type: ignore[misc]
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,188 @@
+import abc
+import bisect
+import threading
+from typing import Any, Literal, NamedTuple, Union
+
+Phase = Literal["parse", "execute", "serialize"]
+
+# Upper bounds of the histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_SECONDS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS_CHARS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class PhaseEvent(NamedTuple):
+    """A single phase of handling one tool call.
+
+    Args:
+        func_name: Name of the tool function
+        phase: `parse` (argument JSON parsing and validation), `execute` (running the
+            function) or `serialize` (turning the result into the tool message content)
+        start_ns: Wall-clock start time, in nanoseconds since the epoch. Derived from
+            `end_ns` and the phase's duration, which is measured with a monotonic
+            clock, so it is unaffected by changes to the system clock.
+        end_ns: Wall-clock end time, in nanoseconds since the epoch
+        size: Length in characters of the arguments JSON (`parse`) or of the result
+            content (`serialize`), otherwise `None`
+        error: The exception raised during the phase, if any
+    """
+
+    func_name: str
+    phase: Phase
+    start_ns: int
+    end_ns: int
+    size: Union[int, None] = None
+    error: Union[BaseException, None] = None
+
+    @property
+    def duration(self) -> float:
+        """Duration of the phase in seconds."""
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+class Instrumentation(abc.ABC):
+    """Receives a `PhaseEvent` for every phase of every tool call. Subclass this and
+    implement `record` to export events to your own metrics or tracing system.
+
+    `record` is called synchronously on the hot path, and from worker threads when tool
+    calls run on an executor, so it should be fast and thread-safe.
+    """
+
+    @abc.abstractmethod
+    def record(self, event: PhaseEvent) -> None: ...
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "total", "min", "max")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> dict[str, Any]:
+        count = sum(self.counts)
+        return {
+            "count": count,
+            "sum": self.total,
+            "min": self.min if count else None,
+            "max": self.max if count else None,
+            "buckets": {
+                **{str(bound): n for bound, n in zip(self.bounds, self.counts)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class _PhaseStats:
+    __slots__ = ("count", "errors", "latency", "size")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.latency = _Histogram(LATENCY_BUCKETS_SECONDS)
+        self.size = _Histogram(SIZE_BUCKETS_CHARS)
+
+
+class ToolStats(Instrumentation):
+    """In-process collector of per-function, per-phase call counts, error counts, and
+    histograms of latency and argument/result sizes.
+
+    Example:
+        ```py
+        stats = ToolStats()
+        toolbox = Toolbox.create([search_users], instrumentation=stats)
+        ...
+        stats.snapshot()["search_users"]["execute"]["latency"]["sum"]
+        ```
+    """
+
+    def __init__(self) -> None:
+        self._stats: dict[tuple[str, str], _PhaseStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, event: PhaseEvent) -> None:
+        key = (event.func_name, event.phase)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _PhaseStats()
+            stats.count += 1
+            if event.error is not None:
+                stats.errors += 1
+            stats.latency.add(event.duration)
+            if event.size is not None:
+                stats.size.add(event.size)
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Get a copy of the collected stats.
+
+        Returns:
+            Mapping of function name to phase to that phase's stats: `count`, `errors`,
+            `latency` (seconds) and `size` (characters) histograms. Histograms have
+            `count`, `sum`, `min`, `max`, and `buckets` keyed by their upper bound.
+        """
+        with self._lock:
+            result: dict[str, dict[str, dict[str, Any]]] = {}
+            for (func_name, phase), stats in self._stats.items():
+                result.setdefault(func_name, {})[phase] = {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "latency": stats.latency.snapshot(),
+                    "size": stats.size.snapshot(),
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """Emits an OpenTelemetry span per phase, named `toolsmith.<phase>`. Requires
+    `opentelemetry-api` to be installed.
+
+    Spans are created once each phase has finished, with its real start and end times,
+    so spans created by the tool itself are not nested under them.
+
+    Args:
+        tracer: The tracer to use. Defaults to the global tracer provider's tracer.
+    """
+
+    def __init__(self, tracer: Any = None):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("toolsmith")
+
+    def record(self, event: PhaseEvent) -> None:
+        attributes: dict[str, Any] = {"toolsmith.function": event.func_name}
+        if event.size is not None:
+            attributes["toolsmith.size"] = event.size
+
+        span = self._tracer.start_span(
+            f"toolsmith.{event.phase}", start_time=event.start_ns, attributes=attributes
+        )
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end(end_time=event.end_ns)
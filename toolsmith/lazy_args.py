@@ -0,0 +1,163 @@
+import collections.abc
+import json
+import re
+from array import array
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Generic,
+    Mapping,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+)
+
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+# Whole JSON strings, or the characters that delimit values
+_JSON_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\],:]', re.DOTALL)
+# Whole JSON strings, or the characters that affect nesting depth
+_NESTED_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]', re.DOTALL)
+
+
+def streamed_item_type(annotation: Any) -> Union[Any, None]:
+    """Return `T` if a parameter is annotated as `Iterator[T]`, otherwise `None`."""
+    if get_origin(annotation) is collections.abc.Iterator:
+        args = get_args(annotation)
+        if args:
+            return args[0]
+    return None
+
+
+class LazyItems(Generic[T]):
+    """Iterator over the items of a JSON array, validating each item as it is reached.
+
+    Passed to functions for parameters annotated as `Iterator[T]`, so large lists are
+    never fully materialized. Items are read straight from the tool call's arguments
+    JSON, at offsets found while parsing the other arguments. Invalid items raise
+    `pydantic.ValidationError` during iteration.
+    """
+
+    __slots__ = ("_text", "_separators", "_item_type", "_adapter", "_index")
+
+    def __init__(
+        self,
+        text: str,
+        separators: array,
+        item_type: Any,
+        adapter: Union[TypeAdapter[T], None] = None,
+    ):
+        # `separators` holds the offsets of the array's opening bracket, the commas
+        # between its items and its closing bracket
+        self._text = text
+        self._separators = separators
+        self._item_type = item_type
+        self._adapter = adapter
+        self._index = 0
+
+    def __iter__(self) -> "LazyItems[T]":
+        return self
+
+    def __next__(self) -> T:
+        separators = self._separators
+        index = self._index
+        if index + 1 >= len(separators):
+            raise StopIteration
+        item_json = self._text[separators[index] + 1 : separators[index + 1]]
+        if len(separators) == 2 and not item_json.strip():
+            raise StopIteration  # empty array
+
+        if self._adapter is None:
+            self._adapter = TypeAdapter(self._item_type)
+        self._index = index + 1
+        return self._adapter.validate_json(item_json)
+
+    def __reduce__(self) -> Any:
+        # Sent to other processes as just the array's JSON, which is far smaller than
+        # the validated items
+        start, end = self._separators[0], self._separators[-1] + 1
+        separators = array("q", [offset - start for offset in self._separators])
+        return (LazyItems, (self._text[start:end], separators, self._item_type))
+
+
+def validate_args(
+    validate_json: Callable[[str], dict[str, Any]],
+    streamed: Mapping[str, tuple[str, Any, TypeAdapter[Any]]],
+    args_json: str,
+) -> dict[str, Any]:
+    """Validate a tool call's arguments JSON with `validate_json`, passing the arrays of
+    `streamed` parameters on as `LazyItems` instead of validating them up front.
+    `streamed` maps the parameters' keys in the JSON, which are their aliases if they
+    have one, to their names, item types and item validators."""
+    if not streamed:
+        return validate_json(args_json)
+
+    separators = _find_streamed_arrays(args_json, streamed)
+    if not separators:
+        return validate_json(args_json)
+
+    # Validate everything else with the streamed arrays replaced by empty ones
+    parts = []
+    offset = 0
+    for array_separators in sorted(separators.values(), key=lambda s: s[0]):
+        parts.append(args_json[offset : array_separators[0]])
+        parts.append("[]")
+        offset = array_separators[-1] + 1
+    parts.append(args_json[offset:])
+    args = validate_json("".join(parts))
+
+    for key, array_separators in separators.items():
+        name, item_type, adapter = streamed[key]
+        args[name] = LazyItems(args_json, array_separators, item_type, adapter)
+    return args
+
+
+def _find_streamed_arrays(args_json: str, streamed: Container[str]) -> dict[str, array]:
+    """Find the separators of the arrays given as values of `streamed` keys in a JSON
+    object, in a single pass. Malformed JSON gives partial results, and is reported by
+    validation instead."""
+    found: dict[str, array] = {}
+    depth = 0
+    key: Union[str, None] = None
+    last_string: Union[re.Match[str], None] = None
+    separators: Union[array, None] = None
+    pos = 0
+    while True:
+        # Commas and colons only matter in the object itself and in streamed arrays
+        pattern = (
+            _NESTED_TOKEN
+            if depth > 2 or (depth == 2 and separators is None)
+            else _JSON_TOKEN
+        )
+        match = pattern.search(args_json, pos)
+        if match is None:
+            return found
+        pos = match.end()
+
+        # Only look at the first character, so long strings aren't copied
+        char = args_json[match.start()]
+        if char == '"':
+            last_string = match
+            continue
+        if char in "[{":
+            depth += 1
+            if depth == 2 and char == "[" and key in streamed:
+                separators = array("q", [match.start()])
+        elif char in "]}":
+            if depth == 2 and separators is not None:
+                separators.append(match.start())
+                found[key] = separators  # type: ignore[index]
+                separators = None
+            depth -= 1
+        elif char == ",":
+            if depth == 1:
+                key = None
+            elif separators is not None:
+                separators.append(match.start())
+        elif char == ":" and depth == 1 and last_string is not None:
+            key = json.loads(last_string.group())
+        last_string = None
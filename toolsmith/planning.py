@@ -0,0 +1,138 @@
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    NamedTuple,
+    TypeVar,
+    Union,
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+T = TypeVar("T")
+
+_RESOURCE_ACCESS_ATTR = "_toolsmith_resource_access"
+
+Keys = Union[Callable[[dict[str, Any]], Iterable[Hashable]], Iterable[Hashable]]
+
+# Every call with declared resources reads this key, so a call that writes it runs
+# after all calls before it and before all calls after it
+_EVERYTHING = object()
+
+
+class ResourceAccess(NamedTuple):
+    """The resources a tool reads and writes, used to order conflicting tool calls
+    within a turn.
+
+    Args:
+        reads: Keys of the resources a call reads, or a function that takes the call's
+            validated arguments and returns them
+        writes: Keys of the resources a call writes, or a function that takes the
+            call's validated arguments and returns them
+    """
+
+    reads: Keys = ()
+    writes: Keys = ()
+
+    def resolve(self, args: dict[str, Any]) -> tuple[set[Hashable], set[Hashable]]:
+        """Get the keys a call with the given validated arguments reads and writes."""
+        writes = set(self.writes(args) if callable(self.writes) else self.writes)
+        reads = set(self.reads(args) if callable(self.reads) else self.reads)
+        # Writing a resource already orders the call against its readers
+        return reads - writes, writes
+
+
+def resources(reads: Keys = (), writes: Keys = ()) -> Callable[[F], F]:
+    """Declare the resources a tool reads and writes. Toolboxes run calls that write a
+    resource after earlier calls in the same turn that read or write it, and before
+    later ones. Calls that don't conflict still run concurrently. The tool itself is
+    returned unchanged.
+
+    Args:
+        reads: Keys of the resources the tool reads, or a function that takes a call's
+            validated arguments and returns them
+        writes: Keys of the resources the tool writes, or a function that takes a
+            call's validated arguments and returns them
+
+    Example:
+        ```py
+        @resources(reads=lambda args: [("user", args["id"])])
+        def get_user(id: str) -> str:
+            ...
+
+        @resources(writes=lambda args: [("user", args["id"])])
+        def rename_user(id: str, name: str) -> str:
+            ...
+        ```
+    """
+
+    def decorator(func: F) -> F:
+        setattr(func, _RESOURCE_ACCESS_ATTR, ResourceAccess(reads, writes))
+        return func
+
+    return decorator
+
+
+def get_resource_access(func: Callable[..., Any]) -> Union[ResourceAccess, None]:
+    return getattr(func, _RESOURCE_ACCESS_ATTR, None)
+
+
+class ResourcePlanner:
+    """Builds the dependencies between the calls of a turn, one call at a time, in the
+    order the calls were made.
+
+    A call that writes a resource depends on the last earlier call that wrote it, and on
+    the calls that read it since. A call that reads a resource only depends on the last
+    earlier call that wrote it, so reads of the same resource still run concurrently.
+    Only the nearest conflicting calls are listed, the rest follow transitively.
+    """
+
+    __slots__ = ("_count", "_last_write", "_reads")
+
+    def __init__(self) -> None:
+        self._count = 0
+        self._last_write: dict[Hashable, int] = {}
+        self._reads: dict[Hashable, list[int]] = {}
+
+    def add(self, reads: Iterable[Hashable], writes: Iterable[Hashable]) -> list[int]:
+        """Add a call that reads and writes the given keys, returning the indices of
+        the earlier calls it has to wait for."""
+        return self._add((*reads, _EVERYTHING), writes)
+
+    def add_exclusive(self) -> list[int]:
+        """Add a call that conflicts with every other call with declared resources."""
+        return self._add((), (_EVERYTHING,))
+
+    def add_independent(self) -> list[int]:
+        """Add a call that doesn't declare resources, and doesn't wait for any call."""
+        self._count += 1
+        return []
+
+    def _add(self, reads: Iterable[Hashable], writes: Iterable[Hashable]) -> list[int]:
+        index = self._count
+        self._count += 1
+
+        dependencies = set()
+        for key in reads:
+            last_write = self._last_write.get(key)
+            if last_write is not None:
+                dependencies.add(last_write)
+            self._reads.setdefault(key, []).append(index)
+        for key in writes:
+            last_write = self._last_write.get(key)
+            if last_write is not None:
+                dependencies.add(last_write)
+            dependencies.update(self._reads.pop(key, ()))
+            self._last_write[key] = index
+        return sorted(dependencies)
+
+
+async def run_after(
+    dependencies: list["asyncio.Future[Any]"], call: Callable[[], Awaitable[T]]
+) -> T:
+    """Run `call` once the calls it depends on have finished, however they finished."""
+    if dependencies:
+        await asyncio.wait(dependencies)
+    return await call()
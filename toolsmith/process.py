@@ -0,0 +1,64 @@
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Literal, TypeVar, Union
+
+from toolsmith.toolsmith import func_to_args_validator
+
+T = TypeVar("T")
+
+ExecutorKind = Literal["process", "interpreter"]
+
+
+def interpreters_available() -> bool:
+    return hasattr(concurrent.futures, "InterpreterPoolExecutor")
+
+
+def create_executor(kind: ExecutorKind) -> Executor:
+    if kind == "process":
+        return ProcessPoolExecutor()
+    if not interpreters_available():
+        raise ValueError("`interpreter` executors require Python 3.14 or later")
+    return concurrent.futures.InterpreterPoolExecutor()  # type: ignore[attr-defined]
+
+
+def is_out_of_process(executor: Executor) -> bool:
+    """Whether calls submitted to the executor run outside this interpreter, so their
+    arguments have to be serialized."""
+    if isinstance(executor, ProcessPoolExecutor):
+        return True
+    interpreter_pool = getattr(concurrent.futures, "InterpreterPoolExecutor", None)
+    return interpreter_pool is not None and isinstance(executor, interpreter_pool)
+
+
+def out_of_process_call(
+    func: Callable[..., T], args: dict[str, Any], args_json: Union[str, None] = None
+) -> Callable[[], T]:
+    """Prepare a call to run in another process or interpreter.
+
+    The tool call's arguments JSON is sent as it is and validated again in the worker,
+    where the function's argument validator is built once and cached, instead of
+    pickling each pydantic model. Encoding the validated arguments again would not
+    round-trip secrets, excluded fields or custom serializers. Arguments without their
+    JSON are pickled as-is.
+    """
+    if args_json is None:
+        return functools.partial(_call, func, args)
+    return functools.partial(call_with_json_args, func, args_json)
+
+
+def call_with_json_args(func: Callable[..., Any], args_json: str) -> Any:
+    return _call(func, func_to_args_validator(func).validate(args_json))
+
+
+def _call(func: Callable[..., Any], args: dict[str, Any]) -> Any:
+    result = func(**args)
+    if inspect.isawaitable(result):
+        result = asyncio.run(_await(result))
+    return result
+
+
+async def _await(awaitable: Awaitable[T]) -> T:
+    return await awaitable
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Sequence, TypeVar, Union
+
+from toolsmith.result_cache import ResultCache, get_result_cache
+from toolsmith.toolsmith import (
+    func_to_args_validator,
+    func_to_schema,
+    func_to_schema_json,
+)
+from toolsmith.validators import ArgsValidator
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionToolParam
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_SUBSET_CACHE_SIZE = 256
+
+
+class CompiledTool(NamedTuple):
+    """A registered tool with its generated artifacts."""
+
+    func: Callable[..., Any]
+    args_validator: ArgsValidator
+    schema: ChatCompletionToolParam
+    schema_json: bytes
+    result_cache: Union[ResultCache, None]
+
+
+class ToolSubset(NamedTuple):
+    """The artifacts of a subset of a registry's tools, in the shape toolboxes use them.
+    Shared between toolboxes, so none of them should be mutated."""
+
+    functions: dict[str, Callable[..., Any]]
+    args_validators: dict[str, ArgsValidator]
+    schemas: list[ChatCompletionToolParam]
+    schema_json_fragments: dict[str, bytes]
+    schema_json: bytes
+    result_caches: dict[str, ResultCache]
+
+
+class ToolRegistry:
+    """A compiled set of tools to create many toolboxes from, e.g. one per request with
+    a different subset of tools for each tenant.
+
+    Each tool's schema is generated and validated once, when it is registered, along
+    with its argument validator. Toolboxes created with `Toolbox.from_registry` share
+    them, so creating a toolbox and getting its schema doesn't generate or validate any
+    schemas. Recently used subsets are cached, including their joined schema JSON.
+    Creating a toolbox still takes time linear in the number of its tools, see
+    `Toolbox.from_registry`.
+
+    Args:
+        functions: The functions to register, keyed by their `__name__`
+        subset_cache_size: Number of recently used subsets to cache
+
+    Example:
+        ```py
+        registry = ToolRegistry([create_user, search_users, delete_user])
+
+        toolbox = Toolbox.from_registry(registry, ["create_user", "search_users"])
+        ```
+    """
+
+    def __init__(
+        self,
+        functions: Sequence[Callable[..., Any]] = (),
+        subset_cache_size: int = DEFAULT_SUBSET_CACHE_SIZE,
+    ):
+        self.subset_cache_size = subset_cache_size
+        self._tools: dict[str, CompiledTool] = {}
+        self._subsets: OrderedDict[tuple[str, ...], ToolSubset] = OrderedDict()
+        self._lock = threading.Lock()
+        for func in functions:
+            self.register(func)
+
+    def register(self, func: F) -> F:
+        """Compile and add a function to the registry. Can be used as a decorator.
+
+        Raises:
+            ValueError: If the function's schema is invalid, or another function with
+                the same name is already registered
+        """
+        name = func.__name__
+        if name in self._tools and self._tools[name].func is not func:
+            raise ValueError(f"Function {name} is already registered")
+
+        self._tools[name] = CompiledTool(
+            func=func,
+            args_validator=func_to_args_validator(func),
+            schema=func_to_schema(func),
+            schema_json=func_to_schema_json(func),
+            result_cache=get_result_cache(func),
+        )
+        with self._lock:
+            self._subsets.clear()
+        return func
+
+    def get_tools(
+        self, names: Union[Sequence[str], None] = None
+    ) -> dict[str, CompiledTool]:
+        """Get compiled tools by name, in the given order.
+
+        Args:
+            names: The tools to get. Defaults to all registered tools.
+
+        Raises:
+            ValueError: If a name is not registered
+        """
+        if names is None:
+            return dict(self._tools)
+
+        tools = {}
+        for name in names:
+            tool = self._tools.get(name)
+            if tool is None:
+                raise ValueError(f"Function {name} not found in registry")
+            tools[name] = tool
+        return tools
+
+    def get_subset(self, names: Union[Sequence[str], None] = None) -> ToolSubset:
+        """Get the artifacts of a subset of tools, from the cache if it was used
+        recently. Both building a subset and finding it in the cache take time linear
+        in the number of names, which make up the cache key.
+
+        Args:
+            names: The tools to include, in this order. Defaults to all registered tools.
+
+        Raises:
+            ValueError: If a name is not registered
+        """
+        key = tuple(self._tools if names is None else names)
+        with self._lock:
+            subset = self._subsets.get(key)
+            if subset is not None:
+                self._subsets.move_to_end(key)
+                return subset
+
+        tools = self.get_tools(key)
+        subset = ToolSubset(
+            functions={name: tool.func for name, tool in tools.items()},
+            args_validators={name: tool.args_validator for name, tool in tools.items()},
+            schemas=[tool.schema for tool in tools.values()],
+            schema_json_fragments={
+                name: tool.schema_json for name, tool in tools.items()
+            },
+            schema_json=b"["
+            + b",".join([tool.schema_json for tool in tools.values()])
+            + b"]",
+            result_caches={
+                name: tool.result_cache
+                for name, tool in tools.items()
+                if tool.result_cache is not None
+            },
+        )
+        with self._lock:
+            self._subsets[key] = subset
+            while len(self._subsets) > self.subset_cache_size:
+                self._subsets.popitem(last=False)
+        return subset
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._tools
+
+    def __len__(self) -> int:
+        return len(self._tools)
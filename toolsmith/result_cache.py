@@ -0,0 +1,171 @@
+import asyncio
+import collections.abc
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, NamedTuple, TypeVar, Union
+
+from pydantic_core import PydanticSerializationError, to_json
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_RESULT_CACHE_ATTR = "_toolsmith_result_cache"
+
+
+class _Entry(NamedTuple):
+    content: str
+    size: int
+    expires_at: float
+
+
+class ResultCache:
+    """LRU cache of tool results for idempotent tools, keyed on validated arguments.
+
+    A single `ResultCache` can be shared between toolboxes, so results are reused across
+    conversations. In `AsyncToolbox`, concurrent identical calls are deduplicated so the
+    function only runs once.
+
+    Args:
+        ttl: Seconds a result stays valid. `None` means results never expire.
+        maxsize: Maximum number of cached results
+        max_bytes: Optional budget for the total UTF-8 size of cached results
+    """
+
+    def __init__(
+        self,
+        ttl: Union[float, None] = None,
+        maxsize: int = 1024,
+        max_bytes: Union[int, None] = None,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[bytes, _Entry] = OrderedDict()
+        self._total_bytes = 0
+        self._pending: dict[bytes, "asyncio.Future[str]"] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(func_name: str, args: dict[str, Any]) -> Union[bytes, None]:
+        """Build a cache key from validated arguments, or `None` if they can't be
+        serialized. Validated arguments follow the function's parameter order and
+        have defaults filled in, so equivalent calls produce the same key.
+
+        Calls with streamed `Iterator` arguments aren't cached, since serializing the
+        arguments would consume them."""
+        if any(isinstance(value, collections.abc.Iterator) for value in args.values()):
+            return None
+        try:
+            return func_name.encode() + b"\0" + to_json(args)
+        except PydanticSerializationError:
+            return None
+
+    def get(self, key: bytes) -> Union[str, None]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.content
+
+    def set(self, key: bytes, content: str) -> None:
+        size = len(content.encode())
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        expires_at = float("inf") if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(content, size, expires_at)
+            self._total_bytes += size
+            while len(self._entries) > self.maxsize or (
+                self.max_bytes is not None and self._total_bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    async def get_or_run(self, key: bytes, run: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached result for `key`, or run `run` to produce it. Concurrent
+        callers with the same key on the same event loop share a single run, including
+        its exception if it fails."""
+        content = self.get(key)
+        if content is not None:
+            return content
+
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(key)
+        if pending is not None and pending.get_loop() is loop:
+            await asyncio.wait([pending])
+            if pending.cancelled():
+                # The leading call was cancelled with its turn; run it ourselves instead.
+                return await self.get_or_run(key, run)
+            return pending.result()
+
+        future = self._pending[key] = loop.create_future()
+        try:
+            content = await run()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved, since there may be no other waiters
+            future.exception()
+            raise
+        else:
+            future.set_result(content)
+            self.set(key, content)
+            return content
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def _remove(self, key: bytes) -> None:
+        self._total_bytes -= self._entries.pop(key).size
+
+
+def cached(
+    ttl: Union[float, None] = None,
+    maxsize: int = 1024,
+    max_bytes: Union[int, None] = None,
+) -> Callable[[F], F]:
+    """Mark a tool as idempotent so toolboxes cache its results. The function itself
+    is returned unchanged; the cache is shared by every toolbox that includes it.
+
+    Args:
+        ttl: Seconds a result stays valid. `None` means results never expire.
+        maxsize: Maximum number of cached results
+        max_bytes: Optional budget for the total UTF-8 size of cached results
+
+    Example:
+        ```py
+        @cached(ttl=60)
+        def search_users(query: str, regex: bool) -> str:
+            ...
+        ```
+    """
+
+    def decorator(func: F) -> F:
+        setattr(func, _RESULT_CACHE_ATTR, ResultCache(ttl, maxsize, max_bytes))
+        return func
+
+    return decorator
+
+
+def get_result_cache(func: Callable[..., Any]) -> Union[ResultCache, None]:
+    return getattr(func, _RESULT_CACHE_ATTR, None)
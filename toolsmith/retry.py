@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, NamedTuple, TypeVar, Union
+
+from toolsmith.deadlines import get_deadline
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RetryPolicy(NamedTuple):
+    """How to retry failed calls to a function, with exponential backoff.
+
+    Args:
+        max_attempts: Total number of attempts, including the first one
+        initial_delay: Seconds to wait before the first retry
+        backoff: Factor the delay is multiplied by after each retry
+        max_delay: Upper bound on the delay between attempts, in seconds
+        jitter: Each delay is randomly scaled by up to this fraction either way, so
+            retries of calls that failed together don't all hit the backend at once
+        retry_on: Exception types that are retried. Other exceptions fail the call
+            immediately. In `AsyncToolbox`, timed out calls raise `asyncio.TimeoutError`.
+
+    Calls are not retried when the retry couldn't start before the deadline of the
+    turn they are part of.
+    """
+
+    max_attempts: int = 3
+    initial_delay: float = 0.1
+    backoff: float = 2.0
+    max_delay: float = 10.0
+    jitter: float = 0.1
+    retry_on: tuple[type[Exception], ...] = (Exception,)
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        """Whether to retry after `error` was raised by the given (1-based) attempt."""
+        return attempt < self.max_attempts and isinstance(error, self.retry_on)
+
+    def get_delay(self, attempt: int) -> float:
+        """Seconds to wait after the given (1-based) attempt failed."""
+        delay = min(self.initial_delay * self.backoff ** (attempt - 1), self.max_delay)
+        if self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(delay, 0.0)
+
+
+def call_with_retries(
+    policy: RetryPolicy,
+    func_name: str,
+    func: Callable[..., T],
+    /,
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """Call `func`, retrying according to `policy`. Sleeps between attempts, so when
+    run on an executor the worker stays busy while backing off."""
+    attempt = 1
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            delay = _get_retry_delay(policy, e, attempt)
+            if delay is None:
+                raise
+            _log_retry(func_name, e, attempt, policy)
+        time.sleep(delay)
+        attempt += 1
+
+
+async def async_call_with_retries(
+    policy: RetryPolicy,
+    func_name: str,
+    call: Callable[[], Awaitable[T]],
+    is_final: Callable[[Exception], bool] = lambda error: False,
+) -> T:
+    """Await `call()`, retrying according to `policy`. Errors for which `is_final`
+    returns `True` are never retried."""
+    attempt = 1
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            delay = None if is_final(e) else _get_retry_delay(policy, e, attempt)
+            if delay is None:
+                raise
+            _log_retry(func_name, e, attempt, policy)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def _get_retry_delay(
+    policy: RetryPolicy, error: Exception, attempt: int
+) -> Union[float, None]:
+    """Seconds to wait before retrying, or `None` to give up."""
+    if not policy.should_retry(error, attempt):
+        return None
+    delay = policy.get_delay(attempt)
+    deadline = get_deadline()
+    if deadline is not None and time.monotonic() + delay >= deadline:
+        # The retry would only time out
+        return None
+    return delay
+
+
+def _log_retry(
+    func_name: str, error: Exception, attempt: int, policy: RetryPolicy
+) -> None:
+    logger.info(
+        f"`{func_name}`: attempt {attempt} of {policy.max_attempts} failed with "
+        f"{error!r}, retrying"
+    )
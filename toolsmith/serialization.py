@@ -0,0 +1,62 @@
+from typing import Any, Callable
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import to_json
+
+
+def to_json_str(value: Any) -> str:
+    """Serialize a tool result to compact JSON with pydantic-core. Supports dicts,
+    lists, Pydantic models and the other types Pydantic can serialize."""
+    return to_json(value).decode()
+
+
+def orjson_to_json_str(value: Any) -> str:
+    """Serialize a tool result to compact JSON with orjson. Requires `orjson` to be
+    installed."""
+    import orjson
+
+    return orjson.dumps(value, default=_orjson_default).decode()
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+JSON_BACKENDS: dict[str, Callable[[Any], str]] = {
+    "pydantic": to_json_str,
+    "orjson": orjson_to_json_str,
+}
+
+
+def truncate_result(content: str, max_chars: int) -> str:
+    """Default handler for oversized results: keep the start of the result and note
+    how much was cut, staying within `max_chars` characters."""
+    marker = f"\n[result truncated to {max_chars} of {len(content)} characters]"
+    if len(marker) > max_chars:
+        return content[:max_chars]
+    return content[: max_chars - len(marker)] + marker
+
+
+# Validation errors listed in an error message before the rest are summarized
+_MAX_LISTED_ERRORS = 5
+_MAX_ERROR_CHARS = 1000
+
+
+def describe_error(func_name: str, error: Exception) -> str:
+    """Default content of the tool message for a failed tool call when errors are
+    isolated: a short description the LLM can act on, without a traceback."""
+    if isinstance(error, ValidationError):
+        problems = [
+            f"{'.'.join(map(str, e['loc']))}: {e['msg']}" if e["loc"] else e["msg"]
+            for e in error.errors(include_url=False)[:_MAX_LISTED_ERRORS]
+        ]
+        if error.error_count() > _MAX_LISTED_ERRORS:
+            problems.append(f"and {error.error_count() - _MAX_LISTED_ERRORS} more")
+        content = f"Error: invalid arguments for `{func_name}`: " + "; ".join(problems)
+    else:
+        content = f"Error: {type(error).__name__}: {error}"
+    if len(content) > _MAX_ERROR_CHARS:
+        content = truncate_result(content, _MAX_ERROR_CHARS)
+    return content
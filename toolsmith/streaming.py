@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import re
+from typing import TYPE_CHECKING, Sequence, Union
+
+from toolsmith.budget import fit_messages
+from toolsmith.deadlines import deadline_scope
+from toolsmith.planning import ResourcePlanner, run_after
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionToolMessageParam
+    from openai.types.chat.chat_completion_chunk import ChoiceDeltaToolCall
+
+    from toolsmith.toolbox import AsyncToolbox
+
+# Characters that affect nesting depth or string state in a JSON document
+_JSON_STRUCTURAL = re.compile(r'[{}\[\]"\\]')
+
+
+class _PartialToolCall:
+    """A tool call whose arguments are still streaming in.
+
+    Tracks JSON nesting depth incrementally, so completeness is known without
+    re-parsing the arguments on every chunk.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "_chunks",
+        "_length",
+        "_depth",
+        "_in_string",
+        "_escaped_pos",
+        "complete",
+    )
+
+    def __init__(self) -> None:
+        self.id = ""
+        self.name = ""
+        self._chunks: list[str] = []
+        self._length = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped_pos = -1
+        self.complete = False
+
+    @property
+    def arguments(self) -> str:
+        return "".join(self._chunks)
+
+    @property
+    def length(self) -> int:
+        return self._length
+
+    def feed(self, text: str) -> None:
+        offset = self._length
+        self._chunks.append(text)
+        self._length += len(text)
+        if self.complete:
+            return
+
+        for match in _JSON_STRUCTURAL.finditer(text):
+            pos = offset + match.start()
+            if pos == self._escaped_pos:
+                continue
+
+            char = match.group()
+            if self._in_string:
+                if char == "\\":
+                    self._escaped_pos = pos + 1
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+                    return
+
+
+class ToolCallStream:
+    """Incrementally rebuilds tool calls from streamed `ChoiceDeltaToolCall` chunks and
+    schedules each one on its `AsyncToolbox` as soon as its arguments are complete.
+
+    Create one with `AsyncToolbox.stream_tool_calls()`. Must be used from within a
+    running event loop.
+    """
+
+    def __init__(self, toolbox: AsyncToolbox, deadline: Union[float, None] = None):
+        self._toolbox = toolbox
+        self._deadline = deadline
+        self._calls: dict[int, _PartialToolCall] = {}
+        self._tasks: dict[int, asyncio.Future[ChatCompletionToolMessageParam]] = {}
+        # Tool calls are planned in the order they are scheduled
+        self._planner = ResourcePlanner()
+        self._planned: list[asyncio.Future[ChatCompletionToolMessageParam]] = []
+
+    def feed(self, deltas: Union[Sequence[ChoiceDeltaToolCall], None]) -> None:
+        """Consume the tool call deltas of one streamed chunk.
+
+        Args:
+            deltas: The `delta.tool_calls` of a streamed chunk. `None` is ignored.
+
+        Raises:
+            ValueError: If a completed tool call refers to a function not in the toolbox,
+                or a tool call's arguments grow past the toolbox's `max_args_chars`
+            pydantic.ValidationError: If a completed tool call has invalid arguments
+
+            With the toolbox's `isolate_errors`, these tool calls get error messages
+            instead.
+        """
+        for delta in deltas or ():
+            call = self._calls.get(delta.index)
+            if call is None:
+                call = self._calls[delta.index] = _PartialToolCall()
+
+            if delta.id:
+                call.id = delta.id
+            if delta.function is not None:
+                if delta.function.name:
+                    call.name = delta.function.name
+                if delta.function.arguments and delta.index not in self._tasks:
+                    call.feed(delta.function.arguments)
+                    # Fail as soon as the limit is crossed rather than buffering the rest
+                    try:
+                        self._toolbox._check_args_size(call.name, call.length)
+                    except ValueError as e:
+                        if not self._toolbox.isolate_errors:
+                            raise
+                        self._fail(delta.index, call, e)
+
+            if call.complete and call.id and delta.index not in self._tasks:
+                self._schedule(delta.index, call)
+
+    async def results(self) -> list[ChatCompletionToolMessageParam]:
+        """Wait for every tool call to finish. Call this once the stream has ended.
+
+        With the toolbox's `result_budget`, the results are fitted to the turn budget
+        together once they have all finished, as with `execute_tool_calls`.
+
+        Returns:
+            List of tool messages, in the order the tool calls appeared in the stream
+        """
+        for index, call in self._calls.items():
+            if index not in self._tasks:
+                self._schedule(index, call)
+
+        indexes = sorted(self._tasks)
+        messages = await asyncio.gather(*[self._tasks[index] for index in indexes])
+        if self._toolbox.result_budget is None:
+            return messages
+        return fit_messages(
+            self._toolbox.result_budget,
+            [self._calls[index].name for index in indexes],
+            messages,
+        )
+
+    def _schedule(self, index: int, call: _PartialToolCall) -> None:
+        try:
+            invocation = self._toolbox._parse_invocation(
+                call.id, call.name, call.arguments
+            )
+        except Exception as e:
+            if not self._toolbox.isolate_errors:
+                raise
+            self._fail(index, call, e)
+            return
+        before = self._toolbox._add_to_plan(self._planner, [invocation])
+        with deadline_scope(self._deadline):
+            task = asyncio.ensure_future(
+                run_after(
+                    [self._planned[i] for i in before],
+                    functools.partial(
+                        self._toolbox._execute_single_invocation, invocation
+                    ),
+                )
+            )
+        self._tasks[index] = task
+        self._planned.append(task)
+
+    def _fail(self, index: int, call: _PartialToolCall, error: Exception) -> None:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(self._toolbox._error_message(call.id, call.name, error))
+        self._tasks[index] = future
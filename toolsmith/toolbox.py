@@ -1,60 +1,400 @@
-import asyncio
-import json
-from typing import Any, Awaitable, Callable, Generic, Sequence, TypeVar, Union
+from __future__ import annotations
 
-from openai.types.chat import (
-    ChatCompletionMessageToolCall,
-    ChatCompletionToolMessageParam,
-    ChatCompletionToolParam,
+import asyncio
+import collections
+import contextvars
+import functools
+import inspect
+import importlib.util
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import (
+    CancelledError,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from contextlib import AsyncExitStack
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Iterable,
+    Iterator,
+    Hashable,
+    Literal,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    TypeVar,
+    Union,
 )
-from pydantic import BaseModel
+
+from pydantic import BaseModel, PrivateAttr, model_validator
 from typing_extensions import Self
 
-from toolsmith.toolsmith import func_to_pydantic, func_to_schema
+from toolsmith.batching import BatchImplementation, BatchWork, get_batch_implementation
+from toolsmith.budget import ResultBudget, TurnBudget, fit_messages
+from toolsmith.deadlines import deadline_after, deadline_scope, get_deadline
+from toolsmith.hedging import HedgePolicy, LatencyTracker, run_hedged
+from toolsmith.instrumentation import Instrumentation, Phase, PhaseEvent
+from toolsmith.planning import (
+    ResourceAccess,
+    ResourcePlanner,
+    get_resource_access,
+    run_after,
+)
+from toolsmith.process import (
+    ExecutorKind,
+    create_executor,
+    interpreters_available,
+    is_out_of_process,
+    out_of_process_call,
+)
+from toolsmith.result_cache import ResultCache, get_result_cache
+from toolsmith.retry import RetryPolicy, async_call_with_retries, call_with_retries
+from toolsmith.serialization import JSON_BACKENDS, describe_error, truncate_result
+from toolsmith.streaming import ToolCallStream
+from toolsmith.toolsmith import (
+    func_to_args_validator,
+    func_to_pydantic,
+    func_to_schema,
+    func_to_schema_json,
+    get_streamed_params,
+)
+from toolsmith.validators import ArgsValidator
+
+if TYPE_CHECKING:
+    # The OpenAI SDK is only needed for type hints; importing it at runtime would pull
+    # in the whole SDK and its HTTP stack on `import toolsmith`.
+    from openai.types.chat import (
+        ChatCompletionChunk,
+        ChatCompletionMessageToolCall,
+        ChatCompletionToolMessageParam,
+        ChatCompletionToolParam,
+    )
+
+    from toolsmith.registry import ToolRegistry
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+
+ToolResult = Union[str, dict[str, Any], BaseModel, list[Any]]
+
+
+class ToolCallsError(Exception):
+    """Raised when one or more tool calls fail after every tool call has finished running.
+
+    Args:
+        results: Tool messages in the original tool call order, with `None` for failed calls
+        errors: Mapping of tool call IDs to the exception raised by that call
+    """
+
+    def __init__(
+        self,
+        results: list[Union[ChatCompletionToolMessageParam, None]],
+        errors: dict[str, Exception],
+    ):
+        super().__init__(
+            f"{len(errors)} of {len(results)} tool calls failed: "
+            + ", ".join(f"{id}: {error!r}" for id, error in errors.items())
+        )
+        self.results = results
+        self.errors = errors
+
+
+class _ToolTimeoutError(asyncio.TimeoutError):
+    def __init__(self, timeout: Union[float, None], deadline: bool = False):
+        super().__init__(timeout)
+        self.timeout = timeout
+        self.deadline = deadline
+
+    def describe(self) -> str:
+        if self.deadline:
+            return "did not finish before the deadline"
+        return f"timed out after {self.timeout} seconds"
 
 
-class Invocation(BaseModel, Generic[T]):
+class _SerializedResult(NamedTuple):
+    """Tool message content that was serialized before it was cached, or that never
+    needed serializing, so it isn't serialized or recorded again."""
+
+    content: str
+
+
+class Invocation(Generic[T]):
     """A single tool call to be executed by the toolbox.
 
     Args:
         id: The ID of the tool call
         func: The function to call
         args: The arguments to pass to the function
+        name: The name the function is registered under in the toolbox. Defaults to
+            the function's `__name__`.
+        args_json: The JSON the arguments were validated from, if any. Sent to
+            functions run out of process instead of the arguments.
     """
 
-    id: str
-    func: Callable[..., T]
-    args: dict[str, Any]
+    # A plain slotted class rather than a pydantic model: invocations are created for
+    # every tool call, and their arguments have already been validated.
+    __slots__ = ("id", "func", "args", "name", "args_json")
+
+    def __init__(
+        self,
+        id: str,
+        func: Callable[..., T],
+        args: dict[str, Any],
+        name: Union[str, None] = None,
+        args_json: Union[str, None] = None,
+    ):
+        self.id = id
+        self.func = func
+        self.args = args
+        self.name = func.__name__ if name is None else name
+        self.args_json = args_json
 
     def execute(self) -> T:
         return self.func(**self.args)
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Invocation):
+            return NotImplemented
+        return (self.id, self.func, self.args, self.name) == (
+            other.id,
+            other.func,
+            other.args,
+            other.name,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"Invocation(id={self.id!r}, func={self.func!r}, args={self.args!r}, "
+            f"name={self.name!r})"
+        )
+
 
 class BaseToolbox(BaseModel, Generic[T]):
     functions: dict[str, Callable[..., T]] = {}
 
+    result_caches: dict[str, ResultCache] = {}
+    """Result caches for idempotent functions, by function name. Functions decorated
+    with `@cached` don't need an entry here."""
+
+    json_backend: Literal["pydantic", "orjson"] = "pydantic"
+    """Library used to serialize non-string results to JSON. `orjson` must be installed
+    separately."""
+
+    max_result_chars: Union[int, None] = None
+    """Results longer than this many characters are passed to `summarize_result` before
+    being returned, so that oversized results don't inflate the next prompt."""
+
+    summarize_result: Callable[[str, int], str] = truncate_result
+    """Called with an oversized result and `max_result_chars`, returns the content to use
+    instead. Truncates the result by default."""
+
+    result_budget: Union[ResultBudget, None] = None
+    """Token budget for the results of each tool call and of each turn, applied after
+    `max_result_chars`. Also records the bytes and tokens each function's results
+    contribute. Disabled by default."""
+
+    max_args_chars: Union[int, None] = None
+    """Tool calls whose arguments JSON is longer than this many characters are rejected
+    with a `ValueError` before parsing, so one oversized call can't spike memory."""
+
+    instrumentation: Union[Instrumentation, None] = None
+    """Receives timing, size and error events for the parse, execute and serialize
+    phases of every tool call, e.g. `ToolStats`. Disabled by default."""
+
+    executors: dict[str, Union[Executor, ExecutorKind]] = {}
+    """Executors for individual functions, by function name, overriding the toolbox's
+    `executor`. Use `"process"` to run CPU-bound functions on a process pool owned by the
+    toolbox, or `"interpreter"` for a pool of subinterpreters (Python 3.14+). Functions
+    run out of process must be importable, and receive their arguments as JSON that is
+    validated again in the worker."""
+
+    isolate_errors: bool = False
+    """If true, a tool call that fails, because its function isn't in the toolbox, its
+    arguments are invalid, or its function raised, gets an error tool message made by
+    `format_error` and the other tool calls still run. Errors are logged. By default,
+    failures raise."""
+
+    format_error: Callable[[str, Exception], str] = describe_error
+    """Called with the function name and the error of a failed tool call when
+    `isolate_errors` is set, returns the content of its tool message."""
+
+    retries: dict[str, RetryPolicy] = {}
+    """Retry policies for individual functions, by function name. Failed calls are
+    retried with exponential backoff before they count as failures."""
+
+    resources: dict[str, ResourceAccess] = {}
+    """The resources individual functions read and write, by function name. Calls that
+    conflict on a resource run in the order they were made, others run concurrently.
+    Functions decorated with `@resources` don't need an entry here."""
+
     _schema_cache: Union[list[ChatCompletionToolParam], None] = None
+    _schema_json_cache: Union[bytes, None] = None
+    _schema_json_fragments: Union[dict[str, bytes], None] = None
     _func_arg_models_cache: Union[dict[str, type[BaseModel]], None] = None
+    _args_validators: dict[str, ArgsValidator] = PrivateAttr(default_factory=dict)
+    _resolved_result_caches: Union[dict[str, ResultCache], None] = None
+    _resolved_resources: Union[dict[str, ResourceAccess], None] = None
+    _owned_function_executors: dict[str, Executor] = PrivateAttr(default_factory=dict)
 
-    model_config = {"frozen": True}
+    model_config = {"frozen": True, "arbitrary_types_allowed": True}
+
+    @model_validator(mode="after")
+    def _check_json_backend(self) -> Self:
+        if self.json_backend == "orjson" and importlib.util.find_spec("orjson") is None:
+            raise ValueError("`json_backend` is 'orjson', but orjson is not installed")
+        return self
+
+    @model_validator(mode="after")
+    def _check_executors(self) -> Self:
+        unknown = self.executors.keys() - self.functions.keys()
+        if unknown:
+            raise ValueError(
+                f"`executors` refers to functions not in the toolbox: {sorted(unknown)}"
+            )
+        if "interpreter" in self.executors.values() and not interpreters_available():
+            raise ValueError("`interpreter` executors require Python 3.14 or later")
+        return self
+
+    @model_validator(mode="after")
+    def _check_result_caches(self) -> Self:
+        unknown = self.result_caches.keys() - self.functions.keys()
+        if unknown:
+            raise ValueError(
+                f"`result_caches` refers to functions not in the toolbox: {sorted(unknown)}"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def _check_resources(self) -> Self:
+        unknown = self.resources.keys() - self.functions.keys()
+        if unknown:
+            raise ValueError(
+                f"`resources` refers to functions not in the toolbox: {sorted(unknown)}"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def _check_retries(self) -> Self:
+        unknown = self.retries.keys() - self.functions.keys()
+        if unknown:
+            raise ValueError(
+                f"`retries` refers to functions not in the toolbox: {sorted(unknown)}"
+            )
+        if any(policy.max_attempts < 1 for policy in self.retries.values()):
+            raise ValueError("`retries`: `max_attempts` must be at least 1")
+        _check_not_streamed(self.functions, "retries", self.retries)
+        return self
 
     @classmethod
-    def create(cls, functions: Sequence[Callable[..., T]]) -> Self:
-        return cls(functions={f.__name__: f for f in functions})
+    def create(cls, functions: Sequence[Callable[..., T]], **kwargs: Any) -> Self:
+        """Create a toolbox from a list of functions.
 
-    def get_schema(self) -> Sequence[ChatCompletionToolParam]:
+        Args:
+            functions: The functions to expose as tools, keyed by their `__name__`
+            **kwargs: Additional toolbox options, see the fields of the toolbox class
+        """
+        return cls(functions={f.__name__: f for f in functions}, **kwargs)
+
+    @classmethod
+    def from_registry(
+        cls,
+        registry: ToolRegistry,
+        names: Union[Sequence[str], None] = None,
+        **kwargs: Any,
+    ) -> Self:
+        """Create a toolbox from tools in a `ToolRegistry`. The tools' argument validators
+        and schemas are shared with the registry instead of being looked up or generated
+        for this toolbox, so this is cheap enough to do per request.
+
+        It still takes time linear in the number of tools, though little per tool: the
+        subset is looked up by its tuple of names, and pydantic copies and validates the
+        toolbox's `functions` mapping.
+
+        Args:
+            registry: The registry to take the tools from
+            names: The tools to include, in this order. Defaults to all registered tools.
+            **kwargs: Additional toolbox options, see the fields of the toolbox class
+        """
+        subset = registry.get_subset(names)
+        toolbox = cls(functions=subset.functions, **kwargs)
+        toolbox._args_validators = subset.args_validators
+        toolbox._schema_cache = subset.schemas
+        toolbox._schema_json_fragments = subset.schema_json_fragments
+        toolbox._schema_json_cache = subset.schema_json
+        if toolbox.result_caches:
+            toolbox._resolved_result_caches = {
+                **subset.result_caches,
+                **toolbox.result_caches,
+            }
+        else:
+            toolbox._resolved_result_caches = subset.result_caches
+        return toolbox
+
+    def get_schema(
+        self, names: Union[Sequence[str], None] = None
+    ) -> Sequence[ChatCompletionToolParam]:
         """Get OpenAI function schemas for all functions in the toolbox.
 
+        Args:
+            names: Only include these functions, in this order. Useful for filtering
+                the available tools per turn. Defaults to all functions in the toolbox.
+
         Returns:
             Sequence[ChatCompletionToolParam]: List of function schemas compatible with OpenAI's API.
             Each schema describes the name, description and parameters of a function.
+            Schemas are cached and shared, so they should not be mutated.
         """
+        if names is not None:
+            return [func_to_schema(self._get_function(name)) for name in names]
+
         if self._schema_cache is None:
             self._schema_cache = [func_to_schema(f) for f in self.functions.values()]
         return self._schema_cache
 
+    def get_schema_json(self, names: Union[Sequence[str], None] = None) -> bytes:
+        """Get the function schemas as a pre-encoded JSON array, ready to be spliced
+        into a raw request body as the value of `tools`.
+
+        Each function's encoded schema is cached, so subsets are built by joining the
+        cached fragments without re-encoding anything.
+
+        Args:
+            names: Only include these functions, in this order. Defaults to all
+                functions in the toolbox.
+
+        Returns:
+            bytes: JSON array of function schemas, equivalent to `get_schema(names)`
+        """
+        if self._schema_json_fragments is None:
+            self._schema_json_fragments = {
+                name: func_to_schema_json(f) for name, f in self.functions.items()
+            }
+        fragments = self._schema_json_fragments
+
+        if names is None:
+            if self._schema_json_cache is None:
+                self._schema_json_cache = b"[" + b",".join(fragments.values()) + b"]"
+            return self._schema_json_cache
+
+        for name in names:
+            self._get_function(name)
+        return b"[" + b",".join([fragments[name] for name in names]) + b"]"
+
     def get_func_arg_models(self) -> dict[str, type[BaseModel]]:
         """Get Pydantic models for validating arguments of all functions in the toolbox.
 
@@ -69,8 +409,19 @@ class BaseToolbox(BaseModel, Generic[T]):
         return self._func_arg_models_cache
 
     def _parse_args(self, func_name: str, args_json: str) -> dict[str, Any]:
-        func_args_model = self.get_func_arg_models()[func_name]
-        return dict(func_args_model(**json.loads(args_json)))
+        self._check_args_size(func_name, len(args_json))
+        validator = self._args_validators.get(func_name)
+        if validator is None:
+            validator = func_to_args_validator(self._get_function(func_name))
+            self._args_validators[func_name] = validator
+        return validator.validate(args_json)
+
+    def _check_args_size(self, func_name: str, size: int) -> None:
+        if self.max_args_chars is not None and size > self.max_args_chars:
+            raise ValueError(
+                f"`{func_name}`: arguments are longer than `max_args_chars` "
+                f"({self.max_args_chars} characters)"
+            )
 
     def parse_invocations(
         self, tool_calls: list[ChatCompletionMessageToolCall]
@@ -85,24 +436,658 @@ class BaseToolbox(BaseModel, Generic[T]):
         Returns:
             List of Invocation objects, one for each tool call
         """
-        result = []
-        for tool_call in tool_calls:
-            func_name = tool_call.function.name
-            if func_name not in self.functions:
-                raise ValueError(f"Function {func_name} not found in toolbox")
-
-            result.append(
-                Invocation(
-                    id=tool_call.id,
-                    func=self.functions[func_name],
-                    args=self._parse_args(func_name, tool_call.function.arguments),
+        return [
+            self._parse_invocation(
+                tool_call.id, tool_call.function.name, tool_call.function.arguments
+            )
+            for tool_call in tool_calls
+        ]
+
+    def _parse_tool_calls(
+        self, tool_calls: list[ChatCompletionMessageToolCall]
+    ) -> tuple[list[Invocation[T]], dict[int, ChatCompletionToolMessageParam]]:
+        # With `isolate_errors`, tool calls that can't be parsed get error messages, by
+        # position, instead of failing the whole list
+        if not self.isolate_errors:
+            return self.parse_invocations(tool_calls), {}
+
+        invocations = []
+        failed = {}
+        for index, tool_call in enumerate(tool_calls):
+            try:
+                invocations.append(
+                    self._parse_invocation(
+                        tool_call.id,
+                        tool_call.function.name,
+                        tool_call.function.arguments,
+                    )
+                )
+            except Exception as e:
+                failed[index] = self._error_message(
+                    tool_call.id, tool_call.function.name, e
                 )
+        return invocations, failed
+
+    def _error_message(
+        self, tool_call_id: str, func_name: str, error: Exception
+    ) -> ChatCompletionToolMessageParam:
+        logger.warning(
+            f"`{func_name}`: tool call {tool_call_id} failed", exc_info=error
+        )
+        return {
+            "role": "tool",
+            "tool_call_id": tool_call_id,
+            "content": self.format_error(func_name, error),
+        }
+
+    def _get_function(self, func_name: str) -> Callable[..., T]:
+        func = self.functions.get(func_name)
+        if func is None:
+            raise ValueError(f"Function {func_name} not found in toolbox")
+        return func
+
+    def _parse_invocation(
+        self, tool_call_id: str, func_name: str, args_json: str
+    ) -> Invocation[T]:
+        func = self._get_function(func_name)
+        if self.instrumentation is None:
+            return Invocation(
+                id=tool_call_id,
+                func=func,
+                args=self._parse_args(func_name, args_json),
+                name=func_name,
+                args_json=args_json,
             )
 
+        start = time.perf_counter_ns()
+        try:
+            args = self._parse_args(func_name, args_json)
+        except Exception as e:
+            self._record(func_name, "parse", start, len(args_json), e)
+            raise
+        self._record(func_name, "parse", start, len(args_json))
+        return Invocation(
+            id=tool_call_id, func=func, args=args, name=func_name, args_json=args_json
+        )
+
+    def _record(
+        self,
+        func_name: str,
+        phase: Phase,
+        start: int,
+        size: Union[int, None] = None,
+        error: Union[BaseException, None] = None,
+    ) -> None:
+        # `start` is a `time.perf_counter_ns()` reading. Durations come from that clock,
+        # which never goes back; the wall-clock start is derived from it.
+        assert self.instrumentation is not None
+        duration_ns = time.perf_counter_ns() - start
+        end_ns = time.time_ns()
+        self.instrumentation.record(
+            PhaseEvent(func_name, phase, end_ns - duration_ns, end_ns, size, error)
+        )
+
+    def _result_cache_key(
+        self, invocation: Invocation[Any]
+    ) -> Union[tuple[ResultCache, bytes], None]:
+        func_name = invocation.name
+        cache = self._get_result_caches().get(func_name)
+        if cache is None:
+            return None
+        key = cache.make_key(func_name, invocation.args)
+        return None if key is None else (cache, key)
+
+    def _get_function_executor(self, func_name: str) -> Union[Executor, None]:
+        executor = self.executors.get(func_name)
+        if executor is None or isinstance(executor, Executor):
+            return executor
+
+        # Pools created from a kind are shared by all functions using that kind
+        owned = self._owned_function_executors.get(executor)
+        if owned is None:
+            owned = self._owned_function_executors[executor] = create_executor(executor)
+        return owned
+
+    def close(self) -> None:
+        """Shut down the executors the toolbox created, waiting for running calls to
+        finish. Executors passed to the toolbox are left running. The toolbox can still
+        be used afterwards; it creates new executors when it needs them.
+
+        Toolboxes are also context managers that close themselves on exit.
+        """
+        owned = list(self._owned_function_executors.values())
+        self._owned_function_executors.clear()
+        for executor in owned:
+            executor.shutdown()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _get_result_caches(self) -> dict[str, ResultCache]:
+        # Resolved on first use, so creating a toolbox stays cheap
+        if self._resolved_result_caches is None:
+            caches = {}
+            for name, func in self.functions.items():
+                cache = self.result_caches.get(name)
+                if cache is None:
+                    cache = get_result_cache(func)
+                if cache is not None:
+                    caches[name] = cache
+            self._resolved_result_caches = caches
+        return self._resolved_result_caches
+
+    def _get_resources(self) -> dict[str, ResourceAccess]:
+        if self._resolved_resources is None:
+            resources = {}
+            for name, func in self.functions.items():
+                access = self.resources.get(name)
+                if access is None:
+                    access = get_resource_access(func)
+                if access is not None:
+                    resources[name] = access
+            self._resolved_resources = resources
+        return self._resolved_resources
+
+    def _plan_dependencies(
+        self, calls: Sequence[Sequence[Invocation[Any]]]
+    ) -> Union[list[list[int]], None]:
+        """For each unit of work, given as the invocations it runs, list the indices of
+        earlier units it has to wait for. Returns `None` if nothing has to wait."""
+        if not self._get_resources():
+            return None
+        planner = ResourcePlanner()
+        dependencies = [
+            self._add_to_plan(planner, invocations) for invocations in calls
+        ]
+        return dependencies if any(dependencies) else None
+
+    def _add_to_plan(
+        self, planner: ResourcePlanner, invocations: Sequence[Invocation[Any]]
+    ) -> list[int]:
+        reads: set[Hashable] = set()
+        writes: set[Hashable] = set()
+        declared = False
+        for invocation in invocations:
+            access = self._get_resources().get(invocation.name)
+            if access is None:
+                continue
+            declared = True
+            try:
+                call_reads, call_writes = access.resolve(invocation.args)
+            except Exception:
+                logger.warning(
+                    f"`{invocation.name}`: could not get the resources of tool "
+                    f"call {invocation.id}, running it on its own",
+                    exc_info=True,
+                )
+                return planner.add_exclusive()
+            reads |= call_reads
+            writes |= call_writes
+
+        if not declared:
+            return planner.add_independent()
+        return planner.add(reads - writes, writes)
+
+    def _plan_batch_dependencies(
+        self, works: list[BatchWork], invocations: list[Invocation[Any]]
+    ) -> Union[list[list[int]], None]:
+        return self._plan_dependencies(
+            [[invocations[targets[0]] for targets in work.targets] for work in works]
+        )
+
+    def _serialize_result(self, func_name: str, execution_result: ToolResult) -> str:
+        if isinstance(execution_result, _SerializedResult):
+            return execution_result.content
+        if self.instrumentation is None:
+            return self._serialize_content(execution_result)
+
+        start = time.perf_counter_ns()
+        try:
+            content = self._serialize_content(execution_result)
+        except Exception as e:
+            self._record(func_name, "serialize", start, error=e)
+            raise
+        self._record(func_name, "serialize", start, len(content))
+        return content
+
+    def _serialize_content(self, execution_result: ToolResult) -> str:
+        if isinstance(execution_result, str):
+            content = execution_result
+        else:
+            content = JSON_BACKENDS[self.json_backend](execution_result)
+
+        if self.max_result_chars is not None and len(content) > self.max_result_chars:
+            content = self.summarize_result(content, self.max_result_chars)
+        return content
+
+    def _to_tool_message(
+        self, invocation: Invocation[Any], execution_result: ToolResult
+    ) -> ChatCompletionToolMessageParam:
+        return {
+            "role": "tool",
+            "tool_call_id": invocation.id,
+            "content": self._serialize_result(invocation.name, execution_result),
+        }
+
+    def _fit_to_budget(
+        self,
+        tool_calls: Sequence[ChatCompletionMessageToolCall],
+        messages: list[ChatCompletionToolMessageParam],
+    ) -> list[ChatCompletionToolMessageParam]:
+        if self.result_budget is None:
+            return messages
+        return fit_messages(
+            self.result_budget,
+            [tool_call.function.name for tool_call in tool_calls],
+            messages,
+        )
+
+    def _start_turn(
+        self, tool_calls: Sequence[ChatCompletionMessageToolCall]
+    ) -> Union[tuple[TurnBudget, dict[str, str]], None]:
+        """Start budgeting a turn whose results are returned one at a time. Returns the
+        turn's budget and the function names by tool call ID."""
+        if self.result_budget is None:
+            return None
+        return (
+            self.result_budget.start_turn(len(tool_calls)),
+            {tool_call.id: tool_call.function.name for tool_call in tool_calls},
+        )
+
+    @staticmethod
+    def _fit_to_turn(
+        turn: Union[tuple[TurnBudget, dict[str, str]], None],
+        message: ChatCompletionToolMessageParam,
+    ) -> ChatCompletionToolMessageParam:
+        if turn is None:
+            return message
+        budget, func_names = turn
+        content = budget.fit(
+            func_names[message["tool_call_id"]], message["content"]  # type: ignore[arg-type]
+        )
+        if content is message["content"]:
+            return message
+        return {**message, "content": content}
+
+    def _plan_batch(self, invocations: list[Invocation[Any]]) -> list[BatchWork]:
+        works: list[BatchWork] = []
+        batches: dict[str, BatchWork] = {}
+        targets_by_key: dict[bytes, list[int]] = {}
+        for index, invocation in enumerate(invocations):
+            func_name = invocation.name
+            batch = get_batch_implementation(invocation.func)
+            cache_key = self._result_cache_key(invocation)
+            if cache_key is None:
+                targets = [index]
+            else:
+                # Identical calls to an idempotent function only run once
+                cache, key = cache_key
+                if key in targets_by_key:
+                    targets_by_key[key].append(index)
+                    continue
+                targets = targets_by_key[key] = [index]
+                if cache.get(key) is not None:
+                    batch = None
+
+            if batch is None:
+                works.append(BatchWork(func_name, None, [targets]))
+            elif func_name in batches:
+                batches[func_name].targets.append(targets)
+            else:
+                batches[func_name] = BatchWork(func_name, batch, [targets])
+
+        for work in batches.values():
+            assert work.batch is not None
+            size = work.batch.max_batch_size or len(work.targets)
+            works.extend(
+                BatchWork(work.func_name, work.batch, work.targets[i : i + size])
+                for i in range(0, len(work.targets), size)
+            )
+        return works
+
+    def _batch_contents(
+        self,
+        work: BatchWork,
+        invocations: list[Invocation[Any]],
+        execution_results: Any,
+    ) -> list[str]:
+        if not isinstance(execution_results, list) or len(execution_results) != len(
+            work.targets
+        ):
+            raise ValueError(
+                f"`{work.func_name}`: batch implementation must return a list of "
+                f"{len(work.targets)} results"
+            )
+
+        contents = []
+        for targets, execution_result in zip(work.targets, execution_results):
+            content = self._serialize_result(work.func_name, execution_result)
+            cache_key = self._result_cache_key(invocations[targets[0]])
+            if cache_key is not None:
+                cache, key = cache_key
+                cache.set(key, content)
+            contents.append(content)
+        return contents
+
+    def _group_batch_results(
+        self,
+        conversations: list[tuple[K, list[ChatCompletionMessageToolCall]]],
+        invocations: list[Invocation[Any]],
+        works: list[BatchWork],
+        outcomes: list[Union[list[str], Exception]],
+        failed: dict[int, ChatCompletionToolMessageParam],
+    ) -> dict[K, list[ChatCompletionToolMessageParam]]:
+        results: list[Union[ChatCompletionToolMessageParam, None]] = [None] * len(
+            invocations
+        )
+        errors: dict[str, Exception] = {}
+        for work, outcome in zip(works, outcomes):
+            for i, targets in enumerate(work.targets):
+                for index in targets:
+                    invocation = invocations[index]
+                    if isinstance(outcome, Exception):
+                        if self.isolate_errors:
+                            results[index] = self._error_message(
+                                invocation.id, work.func_name, outcome
+                            )
+                        else:
+                            errors[invocation.id] = outcome
+                    else:
+                        results[index] = {
+                            "role": "tool",
+                            "tool_call_id": invocation.id,
+                            "content": outcome[i],
+                        }
+
+        if errors:
+            raise ToolCallsError(results, errors) from next(iter(errors.values()))
+
+        results = _with_failed(results, failed)
+        grouped = {}
+        offset = 0
+        for conversation, tool_calls in conversations:
+            grouped[conversation] = self._fit_to_budget(
+                tool_calls, results[offset : offset + len(tool_calls)]  # type: ignore[arg-type]
+            )
+            offset += len(tool_calls)
+        return grouped  # type: ignore[return-value]
+
+    def _parse_batch(
+        self,
+        tool_calls_by_conversation: Mapping[K, list[ChatCompletionMessageToolCall]],
+    ) -> tuple[
+        list[tuple[K, list[ChatCompletionMessageToolCall]]],
+        list[Invocation[T]],
+        dict[int, ChatCompletionToolMessageParam],
+    ]:
+        conversations = list(tool_calls_by_conversation.items())
+        invocations: list[Invocation[T]] = []
+        failed: dict[int, ChatCompletionToolMessageParam] = {}
+        offset = 0
+        for _, tool_calls in conversations:
+            parsed, parse_failures = self._parse_tool_calls(tool_calls)
+            invocations.extend(parsed)
+            failed.update(
+                (offset + index, message) for index, message in parse_failures.items()
+            )
+            offset += len(tool_calls)
+        return conversations, invocations, failed
+
+
+class Toolbox(BaseToolbox[ToolResult]):
+    executor: Union[Executor, None] = None
+    """Executor used to run tool calls in parallel. Any `concurrent.futures` executor
+    works; with a `ProcessPoolExecutor`, functions must be importable, see `executors`."""
+
+    max_workers: Union[int, None] = None
+    """If set and no `executor` is given, tool calls run in parallel on a thread pool
+    of this size that is owned by the toolbox."""
+
+    _owned_executor: Union[Executor, None] = None
+
+    def _get_executor(
+        self, func_name: Union[str, None] = None
+    ) -> Union[Executor, None]:
+        if func_name is not None:
+            executor = self._get_function_executor(func_name)
+            if executor is not None:
+                return executor
+        if self.executor is not None:
+            return self.executor
+        if self.max_workers is None:
+            return None
+        if self._owned_executor is None:
+            self._owned_executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="toolsmith"
+            )
+        return self._owned_executor
+
+    def close(self) -> None:
+        super().close()
+        owned, self._owned_executor = self._owned_executor, None
+        if owned is not None:
+            owned.shutdown()
+
+    def _execute(self, invocation: Invocation[ToolResult]) -> ToolResult:
+        func_name = invocation.name
+        cache_key = self._result_cache_key(invocation)
+        if cache_key is None:
+            return self._call(func_name, invocation.func, **invocation.args)
+
+        cache, key = cache_key
+        content = cache.get(key)
+        if content is None:
+            content = self._serialize_result(
+                func_name, self._call(func_name, invocation.func, **invocation.args)
+            )
+            cache.set(key, content)
+        return _SerializedResult(content)  # type: ignore[return-value]
+
+    def _call(
+        self, func_name: str, func: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        policy = self.retries.get(func_name)
+        if policy is None:
+            return self._call_once(func_name, func, *args, **kwargs)
+        return call_with_retries(
+            policy, func_name, self._call_once, func_name, func, *args, **kwargs
+        )
+
+    def _call_once(
+        self, func_name: str, func: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        if self.instrumentation is None:
+            return func(*args, **kwargs)
+
+        start = time.perf_counter_ns()
+        try:
+            execution_result = func(*args, **kwargs)
+        except Exception as e:
+            self._record(func_name, "execute", start, error=e)
+            raise
+        self._record(func_name, "execute", start)
+        return execution_result
+
+    def _submit(
+        self, executor: Executor, invocation: Invocation[ToolResult]
+    ) -> Future[ToolResult]:
+        func_name = invocation.name
+        cache_key = self._result_cache_key(invocation)
+        if cache_key is None:
+            return self._submit_invocation(executor, invocation)
+
+        cache, key = cache_key
+        result: Future[ToolResult] = Future()
+        content = cache.get(key)
+        if content is not None:
+            result.set_result(_SerializedResult(content))  # type: ignore[arg-type]
+            return result
+
+        # Results are stored from a callback rather than a wrapper around the function,
+        # so process pools only need to pickle the function and its arguments.
+        def _store(future: Future[ToolResult]) -> None:
+            if not result.set_running_or_notify_cancel():
+                return
+            try:
+                content = self._serialize_result(func_name, future.result())
+            except BaseException as e:
+                result.set_exception(e)
+                return
+            cache.set(key, content)
+            result.set_result(_SerializedResult(content))  # type: ignore[arg-type]
+
+        self._submit_invocation(executor, invocation).add_done_callback(_store)
         return result
 
+    def _submit_invocation(
+        self, executor: Executor, invocation: Invocation[ToolResult]
+    ) -> Future[ToolResult]:
+        func_name = invocation.name
+        if is_out_of_process(executor):
+            return self._submit_call(
+                executor,
+                func_name,
+                out_of_process_call(
+                    invocation.func, invocation.args, invocation.args_json
+                ),
+            )
+        return self._submit_call(
+            executor, func_name, invocation.func, **invocation.args
+        )
+
+    def _submit_all(
+        self,
+        func_names: list[str],
+        submit: Callable[[Executor, int], Future[T]],
+        dependencies: Union[list[list[int]], None] = None,
+    ) -> list[Future[T]]:
+        if dependencies is not None:
+            return self._submit_in_order(func_names, submit, dependencies)
+
+        futures: list[Union[Future[T], None]] = [None] * len(func_names)
+        inline = []
+        for index, func_name in enumerate(func_names):
+            executor = self._get_executor(func_name)
+            if executor is None:
+                inline.append(index)
+            else:
+                futures[index] = submit(executor, index)
+        # Calls without an executor run in this thread, after all others were handed off
+        for index in inline:
+            futures[index] = submit(_INLINE_EXECUTOR, index)
+        return futures  # type: ignore[return-value]
+
+    def _submit_in_order(
+        self,
+        func_names: list[str],
+        submit: Callable[[Executor, int], Future[T]],
+        dependencies: list[list[int]],
+    ) -> list[Future[T]]:
+        # Each call is submitted once the calls it depends on have finished, so the
+        # returned futures stand in for calls that may not have been submitted yet
+        results: list[Future[T]] = [Future() for _ in func_names]
+        waiting = [len(before) for before in dependencies]
+        dependents: list[list[int]] = [[] for _ in func_names]
+        for index, before in enumerate(dependencies):
+            for dependency in before:
+                dependents[dependency].append(index)
+        # Calls without an executor run in this thread, after all others were handed off
+        ready = collections.deque(
+            sorted(
+                (index for index, count in enumerate(waiting) if count == 0),
+                key=lambda index: self._get_executor(func_names[index]) is None,
+            )
+        )
+        lock = threading.Lock()
+        draining = False
+
+        def _finished(index: int) -> None:
+            with lock:
+                for dependent in dependents[index]:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        ready.append(dependent)
+            _drain()
+
+        def _drain() -> None:
+            # Calls are only started from one loop at a time. Futures that are already
+            # done when their callback is added (inline calls, cached results) then
+            # queue their dependents instead of starting them recursively.
+            nonlocal draining
+            with lock:
+                if draining:
+                    return
+                draining = True
+            while True:
+                with lock:
+                    if not ready:
+                        draining = False
+                        return
+                    index = ready.popleft()
+                _start(index)
+
+        def _relay(index: int, future: Future[T]) -> None:
+            if future.cancelled():
+                results[index].set_exception(CancelledError())
+            elif future.exception() is not None:
+                results[index].set_exception(future.exception())  # type: ignore[arg-type]
+            else:
+                results[index].set_result(future.result())
+            _finished(index)
+
+        def _start(index: int) -> None:
+            try:
+                # Calls whose stand-in was cancelled are skipped, but still release
+                # the calls waiting for them
+                if results[index].set_running_or_notify_cancel():
+                    executor = self._get_executor(func_names[index]) or _INLINE_EXECUTOR
+                    submit(executor, index).add_done_callback(
+                        functools.partial(_relay, index)
+                    )
+                    return
+            except BaseException as e:
+                if not results[index].done():
+                    results[index].set_exception(e)
+            _finished(index)
+
+        _drain()
+        return results
+
+    def _is_sequential(self) -> bool:
+        return self._get_executor() is None and not self.executors
+
+    def _submit_call(
+        self,
+        executor: Executor,
+        func_name: str,
+        func: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Future[Any]:
+        policy = self.retries.get(func_name)
+        if policy is not None:
+            # Retried on the worker, so process pools can run the retries too
+            args = (policy, func_name, func, *args)
+            func = call_with_retries
+
+        if self.instrumentation is None:
+            return executor.submit(func, *args, **kwargs)
+
+        # The function runs on the executor unwrapped (see `_submit`), so the recorded
+        # execute phase also includes time spent waiting for a worker.
+        start = time.perf_counter_ns()
+
+        def _record(future: Future[Any]) -> None:
+            if not future.cancelled():
+                self._record(func_name, "execute", start, error=future.exception())
+
+        future = executor.submit(func, *args, **kwargs)
+        future.add_done_callback(_record)
+        return future
 
-class Toolbox(BaseToolbox[Union[str, dict[str, Any]]]):
     def execute_tool_calls(
         self, tool_calls: list[ChatCompletionMessageToolCall]
     ) -> list[ChatCompletionToolMessageParam]:
@@ -110,57 +1095,494 @@ class Toolbox(BaseToolbox[Union[str, dict[str, Any]]]):
         Note that this method is synchronous and will block until all tool calls are executed.
         For asynchronous execution, use the `AsyncToolbox` class.
 
+        If the toolbox was created with an `executor` or `max_workers`, tool calls run in
+        parallel on that executor, except that calls that conflict on the `resources`
+        they declare run in the order they were made. Results are still returned in the
+        original order.
+
         Args:
             tool_calls: List of tool calls from the OpenAI API to execute
 
         Returns:
             List of tool messages containing the results of executing each tool call
 
+        Raises:
+            ToolCallsError: In executor mode, if any tool call raised. All other tool calls
+                still run to completion and their results are available on the error.
+
         Warning:
-            Tool calls are executed in the order they are given. If a tool call raises an
-            uncaught exception, the remaining tool calls will not be executed. To prevent
-            this, catch exceptions within the tool handler functions themselves
-            and return error messages as part of the normal return value.
+            Without an executor, tool calls are executed in the order they are given. If a
+            tool call raises an uncaught exception, the remaining tool calls will not be
+            executed. To prevent this, create the toolbox with `isolate_errors=True`, so
+            failed tool calls get error messages instead.
         """
-        invocations = self.parse_invocations(tool_calls)
+        invocations, failed = self._parse_tool_calls(tool_calls)
 
-        results: list[ChatCompletionToolMessageParam] = []
-        for invocation in invocations:
-            execution_result = invocation.execute()
-            if isinstance(execution_result, dict):
-                execution_result = json.dumps(execution_result)
-            results.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": invocation.id,
-                    "content": execution_result,
-                }
+        if self._is_sequential():
+            results = [
+                self._execute_to_message(invocation) for invocation in invocations
+            ]
+        else:
+            futures = self._submit_all(
+                [invocation.name for invocation in invocations],
+                lambda executor, index: self._submit(executor, invocations[index]),
+                self._plan_dependencies([[invocation] for invocation in invocations]),
             )
+            results = self._collect_results(invocations, futures)
+        return self._fit_to_budget(tool_calls, _with_failed(results, failed))
 
-        return results
+    def execute_tool_calls_as_completed(
+        self, tool_calls: list[ChatCompletionMessageToolCall]
+    ) -> Iterator[ChatCompletionToolMessageParam]:
+        """Execute tool calls like `execute_tool_calls`, but yield each tool message as
+        soon as its tool call finishes. Without an `executor` or `max_workers`, tool calls
+        run one at a time and are yielded in order.
+
+        Args:
+            tool_calls: List of tool calls from the OpenAI API to execute
+
+        Yields:
+            Tool messages in completion order. Use `tool_call_id` to match them up.
+
+        Raises:
+            ToolCallsError: In executor mode, after all other tool calls have finished, if
+                any tool call raised. Results of successful calls are available on the error.
+                With `isolate_errors`, failed tool calls are yielded as error messages.
 
+        Note:
+            If you stop iterating early, tool calls that haven't started yet are cancelled.
+        """
+        invocations, failed = self._parse_tool_calls(tool_calls)
+        turn = self._start_turn(tool_calls)
+        for message in failed.values():
+            yield self._fit_to_turn(turn, message)
+
+        if self._is_sequential():
+            for invocation in invocations:
+                yield self._fit_to_turn(turn, self._execute_to_message(invocation))
+            return
+
+        futures = {
+            future: index
+            for index, future in enumerate(
+                self._submit_all(
+                    [invocation.name for invocation in invocations],
+                    lambda executor, index: self._submit(executor, invocations[index]),
+                    self._plan_dependencies(
+                        [[invocation] for invocation in invocations]
+                    ),
+                )
+            )
+        }
+        results: list[Union[ChatCompletionToolMessageParam, None]] = [None] * len(
+            invocations
+        )
+        errors: dict[str, Exception] = {}
+        try:
+            for future in as_completed(futures):
+                invocation = invocations[futures[future]]
+                try:
+                    message = self._to_tool_message(invocation, future.result())
+                except Exception as e:
+                    if not self.isolate_errors:
+                        errors[invocation.id] = e
+                        continue
+                    message = self._error_message(invocation.id, invocation.name, e)
+                message = self._fit_to_turn(turn, message)
+                results[futures[future]] = message
+                yield message
+        finally:
+            for future in futures:
+                future.cancel()
+
+        if errors:
+            raise ToolCallsError(results, errors) from next(iter(errors.values()))
+
+    def execute_batch(
+        self,
+        tool_calls_by_conversation: Mapping[K, list[ChatCompletionMessageToolCall]],
+    ) -> dict[K, list[ChatCompletionToolMessageParam]]:
+        """Execute the tool calls of many conversations at once, e.g. one turn of every
+        agent in a fleet, sharing the toolbox's executor between all of them.
+
+        Identical calls to idempotent (`@cached`) functions run once and share their
+        result across conversations. Calls to functions with a `@batched`
+        implementation are combined into one vectorized call per function.
+
+        Args:
+            tool_calls_by_conversation: Mapping of a conversation key of your choosing to
+                the tool calls from that conversation
+
+        Returns:
+            Mapping of each conversation key to the tool messages for its tool calls
+
+        Raises:
+            ToolCallsError: If any tool call raised, after all other work has finished.
+                Results on the error are flattened in input order. With
+                `isolate_errors`, failed tool calls get error messages instead.
+        """
+        conversations, invocations, failed = self._parse_batch(
+            tool_calls_by_conversation
+        )
+        works = self._plan_batch(invocations)
+
+        if self._is_sequential():
+            pending = [
+                functools.partial(self._run_work, work, invocations) for work in works
+            ]
+        else:
+            futures = self._submit_all(
+                [work.func_name for work in works],
+                lambda executor, index: self._submit_work(
+                    executor, works[index], invocations
+                ),
+                self._plan_batch_dependencies(works, invocations),
+            )
+            pending = [future.result for future in futures]
+
+        outcomes: list[Union[list[str], Exception]] = []
+        for work, get_result in zip(works, pending):
+            try:
+                execution_result = get_result()
+                if work.batch is None:
+                    outcomes.append(
+                        [self._serialize_result(work.func_name, execution_result)]
+                    )
+                else:
+                    outcomes.append(
+                        self._batch_contents(work, invocations, execution_result)
+                    )
+            except Exception as e:
+                outcomes.append(e)
+        return self._group_batch_results(
+            conversations, invocations, works, outcomes, failed
+        )
+
+    def _execute_to_message(
+        self, invocation: Invocation[ToolResult]
+    ) -> ChatCompletionToolMessageParam:
+        try:
+            return self._to_tool_message(invocation, self._execute(invocation))
+        except Exception as e:
+            if not self.isolate_errors:
+                raise
+            return self._error_message(invocation.id, invocation.name, e)
+
+    def _run_work(
+        self, work: BatchWork, invocations: list[Invocation[ToolResult]]
+    ) -> Any:
+        if work.batch is None:
+            return self._execute(invocations[work.targets[0][0]])
+        args_list = [invocations[targets[0]].args for targets in work.targets]
+        return self._call(work.func_name, work.batch.func, args_list)
+
+    def _submit_work(
+        self,
+        executor: Executor,
+        work: BatchWork,
+        invocations: list[Invocation[ToolResult]],
+    ) -> Future[Any]:
+        if work.batch is None:
+            return self._submit(executor, invocations[work.targets[0][0]])
+        args_list = [invocations[targets[0]].args for targets in work.targets]
+        return self._submit_call(executor, work.func_name, work.batch.func, args_list)
+
+    def _collect_results(
+        self,
+        invocations: list[Invocation[ToolResult]],
+        futures: list[Future[ToolResult]],
+    ) -> list[ChatCompletionToolMessageParam]:
+        results: list[Union[ChatCompletionToolMessageParam, None]] = []
+        errors: dict[str, Exception] = {}
+        for invocation, future in zip(invocations, futures):
+            try:
+                results.append(self._to_tool_message(invocation, future.result()))
+            except Exception as e:
+                if self.isolate_errors:
+                    results.append(
+                        self._error_message(invocation.id, invocation.name, e)
+                    )
+                else:
+                    results.append(None)
+                    errors[invocation.id] = e
+
+        if errors:
+            raise ToolCallsError(results, errors) from next(iter(errors.values()))
+        return results  # type: ignore[return-value]
+
+
+class AsyncToolbox(BaseToolbox[Union[Awaitable[ToolResult], ToolResult]]):
+    max_concurrency: Union[int, None] = None
+    """Maximum number of tool calls that run at the same time, across all functions."""
+
+    concurrency_limits: dict[str, int] = {}
+    """Maximum number of concurrent calls per function name, e.g. for tools backed by a
+    connection pool."""
+
+    timeout: Union[float, None] = None
+    """Timeout in seconds for each tool call. Time spent waiting for a concurrency slot
+    does not count towards the timeout. Sync functions can't be interrupted, so a timed
+    out sync call keeps running on its worker thread in the background."""
+
+    timeouts: dict[str, float] = {}
+    """Per-function timeouts in seconds, overriding `timeout`."""
+
+    hedging: dict[str, HedgePolicy] = {}
+    """Hedging policies for idempotent functions with long-tail latency, by function
+    name. A call that runs longer than its policy's delay is started again, and the first
+    result wins."""
+
+    executor: Union[Executor, None] = None
+    """Executor for running sync (non-`async`) functions so they don't block the event
+    loop. Defaults to the event loop's default executor. See `executors` to run some
+    functions on a process pool instead."""
+
+    _sync_functions: frozenset[str] = frozenset()
+    _latencies: dict[str, LatencyTracker] = PrivateAttr(default_factory=dict)
+
+    # Semaphores are bound to the event loop they are first used on, so they are kept
+    # per loop. Limits apply across concurrent `execute_tool_calls` calls on that loop.
+    _semaphores: weakref.WeakKeyDictionary = PrivateAttr(
+        default_factory=weakref.WeakKeyDictionary
+    )
+
+    @model_validator(mode="after")
+    def _check_function_options(self) -> Self:
+        for option in ("concurrency_limits", "timeouts", "hedging"):
+            unknown = set(getattr(self, option)) - set(self.functions)
+            if unknown:
+                raise ValueError(
+                    f"`{option}` refers to functions not in the toolbox: {sorted(unknown)}"
+                )
+        for policy in self.hedging.values():
+            if policy.delay is None and policy.percentile is None:
+                raise ValueError("`hedging`: set a `delay`, a `percentile`, or both")
+            if policy.percentile is not None and not 0 < policy.percentile < 1:
+                raise ValueError("`hedging`: `percentile` must be between 0 and 1")
+        _check_not_streamed(self.functions, "hedging", self.hedging)
+
+        self._sync_functions = frozenset(
+            name
+            for name, func in self.functions.items()
+            if not _is_async_callable(func)
+        )
+        return self
+
+    def _get_semaphores(self) -> dict[Union[str, None], asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.get(loop)
+        if semaphores is None:
+            semaphores = {
+                name: asyncio.Semaphore(limit)
+                for name, limit in self.concurrency_limits.items()
+            }
+            if self.max_concurrency is not None:
+                semaphores[None] = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphores
+        return semaphores
+
+    @staticmethod
+    def _start_all(
+        calls: list[Callable[[], Awaitable[T]]],
+        dependencies: Union[list[list[int]], None],
+    ) -> list[asyncio.Future[T]]:
+        if dependencies is None:
+            return [asyncio.ensure_future(call()) for call in calls]
+        tasks: list[asyncio.Future[T]] = []
+        for call, before in zip(calls, dependencies):
+            tasks.append(
+                asyncio.ensure_future(
+                    run_after([tasks[index] for index in before], call)
+                )
+            )
+        return tasks
 
-class AsyncToolbox(BaseToolbox[Awaitable[Union[str, dict[str, Any]]]]):
     async def _execute_single_invocation(
-        self, invocation: Invocation[Awaitable[Union[str, dict[str, Any]]]]
+        self, invocation: Invocation[Union[Awaitable[ToolResult], ToolResult]]
     ) -> ChatCompletionToolMessageParam:
-        execution_result = await invocation.execute()
-        if isinstance(execution_result, dict):
-            execution_result = json.dumps(execution_result)
-        return {
-            "role": "tool",
-            "tool_call_id": invocation.id,
-            "content": execution_result,
-        }
+        try:
+            return await self._execute_invocation(invocation)
+        except Exception as e:
+            if not self.isolate_errors:
+                raise
+            return self._error_message(invocation.id, invocation.name, e)
+
+    async def _execute_invocation(
+        self, invocation: Invocation[Union[Awaitable[ToolResult], ToolResult]]
+    ) -> ChatCompletionToolMessageParam:
+        func_name = invocation.name
+        cache_key = self._result_cache_key(invocation)
+        try:
+            if cache_key is None:
+                execution_result = await self._execute_with_retries(
+                    func_name, lambda: self._call(invocation)
+                )
+            else:
+                cache, key = cache_key
+
+                async def _run() -> str:
+                    return self._serialize_result(
+                        func_name,
+                        await self._execute_with_retries(
+                            func_name, lambda: self._call(invocation)
+                        ),
+                    )
+
+                execution_result = _SerializedResult(await cache.get_or_run(key, _run))
+        except _ToolTimeoutError as e:
+            logger.warning(f"`{func_name}`: tool call {invocation.id} {e.describe()}")
+            execution_result = _SerializedResult(_timeout_content(func_name, e))
+
+        return self._to_tool_message(invocation, execution_result)
+
+    async def _execute_with_retries(
+        self, func_name: str, call: Callable[[], Awaitable[T]]
+    ) -> T:
+        policy = self.retries.get(func_name)
+        if policy is None:
+            return await self._execute_hedged(func_name, call)
+        # Slots are released while backing off. Calls that ran out of the turn's time
+        # are not retried.
+        return await async_call_with_retries(
+            policy,
+            func_name,
+            lambda: self._execute_hedged(func_name, call),
+            is_final=lambda e: isinstance(e, _ToolTimeoutError) and e.deadline,
+        )
+
+    async def _execute_hedged(
+        self, func_name: str, call: Callable[[], Awaitable[T]]
+    ) -> T:
+        policy = self.hedging.get(func_name)
+        if policy is None:
+            return await self._execute_limited(func_name, call)
+
+        latencies = self._latencies.get(func_name)
+        if latencies is None:
+            latencies = self._latencies[func_name] = LatencyTracker(policy.window)
+        # Each hedged call takes its own slots and is subject to its own timeout
+        return await run_hedged(
+            policy, latencies, func_name, lambda: self._execute_limited(func_name, call)
+        )
+
+    async def _execute_limited(
+        self, func_name: str, call: Callable[[], Awaitable[T]]
+    ) -> T:
+        semaphores = self._get_semaphores()
+        timeout = self.timeouts.get(func_name, self.timeout)
+        turn_deadline = get_deadline()
+
+        async with AsyncExitStack() as stack:
+            # Take the per-function slot first so calls queued behind a busy function
+            # don't hold on to a global slot while waiting.
+            for key in (func_name, None):
+                if key not in semaphores:
+                    continue
+                if turn_deadline is None:
+                    await stack.enter_async_context(semaphores[key])
+                    continue
+                # Unlike the timeout, the turn's deadline includes time spent waiting
+                if not await _acquire_by(semaphores[key], turn_deadline):
+                    raise _ToolTimeoutError(timeout, deadline=True)
+                stack.callback(semaphores[key].release)
+
+            by_deadline = turn_deadline is not None and (
+                timeout is None or turn_deadline < time.monotonic() + timeout
+            )
+            if by_deadline:
+                remaining = turn_deadline - time.monotonic()  # type: ignore[operator]
+                if remaining <= 0:
+                    raise _ToolTimeoutError(timeout, deadline=True)
+            else:
+                remaining = timeout
+
+            # Tool functions can read what's left with `remaining_time()`
+            with deadline_scope(deadline_after(remaining)):
+                try:
+                    return await asyncio.wait_for(
+                        self._execute(func_name, call), remaining
+                    )
+                except asyncio.TimeoutError:
+                    raise _ToolTimeoutError(timeout, by_deadline) from None
+
+    async def _execute(self, func_name: str, call: Callable[[], Awaitable[T]]) -> T:
+        if self.instrumentation is None:
+            return await call()
+
+        start = time.perf_counter_ns()
+        try:
+            execution_result = await call()
+        except BaseException as e:
+            # Includes cancellation, e.g. when the call times out
+            self._record(func_name, "execute", start, error=e)
+            raise
+        self._record(func_name, "execute", start)
+        return execution_result
+
+    async def _call(
+        self, invocation: Invocation[Union[Awaitable[ToolResult], ToolResult]]
+    ) -> ToolResult:
+        func_name = invocation.name
+        executor = self._get_function_executor(func_name)
+        if executor is None:
+            if func_name not in self._sync_functions:
+                return await invocation.execute()  # type: ignore[misc]
+            executor = self.executor
+
+        if executor is not None and is_out_of_process(executor):
+            return await self._run_in_executor(
+                out_of_process_call(
+                    invocation.func, invocation.args, invocation.args_json
+                ),
+                executor,
+            )
+        return await self._run_in_executor(invocation.execute, executor)
+
+    async def _run(
+        self, func_name: str, call: Callable[[], Any], is_async: bool
+    ) -> Any:
+        executor = self._get_function_executor(func_name)
+        if executor is None:
+            if is_async:
+                return await call()
+            executor = self.executor
+        return await self._run_in_executor(call, executor)
+
+    async def _run_in_executor(
+        self, call: Callable[[], Any], executor: Union[Executor, None]
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        if executor is None or not is_out_of_process(executor):
+            # Context variables can't be sent to other processes
+            call = functools.partial(contextvars.copy_context().run, call)
+        execution_result = await loop.run_in_executor(executor, call)
+        # Functions that return an awaitable without being declared `async` (e.g. a
+        # functools.partial of a coroutine function) still need to be awaited.
+        if inspect.isawaitable(execution_result):
+            execution_result = await execution_result
+        return execution_result
 
     async def execute_tool_calls(
-        self, tool_calls: list[ChatCompletionMessageToolCall]
+        self,
+        tool_calls: list[ChatCompletionMessageToolCall],
+        deadline: Union[float, None] = None,
     ) -> list[ChatCompletionToolMessageParam]:
         """Execute multiple tool calls asynchronously and returns a result that can be
         used to respond to the OpenAI API.
 
+        Tool calls run in parallel, subject to the toolbox's `max_concurrency` and
+        `concurrency_limits`. Calls that conflict on the `resources` they declare run in
+        the order they were made. Sync functions run on the toolbox's `executor`, so they
+        don't block the event loop. A call that exceeds its timeout returns an error tool
+        message instead of a result; the other calls are unaffected.
+
         Args:
             tool_calls: List of tool calls from the OpenAI API to execute
+            deadline: Seconds the whole turn may take. The tool calls share it: each
+                one gets what is left when it starts, and calls that can't finish in
+                time, including time spent waiting for a concurrency slot, return
+                timeout error messages. Tool functions can read the time they have
+                left with `toolsmith.remaining_time()`.
 
         Returns:
             List of tool messages containing the results of executing each tool call
@@ -168,11 +1590,305 @@ class AsyncToolbox(BaseToolbox[Awaitable[Union[str, dict[str, Any]]]]):
         Warning:
             If any individual tool call raises an uncaught exception, other pending tool calls
             will continue to run but may be left in an indeterminate state.
-            To prevent this, catch exceptions within the tool handler functions themselves
-            and return error messages as part of the normal return value.
+            To prevent this, create the toolbox with `isolate_errors=True`, so failed tool
+            calls get error messages instead.
+        """
+        invocations, failed = self._parse_tool_calls(tool_calls)
+
+        # Tasks are created inside the scope, so they carry the deadline
+        with deadline_scope(deadline_after(deadline)):
+            gathered = asyncio.gather(
+                *self._start_all(
+                    [
+                        functools.partial(self._execute_single_invocation, inv)
+                        for inv in invocations
+                    ],
+                    self._plan_dependencies([[inv] for inv in invocations]),
+                )
+            )
+        return self._fit_to_budget(tool_calls, _with_failed(await gathered, failed))
+
+    async def execute_tool_calls_as_completed(
+        self,
+        tool_calls: list[ChatCompletionMessageToolCall],
+        deadline: Union[float, None] = None,
+    ) -> AsyncIterator[ChatCompletionToolMessageParam]:
+        """Execute tool calls like `execute_tool_calls`, but yield each tool message as
+        soon as its tool call finishes instead of waiting for all of them.
+
+        Args:
+            tool_calls: List of tool calls from the OpenAI API to execute
+            deadline: Seconds the whole turn may take, see `execute_tool_calls`
+
+        Yields:
+            Tool messages in completion order. Use `tool_call_id` to match them up.
+
+        Raises:
+            ToolCallsError: After all other tool calls have finished, if any tool call
+                raised. Results of successful calls are available on the error.
+                With `isolate_errors`, failed tool calls are yielded as error messages.
+
+        Note:
+            If you stop iterating early, the tool calls that are still running are
+            cancelled.
         """
-        invocations = self.parse_invocations(tool_calls)
+        invocations, failed = self._parse_tool_calls(tool_calls)
+        turn = self._start_turn(tool_calls)
+        for message in failed.values():
+            yield self._fit_to_turn(turn, message)
 
-        return await asyncio.gather(
-            *[self._execute_single_invocation(inv) for inv in invocations],
+        async def _run(index: int) -> tuple[int, Any, Union[Exception, None]]:
+            try:
+                return (
+                    index,
+                    await self._execute_single_invocation(invocations[index]),
+                    None,
+                )
+            except Exception as e:
+                return index, None, e
+
+        with deadline_scope(deadline_after(deadline)):
+            tasks = self._start_all(
+                [functools.partial(_run, i) for i in range(len(invocations))],
+                self._plan_dependencies([[inv] for inv in invocations]),
+            )
+        results: list[Union[ChatCompletionToolMessageParam, None]] = [None] * len(tasks)
+        errors: dict[str, Exception] = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, message, error = await next_done
+                if error is not None:
+                    errors[invocations[index].id] = error
+                    continue
+                message = self._fit_to_turn(turn, message)
+                results[index] = message
+                yield message
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if errors:
+            raise ToolCallsError(results, errors) from next(iter(errors.values()))
+
+    async def execute_batch(
+        self,
+        tool_calls_by_conversation: Mapping[K, list[ChatCompletionMessageToolCall]],
+        deadline: Union[float, None] = None,
+    ) -> dict[K, list[ChatCompletionToolMessageParam]]:
+        """Execute the tool calls of many conversations at once, e.g. one turn of every
+        agent in a fleet. All tool calls are scheduled together, so `max_concurrency`,
+        `concurrency_limits` and result caches are shared across conversations.
+
+        Identical calls to idempotent (`@cached`) functions run once and share their
+        result across conversations. Calls to functions with a `@batched`
+        implementation are combined into one vectorized call per function, which takes
+        a single concurrency slot and is subject to the function's timeout as a whole.
+
+        Args:
+            tool_calls_by_conversation: Mapping of a conversation key of your choosing to
+                the tool calls from that conversation
+            deadline: Seconds all the work may take, see `execute_tool_calls`
+
+        Returns:
+            Mapping of each conversation key to the tool messages for its tool calls
+
+        Raises:
+            ToolCallsError: If any tool call raised, after all other work has finished.
+                Results on the error are flattened in input order. With
+                `isolate_errors`, failed tool calls get error messages instead.
+        """
+        conversations, invocations, failed = self._parse_batch(
+            tool_calls_by_conversation
+        )
+        works = self._plan_batch(invocations)
+
+        with deadline_scope(deadline_after(deadline)):
+            gathered = asyncio.gather(
+                *self._start_all(
+                    [
+                        functools.partial(self._execute_work, work, invocations)
+                        for work in works
+                    ],
+                    self._plan_batch_dependencies(works, invocations),
+                ),
+                return_exceptions=True,
+            )
+        outcomes = await gathered
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException) and not isinstance(
+                outcome, Exception
+            ):
+                raise outcome
+        return self._group_batch_results(
+            conversations, invocations, works, outcomes, failed
         )
+
+    async def _execute_work(
+        self,
+        work: BatchWork,
+        invocations: list[Invocation[Union[Awaitable[ToolResult], ToolResult]]],
+    ) -> list[str]:
+        if work.batch is None:
+            message = await self._execute_single_invocation(
+                invocations[work.targets[0][0]]
+            )
+            return [message["content"]]  # type: ignore[list-item]
+
+        batch: BatchImplementation = work.batch
+        args_list = [invocations[targets[0]].args for targets in work.targets]
+        try:
+            execution_results = await self._execute_with_retries(
+                work.func_name,
+                lambda: self._run(
+                    work.func_name,
+                    functools.partial(batch.func, args_list),
+                    _is_async_callable(batch.func),
+                ),
+            )
+        except _ToolTimeoutError as e:
+            logger.warning(
+                f"`{work.func_name}`: batch of {len(args_list)} calls {e.describe()}"
+            )
+            return [_timeout_content(work.func_name, e)] * len(args_list)
+        return self._batch_contents(work, invocations, execution_results)
+
+    def stream_tool_calls(self, deadline: Union[float, None] = None) -> ToolCallStream:
+        """Start executing tool calls while the LLM response is still streaming.
+
+        Feed the streamed tool call deltas to the returned `ToolCallStream`. Each tool
+        call is validated and scheduled as soon as its arguments are complete, so tool
+        latency overlaps with generation latency.
+
+        Args:
+            deadline: Seconds from now that the tool calls may take, see
+                `execute_tool_calls`
+
+        Returns:
+            A `ToolCallStream` bound to this toolbox
+
+        Example:
+            ```py
+            stream = toolbox.stream_tool_calls()
+            async for chunk in response:
+                if chunk.choices:
+                    stream.feed(chunk.choices[0].delta.tool_calls)
+            results = await stream.results()
+            ```
+        """
+        return ToolCallStream(self, deadline_after(deadline))
+
+    async def execute_streamed_tool_calls(
+        self,
+        chunks: AsyncIterable[ChatCompletionChunk],
+        deadline: Union[float, None] = None,
+    ) -> list[ChatCompletionToolMessageParam]:
+        """Execute tool calls from a streamed chat completion as soon as each one is
+        complete. Only the first choice is considered. To also handle the streamed text
+        content, use `stream_tool_calls` instead.
+
+        Args:
+            chunks: The stream of chunks returned by the OpenAI API with `stream=True`
+            deadline: Seconds from now that the tool calls may take, including the
+                rest of the stream, see `execute_tool_calls`
+
+        Returns:
+            List of tool messages containing the results of executing each tool call
+        """
+        stream = self.stream_tool_calls(deadline)
+        async for chunk in chunks:
+            if chunk.choices:
+                stream.feed(chunk.choices[0].delta.tool_calls)
+        return await stream.results()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        # Waiting for the executors to shut down would block the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+class _InlineExecutor(Executor):
+    """Runs each call in the submitting thread, for calls without an executor when
+    others in the same batch have one."""
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T]:
+        future: Future[T] = Future()
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        return future
+
+
+_INLINE_EXECUTOR = _InlineExecutor()
+
+
+def _with_failed(
+    results: list[ChatCompletionToolMessageParam],
+    failed: dict[int, ChatCompletionToolMessageParam],
+) -> list[ChatCompletionToolMessageParam]:
+    """Put the error messages of tool calls that failed to parse back in place among
+    the results of the others."""
+    if not failed:
+        return results
+    remaining = iter(results)
+    return [
+        failed[index] if index in failed else next(remaining)
+        for index in range(len(results) + len(failed))
+    ]
+
+
+def _check_not_streamed(
+    functions: Mapping[str, Callable[..., Any]], option: str, names: Iterable[str]
+) -> None:
+    # Every attempt would get the same `Iterator` arguments, already consumed by the
+    # first one
+    streamed = sorted(name for name in names if get_streamed_params(functions[name]))
+    if streamed:
+        raise ValueError(
+            f"`{option}`: functions with `Iterator` parameters can't be called more "
+            f"than once per tool call: {streamed}"
+        )
+
+
+async def _acquire_by(semaphore: asyncio.Semaphore, deadline: float) -> bool:
+    """Acquire `semaphore` unless `deadline` passes first. Before Python 3.12,
+    `asyncio.wait_for(semaphore.acquire(), ...)` can time out after the semaphore was
+    acquired, and the permit is never released."""
+    if not semaphore.locked():
+        return await semaphore.acquire()
+
+    acquire = asyncio.ensure_future(semaphore.acquire())
+    try:
+        await asyncio.wait([acquire], timeout=max(0.0, deadline - time.monotonic()))
+    except BaseException:
+        _abandon_acquire(semaphore, acquire)
+        raise
+    if acquire.done():
+        return True
+    _abandon_acquire(semaphore, acquire)
+    return False
+
+
+def _abandon_acquire(
+    semaphore: asyncio.Semaphore, acquire: asyncio.Future[bool]
+) -> None:
+    # The acquire may still succeed, or already have, so its permit is given back then
+    def _release(future: asyncio.Future[bool]) -> None:
+        if not future.cancelled() and future.exception() is None:
+            semaphore.release()
+
+    acquire.cancel()
+    acquire.add_done_callback(_release)
+
+
+def _timeout_content(func_name: str, error: _ToolTimeoutError) -> str:
+    return f"Error: `{func_name}` {error.describe()}"
+
+
+def _is_async_callable(func: Callable[..., Any]) -> bool:
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(
+        getattr(func, "__call__", None)
+    )
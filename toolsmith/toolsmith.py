@@ -1,13 +1,268 @@
+from __future__ import annotations
+
+import enum
+import hashlib
 import inspect
 import logging
-from typing import Any, Callable, get_type_hints
+import mmap
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 
-from openai import pydantic_function_tool
-from openai.types.chat import ChatCompletionToolParam
+import pydantic
 from pydantic import BaseModel, create_model
+from pydantic_core import from_json, to_json
+
+from toolsmith.lazy_args import streamed_item_type
+from toolsmith.validators import ArgsValidator, Param, param_field
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionToolParam
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CACHE_SIZE = 1024
+
+SCHEMA_CACHE_DIR_ENV = "TOOLSMITH_SCHEMA_CACHE_DIR"
+
+# Schema keywords whose values map names to sub-schemas
+_NAME_MAP_KEYS = frozenset(("properties", "$defs", "definitions"))
+
+# Bump when the generated schemas change for the same inputs
+_SCHEMA_CACHE_FORMAT = 2
+
+
+class _FunctionCache:
+    """Process-wide LRU cache of generated artifacts, keyed on function identity.
+
+    Functions are held through weak references, so caching a closure does not keep it
+    alive. Callables that can't be weakly referenced are simply not cached.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[weakref.ref, dict[str, Any]] = OrderedDict()
+        self._pending_removals: list[weakref.ref] = []
+        self._lock = threading.Lock()
+
+    def get(self, func: Callable[..., Any], key: str) -> Union[Any, None]:
+        try:
+            ref = weakref.ref(func)
+        except TypeError:
+            return None
+
+        with self._lock:
+            self._purge()
+            entry = self._entries.get(ref)
+            if entry is None:
+                return None
+            self._entries.move_to_end(ref)
+            return entry.get(key)
+
+    def set(self, func: Callable[..., Any], key: str, value: Any) -> None:
+        try:
+            ref = weakref.ref(func, self._pending_removals.append)
+        except TypeError:
+            return
+
+        with self._lock:
+            self._purge()
+            entry = self._entries.get(ref)
+            if entry is None:
+                entry = self._entries[ref] = {}
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(ref)
+            entry[key] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._pending_removals.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge()
+            return len(self._entries)
+
+    def _purge(self) -> None:
+        # Weakref callbacks may fire at any point during garbage collection, so they
+        # only record dead references; the entries are dropped here, under the lock.
+        while self._pending_removals:
+            self._entries.pop(self._pending_removals.pop(), None)
+
+
+_cache = _FunctionCache()
+
+
+def clear_cache() -> None:
+    """Clear the process-wide cache of generated argument models, validators and
+    schemas."""
+    _cache.clear()
+
+
+class _SchemaDiskCache:
+    """Finished schema JSON stored on disk, so that new processes don't need to
+    generate schemas for every tool on startup.
+
+    Files are keyed on the function's module and qualname plus a fingerprint of
+    everything the schema is generated from: its name, signature, type hints (including
+    the fields of pydantic models and the members of enums they refer to), docstring,
+    and the versions of pydantic and the OpenAI SDK. A changed function gets a new file.
+    Old files are kept, since other processes sharing the directory may still run the
+    old code.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike[str], None] = None):
+        self.directory = None if directory is None else Path(directory)
+        self._versions: Union[str, None] = None
+
+    def path_for(self, fn: Callable[..., Any]) -> Union[Path, None]:
+        if self.directory is None:
+            return None
+        module = getattr(fn, "__module__", None)
+        qualname = getattr(fn, "__qualname__", None)
+        if module is None or qualname is None:
+            return None
+
+        try:
+            fingerprint = self._fingerprint(fn)
+        except Exception:
+            # e.g. unresolvable forward references; schema generation reports those
+            return None
+        return (
+            self.directory / f"{_safe_file_name(module, qualname)}-{fingerprint}.json"
+        )
+
+    def load(self, path: Path) -> Union[tuple[Any, bytes], None]:
+        try:
+            with open(path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                schema_json = mapped[:]
+            return from_json(schema_json), schema_json
+        except (OSError, ValueError):
+            # Missing, empty or corrupt files are regenerated
+            return None
+
+    def store(self, path: Path, schema_json: bytes) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see a
+            # partially written schema
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(schema_json)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write schema cache file {path}: {e}")
+
+    def _fingerprint(self, fn: Callable[..., Any]) -> str:
+        if self._versions is None:
+            # Deferred, importlib.metadata is slow to import
+            import importlib.metadata
+
+            try:
+                openai_version = importlib.metadata.version("openai")
+            except importlib.metadata.PackageNotFoundError:
+                openai_version = ""
+            self._versions = (
+                f"{_SCHEMA_CACHE_FORMAT}/{pydantic.VERSION}/{openai_version}"
+            )
+
+        describer = _TypeDescriber()
+        parts = [
+            self._versions,
+            # Tools built by the same factory share a qualname, but not their name
+            fn.__name__,
+            str(inspect.signature(fn)),
+            inspect.getdoc(fn) or "",
+            *(
+                f"{name}={describer.describe(hint)}"
+                for name, hint in get_type_hints(fn, include_extras=True).items()
+            ),
+        ]
+        # Object reprs may contain memory addresses, which differ between processes
+        key = re.sub(r" at 0x[0-9a-fA-F]+", "", "\0".join(parts))
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+class _TypeDescriber:
+    """Describes a type hint in enough detail that any change to the schema generated
+    from it also changes the description."""
+
+    def __init__(self) -> None:
+        self._in_progress: set[type] = set()
+        self._cyclic = False
+
+    def describe(self, tp: Any) -> str:
+        if isinstance(tp, type):
+            name = f"{tp.__module__}.{tp.__qualname__}"
+            if issubclass(tp, BaseModel):
+                return self._describe_model(name, tp)
+            if issubclass(tp, enum.Enum):
+                return f"{name}({[member.value for member in tp]!r})"
+
+        args = get_args(tp)
+        if args:
+            return f"{get_origin(tp)!r}[{','.join(map(self.describe, args))}]"
+        return repr(tp)
+
+    def _describe_model(self, name: str, model: type[BaseModel]) -> str:
+        if model in self._in_progress:
+            self._cyclic = True
+            return name
+
+        # Models are usually shared by many tools, so their descriptions are cached,
+        # unless they depend on where the description of a model cycle started.
+        description = _cache.get(model, "type_description")
+        if description is not None:
+            return description
+
+        outer_cyclic, self._cyclic = self._cyclic, False
+        self._in_progress.add(model)
+        fields = ",".join(
+            f"{field_name}:{field!r}:{self.describe(field.annotation)}"
+            for field_name, field in model.model_fields.items()
+        )
+        self._in_progress.discard(model)
+        description = f"{name}({fields}|{inspect.getdoc(model)}|{model.model_config!r})"
+
+        if not self._cyclic:
+            _cache.set(model, "type_description", description)
+        self._cyclic = self._cyclic or outer_cyclic
+        return description
+
+
+def _safe_file_name(module: str, qualname: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.]", "_", f"{module}.{qualname}")
+
+
+_disk_cache = _SchemaDiskCache(os.environ.get(SCHEMA_CACHE_DIR_ENV) or None)
+
+
+def set_schema_cache_dir(directory: Union[str, os.PathLike[str], None]) -> None:
+    """Store generated schemas in `directory` and reuse them in later processes, or
+    disable the on-disk cache with `None`. Defaults to the `TOOLSMITH_SCHEMA_CACHE_DIR`
+    environment variable.
+
+    Schemas loaded from disk skip generation and validation entirely, so this mostly
+    speeds up starting new worker processes. Argument models are still built on first
+    use."""
+    _disk_cache.directory = None if directory is None else Path(directory)
+
 
 def func_to_schema(fn: Callable[..., Any]) -> ChatCompletionToolParam:
     """Wraps a Python function to be compatible with OpenAI's function calling API.
@@ -16,25 +271,106 @@ def func_to_schema(fn: Callable[..., Any]) -> ChatCompletionToolParam:
         fn: The Python function to wrap
 
     Returns:
-        dict: Function schema compatible with OpenAI's API
+        dict: Function schema compatible with OpenAI's API. Schemas are cached per
+        function and shared between callers, so they should not be mutated.
     """
-    args_model = func_to_pydantic(fn)
+    schema = _cache.get(fn, "schema")
+    if schema is not None:
+        return schema
+
+    path = _disk_cache.path_for(fn)
+    cached = None if path is None else _disk_cache.load(path)
+    if cached is not None:
+        schema, schema_json = cached
+        _cache.set(fn, "schema", schema)
+        _cache.set(fn, "schema_json", schema_json)
+        return schema
+
+    # Deferred so that importing toolsmith doesn't import the OpenAI SDK
+    from openai import pydantic_function_tool
+
+    # Argument models are only built for schema generation here, and not kept around;
+    # arguments are validated with `func_to_args_validator`
+    args_model = _cache.get(fn, "args_model") or _create_args_model(fn)
     schema = pydantic_function_tool(
         args_model, name=fn.__name__, description=inspect.getdoc(fn) or ""
     )
-    model_schema = _strip_title(schema["function"].get("parameters", {}))
-    _validate(fn.__name__, "parameters", model_schema)
+    _strip_title_and_validate(fn.__name__, schema["function"].get("parameters", {}))
 
+    _cache.set(fn, "schema", schema)
+    if path is not None:
+        schema_json = to_json(schema)
+        _disk_cache.store(path, schema_json)
+        _cache.set(fn, "schema_json", schema_json)
     return schema
 
 
+def func_to_schema_json(fn: Callable[..., Any]) -> bytes:
+    """Like `func_to_schema`, but returns the schema pre-encoded as compact JSON bytes.
+    The encoded schema is cached per function alongside the schema itself."""
+    schema_json = _cache.get(fn, "schema_json")
+    if schema_json is None:
+        schema_json = to_json(func_to_schema(fn))
+        _cache.set(fn, "schema_json", schema_json)
+    return schema_json
+
+
 def func_to_pydantic(func: Callable[..., Any]) -> type[BaseModel]:
-    """Convert a function's arguments to a Pydantic model. Used for input validation."""
+    """Convert a function's arguments to a Pydantic model.
+
+    Parameters annotated as `Iterator[T]` are described as arrays of `T`. Toolboxes
+    validate arguments with `func_to_args_validator` instead, which is lighter."""
+    args_model = _cache.get(func, "args_model")
+    if args_model is None:
+        args_model = _create_args_model(func)
+        _cache.set(func, "args_model", args_model)
+    return args_model
+
+
+def func_to_args_validator(func: Callable[..., Any]) -> ArgsValidator:
+    """Get a validator that turns a tool call's arguments JSON into keyword arguments
+    for a function.
+
+    Unlike `func_to_pydantic`, this doesn't create a model class per function. Functions
+    with the same parameter names and types share one validator, which is compiled when
+    it's first used. Parameters annotated as `Iterator[T]` are streamed: their items are
+    validated lazily as the function iterates over them."""
+    validator = _cache.get(func, "args_validator")
+    if validator is None:
+        validator = ArgsValidator(_get_params(func))
+        _cache.set(func, "args_validator", validator)
+    return validator
+
+
+def get_streamed_params(func: Callable[..., Any]) -> list[str]:
+    """Names of the parameters of `func` annotated as `Iterator[T]`, whose arguments can
+    only be iterated over once."""
+    return [
+        param_name
+        for param_name, param_type, default in _get_params(func)
+        if streamed_item_type(param_field(param_type, default).annotation) is not None
+    ]
+
+
+def _create_args_model(func: Callable[..., Any]) -> type[BaseModel]:
+    fields: dict[str, Any] = {}
+    for param_name, param_type, default in _get_params(func):
+        field = param_field(param_type, default)
+        item_type = streamed_item_type(field.annotation)
+        if item_type is not None:
+            field.annotation = list[item_type]  # type: ignore[valid-type]
+        fields[param_name] = (field.annotation, field)
+
+    # Create a new Pydantic model class dynamically
+    return create_model(f"{func.__name__}Args", **fields)
+
+
+def _get_params(func: Callable[..., Any]) -> list[Param]:
     sig = inspect.signature(func)
-    type_hints = get_type_hints(func)
+    # `Annotated` metadata may hold defaults and constraints
+    type_hints = get_type_hints(func, include_extras=True)
 
-    # Create field definitions for the model
-    fields = {}
+    params = []
     for param_name, param in sig.parameters.items():
         param_type = type_hints.get(param_name)
 
@@ -42,28 +378,37 @@ def func_to_pydantic(func: Callable[..., Any]) -> type[BaseModel]:
             raise ValueError(
                 f"Parameter `{param_name}` in `{func.__name__}` is not typed. Add a type hint."
             )
+        params.append((param_name, param_type, param.default))
+    return params
 
-        # Handle default values
-        if param.default != param.empty:
-            fields[param_name] = (param_type, param.default)
-        else:
-            fields[param_name] = (param_type, ...)
 
-    # Create a new Pydantic model class dynamically
-    return create_model(f"{func.__name__}Args", **fields)
+def _strip_title_and_validate(fn_name: str, parameters: dict[str, Any]) -> None:
+    """Strip out the redundant "title" fields and validate the schema, in one iterative
+    pass. Sub-schemas shared between several places (e.g. `$defs` inlined by the OpenAI
+    strict-mode conversion) are only visited once."""
+    # Schemas are (parent key, schema) pairs. The values of "properties" and "$defs"
+    # are maps of names to schemas rather than schemas, and are expanded in place.
+    stack: list[tuple[str, dict[str, Any]]] = [("parameters", parameters)]
+    seen: set[int] = set()
+    while stack:
+        parent_key, schema = stack.pop()
+        schema.pop("title", None)
+        _validate_node(fn_name, parent_key, schema)
 
-
-def _strip_title(schema: dict[str, Any]) -> dict[str, Any]:
-    """Strip out the "title" field since it's redundant from the name"""
-    if "title" in schema:
-        del schema["title"]
-    for key, value in schema.items():
-        if isinstance(value, dict):
-            _strip_title(value)
-    return schema
+        for key, value in schema.items():
+            if not isinstance(value, dict):
+                continue
+            if key in _NAME_MAP_KEYS:
+                for name, sub_schema in value.items():
+                    if isinstance(sub_schema, dict) and id(sub_schema) not in seen:
+                        seen.add(id(sub_schema))
+                        stack.append((name, sub_schema))
+            elif id(value) not in seen:
+                seen.add(id(value))
+                stack.append((key, value))
 
 
-def _validate(fn_name: str, parent_key: str, schema: dict[str, Any]) -> None:
+def _validate_node(fn_name: str, parent_key: str, schema: dict[str, Any]) -> None:
     if schema.get("type") == "object":
         additional_properties = schema.get("additionalProperties", False)
         if "properties" not in schema or additional_properties is not False:
@@ -76,15 +421,10 @@ def _validate(fn_name: str, parent_key: str, schema: dict[str, Any]) -> None:
             f"`{fn_name}`: `{parent_key}` is a list with untyped items. Please type the items."
         )
 
-    for key, value in schema.items():
-        if isinstance(value, dict):
-            _validate(fn_name, key, value)
-
-        if (
-            key == "enum"
-            and isinstance(value, list)
-            and not all(isinstance(v, str) for v in value)
-        ):
-            logger.warning(
-                f"`{fn_name}`: `{parent_key}` is an enum with non-string values. Note that the model won't see enum keys and this may cause issues."
-            )
+    enum_values = schema.get("enum")
+    if isinstance(enum_values, list) and not all(
+        isinstance(v, str) for v in enum_values
+    ):
+        logger.warning(
+            f"`{fn_name}`: `{parent_key}` is an enum with non-string values. Note that the model won't see enum keys and this may cause issues."
+        )
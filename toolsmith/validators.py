@@ -0,0 +1,187 @@
+import copy
+import enum
+import inspect
+import threading
+import weakref
+from typing import Any, Hashable, Union
+
+from pydantic import Field, TypeAdapter
+from pydantic.fields import FieldInfo
+from typing_extensions import Annotated, NotRequired, Required, TypedDict
+
+from toolsmith.lazy_args import streamed_item_type, validate_args
+
+# A parameter's name, type hint (with `Annotated` metadata), and default
+# (`inspect.Parameter.empty` if it has none)
+Param = tuple[str, Any, Any]
+
+# A parameter's name, type, constraints (e.g. from `Field(ge=0)`), validation alias
+# and whether it's required. Defaults are filled in per function.
+_Field = tuple[str, Any, tuple[Any, ...], Any, bool]
+
+# Defaults of these types are used as they are, others are copied for each call
+_IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes, enum.Enum)
+
+
+def param_field(hint: Any, default: Any) -> FieldInfo:
+    """Resolve a parameter's type hint and default the way pydantic resolves a model
+    field, so that defaults given as `Field(...)`, either as the default or in
+    `Annotated` metadata, and constraints in the metadata are honoured."""
+    if default is inspect.Parameter.empty:
+        return FieldInfo.from_annotation(hint)
+    return FieldInfo.from_annotated_attribute(hint, default)
+
+
+class SignatureValidator:
+    """Validates arguments JSON for every function with the same parameter names, types,
+    constraints, aliases and required parameters.
+
+    Validation goes through a single `TypeAdapter` over a `TypedDict`, which is compiled
+    on first use rather than when the validator is created. Missing optional arguments
+    are left out of the result; their defaults differ between functions, so each
+    function's `ArgsValidator` fills them in.
+    """
+
+    __slots__ = ("_fields", "_adapter", "_streamed", "_lock", "__weakref__")
+
+    def __init__(self, fields: tuple[_Field, ...]):
+        self._fields = fields
+        self._adapter: Union[TypeAdapter[Any], None] = None
+        self._streamed: dict[str, tuple[str, Any, TypeAdapter[Any]]] = {}
+        self._lock = threading.Lock()
+
+    def validate(self, args_json: str) -> dict[str, Any]:
+        if self._adapter is None:
+            self._compile()
+        return validate_args(self._validate_json, self._streamed, args_json)
+
+    def _validate_json(self, args_json: str) -> dict[str, Any]:
+        return self._adapter.validate_json(args_json)  # type: ignore[union-attr]
+
+    def _compile(self) -> None:
+        with self._lock:
+            if self._adapter is not None:
+                return
+
+            annotations = {}
+            streamed = {}
+            for name, hint, metadata, alias, required in self._fields:
+                item_type = streamed_item_type(hint)
+                if item_type is not None:
+                    if alias is not None and not isinstance(alias, str):
+                        raise ValueError(
+                            f"`{name}`: `Iterator` parameters only support string aliases"
+                        )
+                    key = name if alias is None else alias
+                    streamed[key] = (name, item_type, TypeAdapter(item_type))
+                    hint = list[item_type]  # type: ignore[valid-type]
+                    # The array is left empty here, so its constraints can't apply
+                    metadata = ()
+                if alias is not None:
+                    metadata = (*metadata, Field(validation_alias=alias))
+                if metadata:
+                    hint = Annotated[(hint, *metadata)]
+                annotations[name] = Required[hint] if required else NotRequired[hint]
+
+            # The same class validates the arguments of several functions, so it has a
+            # generic name rather than one of theirs
+            self._streamed = streamed
+            self._adapter = TypeAdapter(TypedDict("Arguments", annotations))  # type: ignore[operator]
+
+
+# Validators of the signatures of live functions, keyed on their fields
+_signatures: weakref.WeakValueDictionary[Hashable, SignatureValidator] = (
+    weakref.WeakValueDictionary()
+)
+_signatures_lock = threading.Lock()
+
+
+def get_signature_validator(params: list[Param]) -> SignatureValidator:
+    """Get the validator shared by functions with these parameters' names and types."""
+    fields = tuple(
+        (
+            name,
+            field.annotation,
+            tuple(field.metadata),
+            field.validation_alias,
+            field.is_required(),
+        )
+        for name, field in _param_fields(params)
+    )
+    # Hints that compare equal can still produce different validators, e.g.
+    # `Union[int, str]` and `Union[str, int]`, so their reprs are part of the key
+    key = tuple((*field, repr(field[1:4])) for field in fields)
+    try:
+        hash(key)
+    except TypeError:
+        return SignatureValidator(fields)
+
+    with _signatures_lock:
+        validator = _signatures.get(key)
+        if validator is None:
+            validator = _signatures[key] = SignatureValidator(fields)
+    return validator
+
+
+class ArgsValidator:
+    """Validates a tool call's arguments JSON into keyword arguments for a function.
+
+    Arguments are returned in parameter order, with defaults filled in for missing
+    optional arguments. The validation itself is shared with other functions that have
+    the same parameters, see `SignatureValidator`.
+    """
+
+    __slots__ = (
+        "_signature",
+        "_names",
+        "_defaults",
+        "_default_factories",
+        "_mutable_defaults",
+    )
+
+    def __init__(self, params: list[Param]):
+        self._signature = get_signature_validator(params)
+        self._names = tuple(name for name, _, _ in params)
+        fields = dict(_param_fields(params))
+        self._defaults = {
+            name: field.default
+            for name, field in fields.items()
+            if not field.is_required() and field.default_factory is None
+        }
+        self._default_factories = {
+            name: field
+            for name, field in fields.items()
+            if field.default_factory is not None
+        }
+        # Like pydantic model fields, each call gets its own copy of mutable defaults
+        self._mutable_defaults = frozenset(
+            name
+            for name, default in self._defaults.items()
+            if not isinstance(default, _IMMUTABLE_TYPES)
+        )
+
+    def validate(self, args_json: str) -> dict[str, Any]:
+        """Validate arguments JSON.
+
+        Raises:
+            pydantic.ValidationError: If the arguments are invalid
+        """
+        args = self._signature.validate(args_json)
+        if len(args) == len(self._names):
+            return args
+        return {name: self._get(args, name) for name in self._names}
+
+    def _get(self, args: dict[str, Any], name: str) -> Any:
+        if name in args:
+            return args[name]
+        if name in self._default_factories:
+            return self._default_factories[name].get_default(
+                call_default_factory=True, validated_data=args
+            )
+        if name in self._mutable_defaults:
+            return copy.deepcopy(self._defaults[name])
+        return self._defaults[name]
+
+
+def _param_fields(params: list[Param]) -> list[tuple[str, FieldInfo]]:
+    return [(name, param_field(hint, default)) for name, hint, default in params]